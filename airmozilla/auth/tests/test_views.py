@@ -2,6 +2,7 @@ import json
 
 from django.conf import settings
 from django.test import TestCase
+from django.core.cache import cache
 from django.utils.importlib import import_module
 
 from funfactory.urlresolvers import reverse
@@ -97,6 +98,7 @@ class TestViews(TestCase):
 
     def setUp(self):
         super(TestViews, self).setUp()
+        cache.clear()
 
         engine = import_module(settings.SESSION_ENGINE)
         store = engine.SessionStore()
@@ -145,7 +147,7 @@ class TestViews(TestCase):
         #    settings.LOGIN_REDIRECT_URL_FAILURE + '?bid_login_failed=1'
         # )
 
-    @mock.patch('requests.get')
+    @mock.patch('airmozilla.base.mozillians.session.get')
     def test_nonmozilla(self, rget):
         """Non-Mozilla email -> failure."""
         def mocked_get(url, **options):
@@ -173,7 +175,7 @@ class TestViews(TestCase):
         # self.assertRedirects(response,
         #                      settings.LOGIN_REDIRECT_URL)
 
-    @mock.patch('requests.get')
+    @mock.patch('airmozilla.base.mozillians.session.get')
     def test_nonmozilla_vouched_for_second_time(self, rget):
         assert not UserProfile.objects.all()
 
@@ -254,7 +256,7 @@ class TestViews(TestCase):
         # self.assertRedirects(response,
         #                      settings.LOGIN_REDIRECT_URL)
 
-    @mock.patch('requests.get')
+    @mock.patch('airmozilla.base.mozillians.session.get')
     def test_was_contributor_now_mozilla_bid(self, rget):
         """Suppose a user *was* a contributor but now her domain name
         is one of the allowed ones, it should undo that contributor status
@@ -294,7 +296,7 @@ class TestViews(TestCase):
         ok_(not profile.contributor)  # fixed!
 
     @mock.patch('airmozilla.auth.views.logger')
-    @mock.patch('requests.get')
+    @mock.patch('airmozilla.base.mozillians.session.get')
     def test_nonmozilla_mozillians_unhappy(self, rget, rlogger):
         assert not UserProfile.objects.all()
 
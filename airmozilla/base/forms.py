@@ -4,7 +4,7 @@ from django.utils.safestring import mark_safe
 from django.db.models import Q
 
 from airmozilla.main.models import Picture
-from airmozilla.main.helpers import thumbnail
+from airmozilla.main.thumbnails import generate_thumbnail
 
 
 class _BaseForm(object):
@@ -45,7 +45,7 @@ class GallerySelect(forms.widgets.Widget):
         else:
             qs = qs.filter(event__isnull=True)
         for pic in qs.order_by('event', '-created'):
-            thumb = thumbnail(pic.file, '160x90', crop='center')
+            thumb = generate_thumbnail(pic.file, '160x90', crop='center')
             pictures.append({
                 'thumb': {
                     'url': thumb.url,
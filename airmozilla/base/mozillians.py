@@ -1,8 +1,12 @@
 import logging
 import urllib
 import json
+import time
+import hashlib
+from multiprocessing.pool import ThreadPool
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from django.core.cache import cache
 from django.conf import settings
@@ -12,7 +16,32 @@ class BadStatusCodeError(Exception):
     pass
 
 
-def _fetch_users(email=None, groups=None, is_username=False):
+def _make_session():
+    """return a `requests.Session` that keeps connections to the API
+    open between calls and retries if it fails to connect."""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_maxsize=settings.MOZILLIANS_API_POOL_SIZE,
+        max_retries=settings.MOZILLIANS_API_RETRIES,
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+session = _make_session()
+
+
+def _get(url):
+    resp = session.get(url, timeout=settings.MOZILLIANS_API_TIMEOUT)
+    if not resp.status_code == 200:
+        url = url.replace(settings.MOZILLIANS_API_KEY, 'xxxscrubbedxxx')
+        raise BadStatusCodeError('%s: on: %s' % (resp.status_code, url))
+    return json.loads(resp.content)
+
+
+def _fetch_users(email=None, groups=None, is_username=False,
+                 limit=None, offset=None):
     if not getattr(settings, 'MOZILLIANS_API_KEY', None):  # pragma no cover
         logging.warning("'MOZILLIANS_API_KEY' not set up.")
         return False
@@ -30,13 +59,12 @@ def _fetch_users(email=None, groups=None, is_username=False):
             data['email'] = email
     if groups:
         data['groups'] = ','.join(groups)
+    if limit is not None:
+        data['limit'] = int(limit)
+    if offset is not None:
+        data['offset'] = int(offset)
     url += '?' + urllib.urlencode(data)
-
-    resp = requests.get(url)
-    if not resp.status_code == 200:
-        url = url.replace(settings.MOZILLIANS_API_KEY, 'xxxscrubbedxxx')
-        raise BadStatusCodeError('%s: on: %s' % (resp.status_code, url))
-    return json.loads(resp.content)
+    return _get(url)
 
 
 def is_vouched(email):
@@ -72,6 +100,100 @@ def in_groups(email, groups):
     return False
 
 
+def _make_in_groups_cache_key(email, groups):
+    return 'mozillians-in-groups:%s' % hashlib.md5(
+        '%s|%s' % (email.lower(), ','.join(sorted(groups)))
+    ).hexdigest()
+
+
+def _make_group_members_cache_key(group):
+    return 'mozillians-group-members:%s' % hashlib.md5(
+        group.encode('utf-8')
+    ).hexdigest()
+
+
+def in_groups_cached(email, groups, wait=3):
+    """like `in_groups()` but remembers the answer, for
+    settings.MOZILLIANS_IN_GROUPS_POSITIVE_TTL seconds if the user is in
+    any of the groups and settings.MOZILLIANS_IN_GROUPS_NEGATIVE_TTL
+    seconds if not.
+
+    If the members of all the groups have been fetched with
+    `prewarm_group_members()` no API call is needed at all.
+    If someone else is already asking the API the same question, wait (at
+    most `wait` seconds) for their answer instead of asking again.
+    """
+    if isinstance(groups, basestring):
+        groups = [groups]
+    cache_key = _make_in_groups_cache_key(email, groups)
+    result = cache.get(cache_key)
+    if result is not None:
+        return result
+
+    members = cache.get_many([
+        _make_group_members_cache_key(x) for x in groups
+    ])
+    if len(members) == len(set(groups)):
+        return any(email.lower() in x for x in members.values())
+
+    lock_key = cache_key + ':lock'
+    locked = cache.add(lock_key, True, wait * 2)
+    if not locked:
+        # someone else is fetching it
+        for i in range(wait * 10):
+            time.sleep(0.1)
+            result = cache.get(cache_key)
+            if result is not None:
+                return result
+        # they're taking too long so ask too, but leave their lock be
+    try:
+        result = in_groups(email, groups)
+        if result:
+            timeout = settings.MOZILLIANS_IN_GROUPS_POSITIVE_TTL
+        else:
+            timeout = settings.MOZILLIANS_IN_GROUPS_NEGATIVE_TTL
+        cache.set(cache_key, result, timeout)
+    finally:
+        if locked:
+            cache.delete(lock_key)
+    return result
+
+
+def get_group_members(group):
+    """return the email addresses (lowercase) of all users in the group"""
+    limit = 500
+    offset = 0
+    emails = set()
+    while True:
+        found = _fetch_users(groups=[group], limit=limit, offset=offset)
+        if not found:
+            break
+        for obj in found['objects']:
+            # the API only does an OR on the groups
+            if group in obj.get('groups', [group]):
+                emails.add(obj['email'].lower())
+        if len(found['objects']) < limit:
+            break
+        offset += limit
+    return emails
+
+
+def prewarm_group_members(groups):
+    """fetch and cache all members of each group so that
+    `in_groups_cached()` doesn't need to ask the API.
+    Returns the number of members found in each group."""
+    counts = {}
+    for group in set(groups):
+        emails = get_group_members(group)
+        cache.set(
+            _make_group_members_cache_key(group),
+            emails,
+            settings.MOZILLIANS_GROUP_MEMBERS_TTL
+        )
+        counts[group] = len(emails)
+    return counts
+
+
 def _fetch_groups(order_by='name', limit=20, offset=0):
     # Max limit is 500
 
@@ -88,12 +210,7 @@ def _fetch_groups(order_by='name', limit=20, offset=0):
         'offset': int(offset)
     }
     url += '?' + urllib.urlencode(data)
-
-    resp = requests.get(url)
-    if not resp.status_code == 200:
-        url = url.replace(settings.MOZILLIANS_API_KEY, 'xxxscrubbedxxx')
-        raise BadStatusCodeError('%s: on: %s' % (resp.status_code, url))
-    return json.loads(resp.content)
+    return _get(url)
 
 
 def get_all_groups(name_search=None):
@@ -104,28 +221,71 @@ def get_all_groups(name_search=None):
         )
 
     limit = 500
-    offset = 0
-    all = []
-    while True:
-        found = _fetch_groups(limit=limit, offset=offset)
-        all.extend(found['objects'])
-        if len(found['objects']) < limit:
-            break
-        offset += limit
+    found = _fetch_groups(limit=limit, offset=0)
+    all = list(found['objects'])
+    total_count = found.get('meta', {}).get('total_count')
+    if total_count is None:
+        # no way of knowing how many pages there are
+        offset = 0
+        while len(found['objects']) >= limit:
+            offset += limit
+            found = _fetch_groups(limit=limit, offset=offset)
+            all.extend(found['objects'])
+        return all
+
+    # now that we know how many there are, fetch the rest all at once
+    offsets = range(limit, total_count, limit)
+    if offsets:
+        pool = ThreadPool(
+            min(len(offsets), settings.MOZILLIANS_API_POOL_SIZE)
+        )
+        try:
+            pages = pool.map(
+                lambda offset: _fetch_groups(limit=limit, offset=offset),
+                offsets
+            )
+        finally:
+            pool.close()
+            pool.join()
+        for page in pages:
+            all.extend(page['objects'])
     return all
 
 
-def get_all_groups_cached(name_search=None, lasting=60 * 60):
+def get_all_groups_cached(name_search=None, lasting=60 * 60, wait=10):
+    """like `get_all_groups()` but remembered for `lasting` seconds.
+
+    When that's up, the previous list is still returned whilst one
+    caller fetches a new one. Only when there's nothing cached at all
+    do callers have to wait (at most `wait` seconds) for it.
+    """
     cache_key = 'all_mozillian_groups'
+    cache_key_fresh = cache_key + 'fresh'
     cache_key_lock = cache_key + 'lock'
     all = cache.get(cache_key)
-    if all is None:
-        if cache.get(cache_key_lock):
-            return []
-        cache.set(cache_key_lock, True, 60)
+    if all is not None and cache.get(cache_key_fresh):
+        return all
+
+    locked = cache.add(cache_key_lock, True, 60)
+    if not locked:
+        # someone else is already fetching them
+        if all is not None:
+            return all
+        for i in range(wait * 10):
+            time.sleep(0.1)
+            all = cache.get(cache_key)
+            if all is not None:
+                return all
+        # they're taking too long so fetch too, but leave their lock be
+    try:
         all = get_all_groups()
-        cache.set(cache_key, all, lasting)
-        cache.delete(cache_key_lock)
+        # keep the list around for much longer than it's fresh so there's
+        # always something to return while it's being refreshed
+        cache.set(cache_key, all, lasting * 24)
+        cache.set(cache_key_fresh, True, lasting)
+    finally:
+        if locked:
+            cache.delete(cache_key_lock)
     return all
 
 
@@ -255,7 +255,7 @@ class Response(object):
 class TestMozillians(TestCase):
 
     @mock.patch('logging.error')
-    @mock.patch('requests.get')
+    @mock.patch('airmozilla.base.mozillians.session.get')
     def test_is_vouched(self, rget, rlogging):
         def mocked_get(url, **options):
             if 'tmickel' in url:
@@ -283,7 +283,7 @@ class TestMozillians(TestCase):
             ok_(settings.MOZILLIANS_API_KEY not in str(msg))
 
     @mock.patch('logging.error')
-    @mock.patch('requests.get')
+    @mock.patch('airmozilla.base.mozillians.session.get')
     def test_is_not_vouched(self, rget, rlogging):
         def mocked_get(url, **options):
             if 'tmickel' in url:
@@ -294,7 +294,7 @@ class TestMozillians(TestCase):
         ok_(not mozillians.is_vouched('tmickel@mit.edu'))
 
     @mock.patch('logging.error')
-    @mock.patch('requests.get')
+    @mock.patch('airmozilla.base.mozillians.session.get')
     def test_fetch_user_name(self, rget, rlogging):
         def mocked_get(url, **options):
             if 'peterbe' in url:
@@ -310,7 +310,7 @@ class TestMozillians(TestCase):
         eq_(result, None)
 
     @mock.patch('logging.error')
-    @mock.patch('requests.get')
+    @mock.patch('airmozilla.base.mozillians.session.get')
     def test_fetch_user_name_no_user_name(self, rget, rlogging):
         def mocked_get(url, **options):
             if 'peterbe' in url:
@@ -322,7 +322,7 @@ class TestMozillians(TestCase):
         eq_(result, '')
 
     @mock.patch('logging.error')
-    @mock.patch('requests.get')
+    @mock.patch('airmozilla.base.mozillians.session.get')
     def test_in_groups(self, rget, rlogging):
 
         def mocked_get(url, **options):
@@ -336,7 +336,7 @@ class TestMozillians(TestCase):
         ok_(mozillians.in_groups('peterbe@gmail.com', ['winners', 'losers']))
 
     @mock.patch('logging.error')
-    @mock.patch('requests.get')
+    @mock.patch('airmozilla.base.mozillians.session.get')
     def test_get_all_groups(self, rget, rlogging):
         calls = []
 
@@ -356,7 +356,7 @@ class TestMozillians(TestCase):
         eq_(len(calls), 2)
 
     @mock.patch('logging.error')
-    @mock.patch('requests.get')
+    @mock.patch('airmozilla.base.mozillians.session.get')
     def test_get_all_groups_cached(self, rget, rlogging):
         cache.clear()
         calls = []
@@ -378,3 +378,110 @@ class TestMozillians(TestCase):
         all = mozillians.get_all_groups_cached()
         eq_(len(all), 750)
         eq_(len(calls), 2)
+
+    @mock.patch('logging.error')
+    @mock.patch('airmozilla.base.mozillians.session.get')
+    def test_get_all_groups_cached_stale(self, rget, rlogging):
+        cache.clear()
+        calls = []
+
+        def mocked_get(url, **options):
+            calls.append(url)
+            if 'offset=0' in url:
+                return Response(GROUPS1)
+            if 'offset=500' in url:
+                return Response(GROUPS2)
+            raise NotImplementedError(url)
+        rget.side_effect = mocked_get
+
+        all = mozillians.get_all_groups_cached()
+        eq_(len(all), 750)
+        eq_(len(calls), 2)
+
+        # pretend it's no longer fresh and someone else is refreshing it
+        cache.delete('all_mozillian_groupsfresh')
+        cache.set('all_mozillian_groupslock', True, 60)
+        all = mozillians.get_all_groups_cached()
+        eq_(len(all), 750)
+        eq_(len(calls), 2)
+
+        # when nobody is, it's refreshed
+        cache.delete('all_mozillian_groupslock')
+        all = mozillians.get_all_groups_cached()
+        eq_(len(all), 750)
+        eq_(len(calls), 4)
+        all = mozillians.get_all_groups_cached()
+        eq_(len(calls), 4)
+
+        # when there's nothing and someone else takes too long fetching
+        # it, it's fetched anyway but their lock is left be
+        cache.clear()
+        cache.set('all_mozillian_groupslock', True, 60)
+        with mock.patch('time.sleep'):
+            all = mozillians.get_all_groups_cached(wait=1)
+        eq_(len(all), 750)
+        eq_(len(calls), 6)
+        ok_(cache.get('all_mozillian_groupslock'))
+
+    @mock.patch('logging.error')
+    @mock.patch('airmozilla.base.mozillians.session.get')
+    def test_in_groups_cached(self, rget, rlogging):
+        cache.clear()
+        calls = []
+
+        def mocked_get(url, **options):
+            calls.append(url)
+            if 'peterbe' in url:
+                return Response(IN_GROUPS)
+            raise NotImplementedError(url)
+        rget.side_effect = mocked_get
+
+        ok_(mozillians.in_groups_cached('peterbe@gmail.com', 'winners'))
+        eq_(len(calls), 1)
+        ok_(mozillians.in_groups_cached('peterbe@gmail.com', 'winners'))
+        eq_(len(calls), 1)
+        # the negative answer is remembered too
+        ok_(not mozillians.in_groups_cached('peterbe@gmail.com', 'losers'))
+        ok_(not mozillians.in_groups_cached('peterbe@gmail.com', 'losers'))
+        eq_(len(calls), 2)
+        # the order of the groups doesn't matter
+        ok_(mozillians.in_groups_cached(
+            'peterbe@gmail.com', ['winners', 'losers']
+        ))
+        ok_(mozillians.in_groups_cached(
+            'PETERBE@gmail.com', ['losers', 'winners']
+        ))
+        eq_(len(calls), 3)
+
+        # when someone else is asking but takes too long, it asks too
+        # and leaves their lock be
+        lock_key = mozillians._make_in_groups_cache_key(
+            'peterbe@gmail.com', ['others']
+        ) + ':lock'
+        cache.set(lock_key, True, 60)
+        with mock.patch('time.sleep'):
+            ok_(not mozillians.in_groups_cached('peterbe@gmail.com', 'others'))
+        eq_(len(calls), 4)
+        ok_(cache.get(lock_key))
+
+    @mock.patch('logging.error')
+    @mock.patch('airmozilla.base.mozillians.session.get')
+    def test_prewarm_group_members(self, rget, rlogging):
+        cache.clear()
+        calls = []
+
+        def mocked_get(url, **options):
+            calls.append(url)
+            if 'groups=winners' in url and 'offset=0' in url:
+                return Response(IN_GROUPS)
+            raise NotImplementedError(url)
+        rget.side_effect = mocked_get
+
+        counts = mozillians.prewarm_group_members(['winners'])
+        eq_(counts, {'winners': 1})
+        eq_(len(calls), 1)
+
+        # now it doesn't need to ask
+        ok_(mozillians.in_groups_cached('peterbe@gmail.com', 'winners'))
+        ok_(not mozillians.in_groups_cached('other@gmail.com', 'winners'))
+        eq_(len(calls), 1)
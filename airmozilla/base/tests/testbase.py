@@ -4,6 +4,7 @@ import shutil
 from django.test import TestCase
 from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.core.files import File
 
 
@@ -12,6 +13,12 @@ class DjangoTestCase(TestCase):
     def shortDescription(self):
         return None
 
+    def setUp(self):
+        super(DjangoTestCase, self).setUp()
+        # what's cached by the previous test was rolled back without any
+        # signals to forget it
+        cache.clear()
+
     def tearDown(self):
         assert os.path.basename(settings.MEDIA_ROOT).startswith('testmedia')
         if os.path.isdir(settings.MEDIA_ROOT):
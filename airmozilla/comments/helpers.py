@@ -10,18 +10,14 @@ from airmozilla.comments.models import Comment
 
 
 @register.function
-def recurse_comments(comment, discussion,
-                     request, query_filter, can_manage_comments):
-    comments = Comment.objects.filter(reply_to=comment)
-    comments = comments.filter(query_filter)
+def recurse_comments(comment, discussion, request, can_manage_comments):
     context = {
-        'comments': comments.order_by('created'),
+        'comments': comment.replies,
         'discussion': discussion,
         'request': request,
         'Comment': Comment,
         'can_manage_comments': can_manage_comments,
         'root': False,
-        'query_filter': query_filter,
     }
     return jinja2.Markup(
         render_to_string('comments/comments.html', context)
@@ -4,6 +4,7 @@ from django.contrib.auth.models import User
 from django.dispatch import receiver
 
 from airmozilla.main.models import Event, SuggestedEvent
+from airmozilla.comments import pubsub
 
 
 class Comment(models.Model):
@@ -32,13 +33,14 @@ class Comment(models.Model):
 
 
 @receiver(models.signals.post_save, sender=Comment)
+@receiver(models.signals.post_delete, sender=Comment)
 def invalidate_latest_comment_cache(sender, instance, **kwargs):
-    event = instance.event
-    cache_keys = []
+    cache_keys = ['comments_version:%s' % instance.event_id]
     # there's one cache key for moderators and one for non-moderators
     for truth in (True, False):
-        cache_keys.append('latest_comment:%s:%s' % (event.id, truth))
-    [cache.delete(x) for x in cache_keys]
+        cache_keys.append('latest_comment:%s:%s' % (instance.event_id, truth))
+    cache.delete_many(cache_keys)
+    pubsub.publish(instance.event_id, instance.id)
 
 
 # class CommentVotes(models.Model):
@@ -0,0 +1,70 @@
+"""
+What comments of an event have changed, for the pages that have the
+event open to ask for just them (see views.event_data_updates).
+
+Every event has a generation number in the cache that goes up by one
+every time any of its comments is saved or deleted and the ID of that
+comment is kept in the cache for each generation.
+"""
+import time
+
+from django.core.cache import cache
+
+
+# how long the generations, and what changed in them, are remembered
+TTL = 60 * 60 * 24
+# asking for more changes than this means the page has to load them all
+MAX_CHANGES = 100
+
+
+def make_generation_cache_key(event_id):
+    return 'comments_generation:%s' % event_id
+
+
+def make_change_cache_key(event_id, generation):
+    return 'comments_change:%s:%s' % (event_id, generation)
+
+
+def _start(event_id):
+    # start where it can't be mistaken for a generation from before the
+    # cache forgot it
+    cache.add(make_generation_cache_key(event_id), int(time.time()), TTL)
+
+
+def get_generation(event_id):
+    generation = cache.get(make_generation_cache_key(event_id))
+    if generation is None:
+        _start(event_id)
+        generation = cache.get(make_generation_cache_key(event_id))
+    return generation
+
+
+def publish(event_id, comment_id):
+    """remember that this comment has changed in a new generation"""
+    _start(event_id)
+    generation = cache.incr(make_generation_cache_key(event_id))
+    cache.set(make_change_cache_key(event_id, generation), comment_id, TTL)
+    return generation
+
+
+def get_changes(event_id, generation):
+    """return the current generation and the IDs of the comments that
+    have changed since this generation, or None instead of the IDs if
+    that's not known any more."""
+    current = get_generation(event_id)
+    if generation == current:
+        return current, []
+    if generation > current or current - generation > MAX_CHANGES:
+        return current, None
+    cache_keys = [
+        make_change_cache_key(event_id, x)
+        for x in range(generation + 1, current + 1)
+    ]
+    changes = cache.get_many(cache_keys)
+    if len(changes) != len(cache_keys):
+        return current, None
+    comment_ids = []
+    for cache_key in cache_keys:
+        if changes[cache_key] not in comment_ids:
+            comment_ids.append(changes[cache_key])
+    return current, comment_ids
@@ -6,6 +6,9 @@ var Comments = (function() {
     var halt_reload_loop = false;
     var pause_reload_loop = false;
     var can_manage_comments = null;
+    var generation = null;
+    var halt_update_loop = false;
+    var reload_when_resumed = false;
 
     function approve_comment(clicked, container) {
         var parent = $(clicked).closest('.comment');
@@ -116,6 +119,72 @@ var Comments = (function() {
         });
     }
 
+    function bind_comments(scope, container) {
+        $('time.timeago', scope).timeago();
+        $('a.permalink', scope).click(function() {
+            $(this).closest('.comment').addClass('focus-on');
+            setTimeout(function() {
+                $('.focus-on').removeClass('focus-on');
+            }, 500);
+        });
+        $('a.action-reply', scope).click(function() {
+            var parent = $(this).closest('.comment');
+            $('form input[name="reply_to"]', container).val(parent.data('id'));
+            // put the comment form under this
+            var comment_container = $(this).closest('.comment');
+            $('form', container).detach().appendTo(comment_container);
+            $('form button.cancel', container).show();
+            $('textarea', container).focus();
+            return false;
+        });
+        $('a.action-approve', scope).click(function() {
+            approve_comment(this, container);
+            return false;
+        });
+        $('a.action-unapprove', scope).click(function() {
+            unapprove_comment(this, container);
+            return false;
+        });
+        $('a.action-remove', scope).click(function() {
+            remove_comment(this, container);
+            return false;
+        });
+        $('a.action-flag', scope).click(function() {
+            flag_comment(this, container);
+            return false;
+        });
+        $('a.action-unflag', scope).click(function() {
+            unflag_comment(this, container);
+            return false;
+        });
+    }
+
+    function apply_update(update, container) {
+        var existing = $('#comment-' + update.id, container);
+        if (update.removed) {
+            existing.remove();
+            return true;
+        }
+        var fragment = $($.trim(update.html));
+        if (existing.length) {
+            // its replies (and the form if replying to it) stay
+            existing.children('.comment, form').appendTo(fragment);
+            existing.replaceWith(fragment);
+        } else if (update.reply_to) {
+            var parent = $('#comment-' + update.reply_to, container);
+            if (!parent.length) {
+                return false;
+            }
+            parent.append(fragment);
+        } else {
+            // the "No comments posted here. Yet." if there were none
+            $('.comments-outer > p', container).remove();
+            $('.comments-outer', container).append(fragment);
+        }
+        bind_comments(fragment, container);
+        return true;
+    }
+
     return {
         load: function(container, callback) {
             var req = $.getJSON(container.data('url'));
@@ -127,44 +196,9 @@ var Comments = (function() {
                 }
                 can_manage_comments = response.can_manage_comments;
                 previous_latest_comment = response.latest_comment;
+                generation = response.generation;
                 $('.comments-outer', container).html(response.html).show();
-                $('time.timeago', container).timeago();
-                $('a.permalink', container).click(function() {
-                    $(this).closest('.comment').addClass('focus-on');
-                    setTimeout(function() {
-                        $('.focus-on').removeClass('focus-on');
-                    }, 500);
-                });
-                $('a.action-reply', container).click(function() {
-                    var parent = $(this).closest('.comment');
-                    $('form input[name="reply_to"]', container).val(parent.data('id'));
-                    // put the comment form under this
-                    var comment_container = $(this).closest('.comment');
-                    $('form', container).detach().appendTo(comment_container);
-                    $('form button.cancel', container).show();
-                    $('textarea', container).focus();
-                    return false;
-                });
-                $('a.action-approve', container).click(function() {
-                    approve_comment(this, container);
-                    return false;
-                });
-                $('a.action-unapprove', container).click(function() {
-                    unapprove_comment(this, container);
-                    return false;
-                });
-                $('a.action-remove', container).click(function() {
-                    remove_comment(this, container);
-                    return false;
-                });
-                $('a.action-flag', container).click(function() {
-                    flag_comment(this, container);
-                    return false;
-                });
-                $('a.action-unflag', container).click(function() {
-                    unflag_comment(this, container);
-                    return false;
-                });
+                bind_comments($('.comments-outer', container), container);
                 $('.failed-loading:visible', container).hide();
                 if (callback) callback();
             });
@@ -195,6 +229,58 @@ var Comments = (function() {
                 halt_reload_loop = true;
             });
         },
+        update_loop: function(container, fallback) {
+            if (halt_update_loop) {
+                return;
+            }
+            if (pause_reload_loop || generation === null) {
+                // try again when the comment form isn't being used
+                setTimeout(function() {
+                    Comments.update_loop(container, fallback);
+                }, 5 * 1000);
+                return;
+            }
+            if (reload_when_resumed) {
+                reload_when_resumed = false;
+                Comments.load(container);
+            }
+            var req = $.getJSON(container.data('updates-url'), {
+                generation: generation
+            });
+            req.then(function(response) {
+                var changed = response.reload || response.comments.length;
+                if (pause_reload_loop) {
+                    // don't change anything under the comment form but
+                    // reload them all once it's not being used
+                    if (changed) {
+                        reload_when_resumed = true;
+                    }
+                    generation = response.generation;
+                } else if (response.reload) {
+                    Comments.load(container);
+                } else {
+                    var applied = true;
+                    $.each(response.comments, function(i, update) {
+                        applied = applied && apply_update(update, container);
+                    });
+                    if (applied) {
+                        generation = response.generation;
+                    } else {
+                        Comments.load(container);
+                    }
+                }
+                // straight away if there might be more coming
+                setTimeout(function() {
+                    Comments.update_loop(container, fallback);
+                }, changed ? 1000 : 5 * 1000);
+            });
+            req.fail(function(response) {
+                console.warn('Error getting updates, so poll instead');
+                console.warn('Status', response.status);
+                halt_update_loop = true;
+                fallback();
+            });
+        },
         pause_loop: function() {
             pause_reload_loop = true;
         },
@@ -234,9 +320,16 @@ var Comments = (function() {
                     }
                 });
             }
-            setInterval(function() {
-                Comments.reload_loop(container);
-            }, 5 * 1000);
+            var poll = function() {
+                setInterval(function() {
+                    Comments.reload_loop(container);
+                }, 5 * 1000);
+            };
+            if (container.data('updates-url')) {
+                Comments.update_loop(container, poll);
+            } else {
+                poll();
+            }
         });
 
 
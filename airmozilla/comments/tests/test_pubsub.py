@@ -0,0 +1,46 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from nose.tools import eq_
+
+from airmozilla.comments import pubsub
+
+
+class TestPubSub(TestCase):
+
+    def setUp(self):
+        super(TestPubSub, self).setUp()
+        cache.clear()
+
+    def test_get_changes(self):
+        generation = pubsub.get_generation(1)
+        eq_(pubsub.get_changes(1, generation), (generation, []))
+
+        pubsub.publish(1, 10)
+        pubsub.publish(1, 11)
+        pubsub.publish(1, 10)
+        # other events have their own
+        pubsub.publish(2, 12)
+        eq_(
+            pubsub.get_changes(1, generation),
+            (generation + 3, [10, 11])
+        )
+        eq_(pubsub.get_changes(1, generation + 2), (generation + 3, [10]))
+        eq_(pubsub.get_changes(1, generation + 3), (generation + 3, []))
+
+    def test_get_changes_not_known(self):
+        generation = pubsub.get_generation(1)
+        pubsub.publish(1, 10)
+        # from the future
+        eq_(pubsub.get_changes(1, generation + 2), (generation + 1, None))
+
+        for i in range(pubsub.MAX_CHANGES):
+            pubsub.publish(1, 10)
+        eq_(
+            pubsub.get_changes(1, generation),
+            (generation + 1 + pubsub.MAX_CHANGES, None)
+        )
+
+        # the cache forgot
+        cache.delete(pubsub.make_change_cache_key(1, generation + 2))
+        eq_(pubsub.get_changes(1, generation + 1)[1], None)
@@ -6,6 +6,7 @@ import uuid
 import mock
 
 from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
 from django.contrib.auth.models import User
 from django.core import mail
@@ -71,6 +72,10 @@ class Response(object):
 class TestComments(TestCase):
     fixtures = ['airmozilla/manage/tests/main_testdata.json']
 
+    def setUp(self):
+        super(TestComments, self).setUp()
+        cache.clear()
+
     def _create_discussion(self, event, enabled=True, moderate_all=True,
                            notify_all=True):
         return Discussion.objects.create(
@@ -458,7 +463,7 @@ class TestComments(TestCase):
         eq_(response.status_code, 400)
 
     @mock.patch('logging.error')
-    @mock.patch('requests.get')
+    @mock.patch('airmozilla.base.mozillians.session.get')
     def test_fetch_user_name(self, rget, rlogging):
         cache.clear()
 
@@ -629,3 +634,154 @@ class TestComments(TestCase):
         response_second = self.client.get(url, {'include_posted': True})
         eq_(response_second.status_code, 200)
         eq_(response.content, response_second.content)
+
+    def _count_queries(self, url):
+        connection.use_debug_cursor = True
+        try:
+            before = len(connection.queries)
+            response = self.client.get(url)
+            eq_(response.status_code, 200)
+            return len(connection.queries) - before
+        finally:
+            connection.use_debug_cursor = False
+
+    def _create_comments(self, event, number, **kwargs):
+        bob, _ = User.objects.get_or_create(
+            username='bob',
+            email='bob@mozilla.com'
+        )
+        comments = []
+        for i in range(number):
+            comments.append(Comment.objects.create(
+                user=bob,
+                event=event,
+                comment='Comment %d' % i,
+                status=Comment.STATUS_APPROVED,
+                **kwargs
+            ))
+        return comments
+
+    def test_event_data_comments_tree(self):
+        event = Event.objects.get(title='Test event')
+        self._create_discussion(event)
+        first, second = self._create_comments(event, 2)
+        reply, = self._create_comments(event, 1, reply_to=first)
+        Comment.objects.create(
+            event=event,
+            comment='Reply to reply',
+            reply_to=reply,
+            status=Comment.STATUS_APPROVED
+        )
+        Comment.objects.create(
+            event=event,
+            comment='Not approved reply',
+            reply_to=reply,
+            status=Comment.STATUS_POSTED
+        )
+        url = reverse('comments:event_data', args=(event.pk,))
+        response = self.client.get(url)
+        eq_(response.status_code, 200)
+        html = json.loads(response.content)['html']
+        ok_(html.index('Comment 0') < html.index('Comment 1'))
+        # nested inside the first comment
+        first_html = html[:html.index('id="comment-%d"' % second.pk)]
+        ok_('Reply to reply' in first_html)
+        ok_('Not approved reply' not in html)
+
+        few = self._count_queries(url)
+        self._create_comments(event, 10, reply_to=second)
+        self._create_comments(event, 10, reply_to=reply)
+        eq_(self._count_queries(url), few)
+
+    def test_event_data_cached_html(self):
+        event = Event.objects.get(title='Test event')
+        self._create_discussion(event)
+        comment, = self._create_comments(event, 1)
+        url = reverse('comments:event_data', args=(event.pk,))
+        with self.settings(COMMENTS_HTML_CACHE_TTL=60):
+            response = self.client.get(url)
+            structure = json.loads(response.content)
+            ok_('Comment 0' in structure['html'])
+            eq_(
+                structure['latest_comment'],
+                calendar.timegm(comment.modified.utctimetuple())
+            )
+            queries = self._count_queries(url)
+            response_second = self.client.get(url)
+            eq_(response.content, response_second.content)
+
+            # the one posting it can see it before it's approved
+            richard = User.objects.create_user('richard', password='secret')
+            Comment.objects.create(
+                user=richard,
+                event=event,
+                comment='Not approved',
+                status=Comment.STATUS_POSTED
+            )
+            response = self.client.get(url)
+            ok_('Not approved' not in json.loads(response.content)['html'])
+            assert self.client.login(username='richard', password='secret')
+            response = self.client.get(url)
+            ok_('Not approved' in json.loads(response.content)['html'])
+
+            self.client.logout()
+            comment.status = Comment.STATUS_REMOVED
+            comment.save()
+            response = self.client.get(url)
+            ok_('Comment 0' not in json.loads(response.content)['html'])
+            # and now it's cached again
+            eq_(self._count_queries(url), queries)
+
+    def test_event_data_updates(self):
+        event = Event.objects.get(title='Test event')
+        self._create_discussion(event)
+        comment, = self._create_comments(event, 1)
+        url = reverse('comments:event_data', args=(event.pk,))
+        response = self.client.get(url)
+        generation = json.loads(response.content)['generation']
+
+        updates_url = reverse('comments:event_data_updates', args=(event.pk,))
+        response = self.client.get(updates_url, {'generation': generation})
+        eq_(response.status_code, 200)
+        eq_(
+            json.loads(response.content),
+            {'generation': generation, 'comments': []}
+        )
+
+        reply, = self._create_comments(event, 1, reply_to=comment)
+        posted = Comment.objects.create(
+            event=event,
+            comment='Not approved',
+            status=Comment.STATUS_POSTED
+        )
+        comment.status = Comment.STATUS_REMOVED
+        comment.save()
+        response = self.client.get(updates_url, {'generation': generation})
+        eq_(response.status_code, 200)
+        structure = json.loads(response.content)
+        eq_(structure['generation'], generation + 3)
+        eq_(
+            [x['id'] for x in structure['comments']],
+            [reply.id, posted.id, comment.id]
+        )
+        first, second, third = structure['comments']
+        eq_(first['reply_to'], comment.id)
+        ok_('id="comment-%d"' % reply.id in first['html'])
+        eq_(second, {'id': posted.id, 'removed': True})
+        eq_(third, {'id': comment.id, 'removed': True})
+
+        # when it's not known any more
+        response = self.client.get(updates_url, {'generation': 0})
+        eq_(response.status_code, 200)
+        eq_(json.loads(response.content), {
+            'generation': generation + 3,
+            'reload': True
+        })
+
+        response = self.client.get(updates_url, {'generation': 'x'})
+        eq_(response.status_code, 400)
+
+        # not waiting for events without a discussion
+        updates_url = reverse('comments:event_data_updates', args=(9999,))
+        response = self.client.get(updates_url, {'generation': generation})
+        eq_(response.status_code, 404)
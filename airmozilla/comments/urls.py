@@ -25,6 +25,9 @@ urlpatterns = patterns(
     url(r'unsubscribe/(?P<identifier>\w{10})/$',
         views.unsubscribe,
         name='unsubscribe_all'),
+    url(r'(?P<id>\d+)/updates/$',
+        views.event_data_updates,
+        name='event_data_updates'),
     url(r'(?P<id>\d+)/latest/$',
         views.event_data_latest,
         name='event_data_latest'),
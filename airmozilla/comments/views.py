@@ -1,19 +1,24 @@
 import calendar
+import collections
+import time
 
+from django.conf import settings
 from django.contrib.auth.models import User
 from django import http
 from django.shortcuts import get_object_or_404, render, redirect
 from django.template.loader import render_to_string
-from django.db.models import Q, Max
+from django.db.models import Q, Max, Count
 from django.core.cache import cache
 from django.db import transaction
 
 from jsonview.decorators import json_view
+from jsonview.exceptions import BadRequest
 
 from airmozilla.main.models import Event
 from .models import Comment, Discussion, Unsubscription
 from airmozilla.base.mozillians import fetch_user_name
 from . import forms
+from . import pubsub
 from . import sending
 
 
@@ -38,6 +43,110 @@ def get_latest_comment(event, include_posted=False):
             return calendar.timegm(latest_comment.utctimetuple())
 
 
+def get_comments_version(event_id):
+    """return a string that changes whenever any comment of this event
+    is saved or deleted"""
+    cache_key = 'comments_version:%s' % event_id
+    version = cache.get(cache_key)
+    if version is None:
+        aggregates = (
+            Comment.objects
+            .filter(event_id=event_id)
+            .aggregate(Max('modified'), Count('id'))
+        )
+        latest = aggregates['modified__max']
+        version = '%s:%s' % (
+            latest and latest.strftime('%Y%m%d%H%M%S%f'),
+            aggregates['id__count']
+        )
+        cache.set(cache_key, version, settings.COMMENTS_HTML_CACHE_TTL)
+    return version
+
+
+def get_comments_tree(comments, statuses, user_id=None):
+    """return the top-level comments, of all these comments of an event,
+    that have one of these statuses or are by this user. Each comment
+    gets the replies that do too as `.replies`."""
+    replies = collections.defaultdict(list)
+    for comment in comments:
+        if comment.status in statuses or (
+            user_id and comment.user_id == user_id
+        ):
+            replies[comment.reply_to_id].append(comment)
+    for comment in comments:
+        comment.replies = replies[comment.id]
+    return replies[None]
+
+
+def get_visible_statuses(_can_manage_comments):
+    """return the statuses of the comments, by others, that can be seen"""
+    statuses = [Comment.STATUS_APPROVED]
+    if _can_manage_comments:
+        statuses.append(Comment.STATUS_POSTED)
+    return statuses
+
+
+def render_comments(request, event, discussion, _can_manage_comments):
+    """return the HTML of the comments this user can see and the
+    timestamp of the latest comment.
+
+    The comments are the same for everyone who can manage them, or
+    everyone who can't, unless they have comments of their own that
+    aren't approved yet or have been removed. So for everyone else it's
+    cached till any comment of the event changes."""
+    statuses = get_visible_statuses(_can_manage_comments)
+    user_id = request.user.is_authenticated() and request.user.id or None
+
+    ttl = settings.COMMENTS_HTML_CACHE_TTL
+    if ttl:
+        cache_key = 'comments_html:%s:%s:%s:%s' % (
+            event.id,
+            int(_can_manage_comments),
+            int(request.is_secure()),
+            get_comments_version(event.id),
+        )
+        cached = cache.get(cache_key)
+        if cached is not None:
+            html, latest_comment, hidden_authors = cached
+            if user_id not in hidden_authors:
+                return html, latest_comment
+
+    comments = list(
+        Comment.objects
+        .filter(event=event)
+        .select_related('user')
+        .order_by('created')
+    )
+    hidden_authors = set(
+        x.user_id for x in comments
+        if x.user_id and x.status not in statuses
+    )
+    latest_comment = None
+    for comment in comments:
+        if _can_manage_comments or comment.status != Comment.STATUS_POSTED:
+            if not latest_comment or comment.modified > latest_comment:
+                latest_comment = comment.modified
+    if latest_comment:
+        latest_comment = calendar.timegm(latest_comment.utctimetuple())
+
+    sub_context = {
+        'comments': get_comments_tree(
+            comments,
+            statuses,
+            user_id=user_id in hidden_authors and user_id or None
+        ),
+        'discussion': discussion,
+        'request': request,
+        'Comment': Comment,
+        'can_manage_comments': _can_manage_comments,
+        'root': True,
+    }
+    html = render_to_string('comments/comments.html', sub_context)
+    if ttl and user_id not in hidden_authors:
+        cache.set(cache_key, (html, latest_comment, hidden_authors), ttl)
+    return html, latest_comment
+
+
 def can_manage_comments(user, discussion):
     """return true if this user can do administrative things to the
     comments such as moderating them.
@@ -165,38 +274,15 @@ def event_data(request, id):
         else:
             return http.HttpResponseBadRequest(str(form.errors))
 
-    comments = Comment.objects.filter(
-        event=event,
-        reply_to__isnull=True
-    )
-
-    if request.user.is_authenticated():
-        query_filter = Q(status=Comment.STATUS_APPROVED) | Q(user=request.user)
-        if _can_manage_comments:
-            query_filter = query_filter | Q(status=Comment.STATUS_POSTED)
-    else:
-        query_filter = Q(status=Comment.STATUS_APPROVED)
-
-    comments = comments.filter(query_filter)
-
-    sub_context = {
-        'comments': comments.order_by('created'),
-        'discussion': discussion,
-        'request': request,
-        'Comment': Comment,
-        'can_manage_comments': _can_manage_comments,
-        'root': True,
-        'query_filter': query_filter,
-    }
-    context['html'] = render_to_string(
-        'comments/comments.html',
-        sub_context
-    )
-    context['can_manage_comments'] = _can_manage_comments
-    context['latest_comment'] = get_latest_comment(
+    # before rendering so nothing that changes meanwhile is missed
+    context['generation'] = pubsub.get_generation(event.id)
+    context['html'], context['latest_comment'] = render_comments(
+        request,
         event,
-        include_posted=_can_manage_comments
+        discussion,
+        _can_manage_comments
     )
+    context['can_manage_comments'] = _can_manage_comments
     return context
 
 
@@ -223,6 +309,69 @@ def event_data_latest(request, id):
     return {'latest_comment': latest_comment}
 
 
+@json_view
+def event_data_updates(request, id):
+    """return the comments that have changed since the `generation` the
+    page last got, rendered one by one without their replies. If there
+    are none yet it waits up to settings.COMMENTS_LONG_POLL_SECONDS for
+    some. If it's not known what's changed it says to `reload` them all
+    instead."""
+    try:
+        generation = int(request.GET['generation'])
+    except (KeyError, ValueError):
+        raise BadRequest('Invalid generation')
+    # before waiting for anything
+    discussion = get_object_or_404(Discussion, event__pk=id, enabled=True)
+
+    until = time.time() + settings.COMMENTS_LONG_POLL_SECONDS
+    current, comment_ids = pubsub.get_changes(id, generation)
+    # only the cache is asked whilst waiting
+    while comment_ids == [] and time.time() < until:
+        time.sleep(1)
+        current, comment_ids = pubsub.get_changes(id, generation)
+
+    context = {'generation': current}
+    if comment_ids is None:
+        context['reload'] = True
+        return context
+    context['comments'] = []
+    if not comment_ids:
+        return context
+
+    _can_manage_comments = can_manage_comments(request.user, discussion)
+    statuses = get_visible_statuses(_can_manage_comments)
+    comments = (
+        Comment.objects
+        .filter(event_id=discussion.event_id, id__in=comment_ids)
+        .select_related('user')
+    )
+    comments = dict((x.id, x) for x in comments)
+    for comment_id in comment_ids:
+        comment = comments.get(comment_id)
+        if comment is None or (
+            comment.status not in statuses and not (
+                request.user.is_authenticated() and
+                comment.user_id == request.user.id
+            )
+        ):
+            context['comments'].append({'id': comment_id, 'removed': True})
+            continue
+        comment.replies = []
+        context['comments'].append({
+            'id': comment.id,
+            'reply_to': comment.reply_to_id,
+            'html': render_to_string('comments/comments.html', {
+                'comments': [comment],
+                'discussion': discussion,
+                'request': request,
+                'Comment': Comment,
+                'can_manage_comments': _can_manage_comments,
+                'root': False,
+            }),
+        })
+    return context
+
+
 def _first_last_name(name):
     _split = name.rsplit(None, 1)
     if len(_split) == 1:
@@ -12,9 +12,10 @@ from airmozilla.main.models import (
     Event,
     Channel,
     EventHitStats,
-    most_recent_event
+    most_recent_event,
+    get_next_transition
 )
-from airmozilla.main.views import is_contributor
+from airmozilla.main.views import get_privacy_tier
 from airmozilla.search.forms import SearchForm
 
 
@@ -38,7 +39,8 @@ def sidebar(request):
     else:
         channels = Channel.objects.filter(slug=settings.DEFAULT_CHANNEL_SLUG)
 
-    feed_privacy = _get_feed_privacy(request.user)
+    privacy_tier = get_privacy_tier(request)
+    feed_privacy = privacy_tier.tier
 
     if settings.DEFAULT_CHANNEL_SLUG in [x.slug for x in channels]:
         feed_title = 'AirMozilla RSS'
@@ -53,8 +55,8 @@ def sidebar(request):
     data['feed_title'] = feed_title
     data['feed_url'] = feed_url
 
-    data['upcoming'] = get_upcoming_events(channels, request.user)
-    data['featured'] = get_featured_events(channels, request.user)
+    data['upcoming'] = get_upcoming_events(channels, privacy_tier)
+    data['featured'] = get_featured_events(channels, privacy_tier)
 
     data['sidebar_top'] = None
     data['sidebar_bottom'] = None
@@ -77,21 +79,21 @@ def sidebar(request):
     return data
 
 
-def get_upcoming_events(channels, user,
+def get_upcoming_events(channels, privacy_tier,
                         length=settings.UPCOMING_SIDEBAR_COUNT):
     """return a queryset of upcoming events"""
-    anonymous = True
-    contributor = False
-    if user.is_active:
-        anonymous = False
-        if is_contributor(user):
-            contributor = True
+    anonymous = privacy_tier.anonymous
+    contributor = privacy_tier.contributor
 
     cache_key = 'upcoming_events_%s_%s' % (int(anonymous), int(contributor))
     cache_key += ','.join(str(x.id) for x in channels)
     event = most_recent_event()
     if event:
         cache_key += str(event.modified.microsecond)
+    # so it's not still cached once the first of them has gone live
+    transition = get_next_transition()
+    if transition:
+        cache_key += transition.strftime('_%Y%m%d%H%M%S')
     upcoming = cache.get(cache_key)
     if upcoming is None:
         upcoming = _get_upcoming_events(channels, anonymous, contributor)
@@ -102,7 +104,7 @@ def get_upcoming_events(channels, user,
 
 def _get_upcoming_events(channels, anonymous, contributor):
     """do the heavy lifting of getting the featured events"""
-    upcoming = Event.objects.upcoming().order_by('start_time')
+    upcoming = Event.objects.upcoming().summary().order_by('start_time')
     upcoming = upcoming.filter(channels__in=channels).distinct()
     upcoming = upcoming.select_related('picture')
 
@@ -113,15 +115,11 @@ def _get_upcoming_events(channels, anonymous, contributor):
     return upcoming
 
 
-def get_featured_events(channels, user,
+def get_featured_events(channels, privacy_tier,
                         length=settings.FEATURED_SIDEBAR_COUNT):
     """return a list of events that are sorted by their score"""
-    anonymous = True
-    contributor = False
-    if user.is_active:
-        anonymous = False
-        if is_contributor(user):
-            contributor = True
+    anonymous = privacy_tier.anonymous
+    contributor = privacy_tier.contributor
 
     cache_key = 'featured_events_%s_%s' % (int(anonymous), int(contributor))
     cache_key += ','.join(str(x.id) for x in channels)
@@ -164,6 +162,9 @@ def _get_featured_events(channels, anonymous, contributor):
     elif contributor:
         featured = featured.exclude(event__privacy=Event.PRIVACY_COMPANY)
     featured = featured.select_related('event__picture')
+    featured = featured.defer(*(
+        'event__%s' % x for x in Event.SUMMARY_DEFERRED_FIELDS
+    ))
     return featured
 
 
@@ -180,20 +181,6 @@ def analytics(request):
     return {'include_analytics': include}
 
 
-def _get_feed_privacy(user):
-    """return 'public', 'contributors' or 'company' depending on the user
-    profile.
-    Because this is used very frequently and because it's expensive to
-    pull out the entire user profile every time, we use cache to remember
-    if the user is a contributor or not (applicable only if logged in)
-    """
-    if user.is_active:
-        if is_contributor(user):
-            return 'contributors'
-        return 'company'
-    return 'public'
-
-
 def browserid(request):
     # by making this a function, it means we only need to run this
     # when ``redirect_next()`` is called
@@ -23,11 +23,33 @@ class EnvironmentFormField(Field):
         return built
 
 
+class LazyJSONDescriptor(object):
+    """Like what `models.SubfieldBase` does but the value is only
+    converted with `to_python()` when it's first accessed, so listings
+    don't decode JSON they never look at."""
+
+    def __init__(self, field):
+        self.field = field
+
+    def __get__(self, obj, type=None):
+        if obj is None:
+            raise AttributeError('Can only be accessed via an instance.')
+        value = obj.__dict__[self.field.name]
+        if isinstance(value, basestring):
+            value = self.field.to_python(value)
+            obj.__dict__[self.field.name] = value
+        return value
+
+    def __set__(self, obj, value):
+        obj.__dict__[self.field.name] = value
+
+
 class EnvironmentField(models.TextField):
     """Generic textfield that serializes/unserializes JSON objects"""
 
-    # Used so to_python() is called
-    __metaclass__ = models.SubfieldBase
+    def contribute_to_class(self, cls, name):
+        super(EnvironmentField, self).contribute_to_class(cls, name)
+        setattr(cls, self.name, LazyJSONDescriptor(self))
 
     def to_python(self, value):
         """Convert string value to JSON"""
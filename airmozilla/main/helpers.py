@@ -1,5 +1,4 @@
 import locale
-import time
 import urllib
 import json
 
@@ -8,15 +7,17 @@ import jinja2
 
 from django.utils.text import Truncator
 from django.utils import timezone
-from django.db.utils import IntegrityError
 from django.contrib.sites.models import RequestSite
 from django.utils.safestring import mark_safe
 from django.utils.html import escape
 
 from jingo import register
-from sorl.thumbnail import get_thumbnail
 
 from airmozilla.base.utils import unhtml
+from airmozilla.main.thumbnails import (
+    get_thumbnail_or_placeholder,
+    ThumbnailBatch
+)
 
 
 @register.filter
@@ -75,17 +76,9 @@ def truncate_chars(text, chars):
 
 @register.function
 def thumbnail(filename, geometry, **options):
-    try:
-        return get_thumbnail(filename, geometry, **options)
-    except IOError:
-        return None
-    except IntegrityError:
-        # annoyingly, this happens sometimes because kvstore in sorl
-        # doesn't check before writing properly
-        # see https://bugzilla.mozilla.org/show_bug.cgi?id=817765
-        # try again
-        time.sleep(1)
-        return thumbnail(filename, geometry, **options)
+    """return the thumbnail if it has been generated already, or else
+    a placeholder of the same size. See airmozilla.main.thumbnails."""
+    return get_thumbnail_or_placeholder(filename, geometry, **options)
 
 
 @register.function
@@ -146,18 +139,45 @@ def safe_html(text):
     return jinja2.Markup(text)
 
 
+def _get_event_image(event):
+    return event.picture and event.picture.file or event.placeholder_img
+
+
+@register.function
+def prefetch_thumbnails(events, *geometries, **options):
+    """look up the thumbnails of all the events in one go. Pass what this
+    returns as `thumbnails` to `show_thumbnail()` or use its `get()`
+    method instead of `thumbnail()`. Each call is a lookup of its own so
+    call it once per listing, not once per event.
+
+        {% set thumbnails = prefetch_thumbnails(events, '160x90') %}
+    """
+    geometries = geometries or ('160x90',)
+    options.setdefault('crop', 'center')
+    items = []
+    for event in events:
+        image = _get_event_image(event)
+        for geometry in geometries:
+            items.append((image, geometry, options))
+    return ThumbnailBatch(items)
+
+
 @register.function
 def show_thumbnail(
     event,
     geometry='160x90',
     crop='center',
     alt=None,
-    image=None
+    image=None,
+    thumbnails=None
 ):
     alt = alt or event.title
     if not image:
-        image = event.picture and event.picture.file or event.placeholder_img
-    thumb = thumbnail(image, geometry, crop=crop)
+        image = _get_event_image(event)
+    if thumbnails is not None:
+        thumb = thumbnails.get(image, geometry, crop=crop)
+    else:
+        thumb = thumbnail(image, geometry, crop=crop)
     html = (
         '<img src="%(url)s" width="%(width)s" height="%(height)s" '
         'alt="%(alt)s" class="wp-post-image">' % {
@@ -0,0 +1,8 @@
+from airmozilla.main.views import PrivacyTier
+
+
+class PrivacyTierMiddleware(object):
+    """attaches a PrivacyTier as `request.privacy_tier`"""
+
+    def process_request(self, request):
+        request.privacy_tier = PrivacyTier(request.user)
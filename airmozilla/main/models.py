@@ -1,14 +1,18 @@
+import calendar
+import collections
 import datetime
 import hashlib
 import os
 import unicodedata
+import uuid
 
 from django.conf import settings
 from django.contrib.auth.models import Group, User
+from django.contrib.flatpages.models import FlatPage
 from django.core.cache import cache
 from django.db import models
 from django.db.models import Q
-from django.dispatch import receiver
+from django.dispatch import receiver, Signal
 from django.utils import timezone
 
 from airmozilla.base.utils import unique_slugify
@@ -23,11 +27,25 @@ def _get_now():
     return timezone.now()
 
 
-def _get_live_time():
-    return (_get_now() +
+def _get_live_time(now=None):
+    return ((now or _get_now()) +
             datetime.timedelta(minutes=settings.LIVE_MARGIN))
 
 
+def _get_bucketed_now():
+    """return the current time rounded down to the nearest
+    settings.NOW_BUCKET_SECONDS. Listings made with it, and what's
+    cached of them, are the same for everyone for that long.
+    Never use it for anything that is written down."""
+    now = _get_now()
+    if not settings.NOW_BUCKET_SECONDS:
+        return now
+    seconds = calendar.timegm(now.utctimetuple())
+    return now.replace(microsecond=0) - datetime.timedelta(
+        seconds=seconds % settings.NOW_BUCKET_SECONDS
+    )
+
+
 class UserProfile(models.Model):
     user = models.ForeignKey(User)
     contributor = models.BooleanField(default=False)
@@ -220,50 +238,68 @@ class RecruitmentMessage(models.Model):
         return self.text
 
 
+class EventQuerySet(models.query.QuerySet):
+
+    def summary(self, *also_defer):
+        """defer the columns that listings don't show and that can be big
+        (see `Event.SUMMARY_DEFERRED_FIELDS`) plus any others listed."""
+        return self.defer(*(self.model.SUMMARY_DEFERRED_FIELDS + also_defer))
+
+
 class EventManager(models.Manager):
+    def get_query_set(self):
+        return EventQuerySet(self.model, using=self._db)
+
+    def summary(self, *also_defer):
+        return self.get_query_set().summary(*also_defer)
+
     def initiated(self):
-        return (self.get_query_set().filter(Q(status=Event.STATUS_INITIATED) |
-                                            Q(approval__approved=False) |
-                                            Q(approval__processed=False))
-                    .distinct())
+        return self.get_query_set().filter(
+            Q(status=Event.STATUS_INITIATED) |
+            ~Q(approval_state=Event.APPROVAL_STATE_APPROVED)
+        )
 
     def approved(self):
-        return (self.get_query_set().exclude(approval__approved=False)
-                    .exclude(approval__processed=False)
-                    .filter(status=Event.STATUS_SCHEDULED))
+        return self.get_query_set().filter(
+            status=Event.STATUS_SCHEDULED,
+            approval_state=Event.APPROVAL_STATE_APPROVED
+        )
 
     def upcoming(self):
         return self.approved().filter(
             archive_time=None,
-            start_time__gt=_get_live_time()
+            start_time__gt=_get_live_time(_get_bucketed_now())
         )
 
     def live(self):
         return self.approved().filter(
             archive_time=None,
-            start_time__lt=_get_live_time()
+            start_time__lt=_get_live_time(_get_bucketed_now())
         )
 
     def archiving(self):
+        _now = _get_bucketed_now()
         return self.approved().filter(
-            archive_time__gt=_get_now(),
-            start_time__lt=_get_live_time()
+            archive_time__gt=_now,
+            start_time__lt=_get_live_time(_now)
         )
 
     def archived(self):
-        _now = _get_now()
+        _now = _get_bucketed_now()
         return self.approved().filter(
             archive_time__lt=_now,
             start_time__lt=_now
         )
 
     def archived_and_removed(self):
-        _now = _get_now()
+        _now = _get_bucketed_now()
         return self.get_query_set().filter(
-            (Q(archive_time__lt=_now, start_time__lt=_now)
-             & ~Q(approval__approved=False)
-             & ~Q(approval__processed=False)
-             & Q(status=Event.STATUS_SCHEDULED))
+            Q(
+                archive_time__lt=_now,
+                start_time__lt=_now,
+                status=Event.STATUS_SCHEDULED,
+                approval_state=Event.APPROVAL_STATE_APPROVED
+            )
             | Q(status=Event.STATUS_REMOVED)
         )
 
@@ -292,6 +328,22 @@ class Event(models.Model):
     )
     status = models.CharField(max_length=20, choices=STATUS_CHOICES,
                               default=STATUS_INITIATED, db_index=True)
+    # what all its Approvals add up to, kept up to date by signals
+    APPROVAL_STATE_APPROVED = 'approved'
+    APPROVAL_STATE_PENDING = 'pending'
+    APPROVAL_STATE_REJECTED = 'rejected'
+    APPROVAL_STATE_CHOICES = (
+        (APPROVAL_STATE_APPROVED, 'Approved (or no approval needed)'),
+        (APPROVAL_STATE_PENDING, 'Waiting for approval'),
+        (APPROVAL_STATE_REJECTED, 'Not approved'),
+    )
+    approval_state = models.CharField(
+        max_length=20,
+        choices=APPROVAL_STATE_CHOICES,
+        default=APPROVAL_STATE_APPROVED,
+        db_index=True,
+        editable=False
+    )
     placeholder_img = ImageField(
         upload_to=_upload_path('event-placeholder'),
         blank=True,
@@ -355,14 +407,20 @@ class Event(models.Model):
     modified_user = models.ForeignKey(User, related_name='modified_user',
                                       blank=True, null=True,
                                       on_delete=models.SET_NULL)
-    modified = models.DateTimeField(auto_now=True)
+    modified = models.DateTimeField(auto_now=True, db_index=True)
     objects = EventManager()
 
+    # only shown on the event page itself
+    SUMMARY_DEFERRED_FIELDS = ('transcript', 'call_info', 'additional_links')
+
     class Meta:
         permissions = (
             ('change_event_others', 'Can edit events created by other users'),
             ('add_event_scheduled', 'Can create events with scheduled status')
         )
+        index_together = (
+            ('status', 'approval_state', 'privacy', 'start_time'),
+        )
 
     def __unicode__(self):
         return self.title
@@ -391,13 +449,10 @@ class Event(models.Model):
         )
 
     def needs_approval(self):
-        if self.is_scheduled():
-            for approval in Approval.objects.filter(event=self):
-                if approval.processed:
-                    return False
-                if not approval.approved:
-                    return True
-        return False
+        return (
+            self.is_scheduled() and
+            self.approval_state == self.APPROVAL_STATE_PENDING
+        )
 
     def has_vidly_template(self):
         return self.template and 'Vid.ly' in self.template.name
@@ -424,6 +479,37 @@ def reset_most_recent_event(sender, instance, *args, **kwargs):
     cache.delete(cache_key)
 
 
+def get_next_transition():
+    """return when an event next goes live or gets archived, as far as
+    is known now, or None if nothing is scheduled to. It's remembered till
+    then (or till an event or approval changes) so listings cached with it
+    in their cache key are forgotten the moment they'd be different."""
+    cache_key = 'next_transition'
+    now = _get_bucketed_now()
+    cached = cache.get(cache_key)
+    if cached is not None:
+        transition, = cached
+        if transition is None or transition > now:
+            return transition
+
+    transitions = []
+    starts = Event.objects.upcoming().aggregate(
+        models.Min('start_time')
+    )['start_time__min']
+    if starts:
+        transitions.append(
+            starts - datetime.timedelta(minutes=settings.LIVE_MARGIN)
+        )
+    archives = Event.objects.approved().filter(
+        archive_time__gt=now
+    ).aggregate(models.Min('archive_time'))['archive_time__min']
+    if archives:
+        transitions.append(archives)
+    transition = transitions and min(transitions) or None
+    cache.set(cache_key, (transition,), 60 * 60)
+    return transition
+
+
 class EventRevisionManager(models.Manager):
 
     def create_from_event(self, event, user=None):
@@ -617,6 +703,89 @@ class Approval(models.Model):
     comment = models.TextField(blank=True)
 
 
+def get_approval_state(event_id):
+    """return what the approvals of the event add up to"""
+    state = Event.APPROVAL_STATE_APPROVED
+    qs = Approval.objects.filter(event_id=event_id)
+    for approved, processed in qs.values_list('approved', 'processed'):
+        if not processed:
+            return Event.APPROVAL_STATE_PENDING
+        if not approved:
+            state = Event.APPROVAL_STATE_REJECTED
+    return state
+
+
+def fix_approval_states(dry_run=False):
+    """check the approval state of every event and fix those that are
+    wrong. Returns a dict of the IDs of the events that were wrong by the
+    state they should have had."""
+    states = collections.defaultdict(lambda: Event.APPROVAL_STATE_APPROVED)
+    qs = Approval.objects.values_list('event_id', 'approved', 'processed')
+    for event_id, approved, processed in qs:
+        if not processed:
+            states[event_id] = Event.APPROVAL_STATE_PENDING
+        elif not approved and (
+            states[event_id] != Event.APPROVAL_STATE_PENDING
+        ):
+            states[event_id] = Event.APPROVAL_STATE_REJECTED
+
+    wrong = collections.defaultdict(list)
+    for event_id, state in Event.objects.values_list('id', 'approval_state'):
+        if states[event_id] != state:
+            wrong[states[event_id]].append(event_id)
+    if not dry_run:
+        for state, event_ids in wrong.items():
+            Event.objects.filter(id__in=event_ids).update(approval_state=state)
+    return dict(wrong)
+
+
+# Sent when update_approval_state() changes the approval state of an
+# event, since the event isn't saved then.
+approval_state_changed = Signal(providing_args=['event_id', 'old', 'new'])
+
+
+@receiver(models.signals.post_save, sender=Approval)
+@receiver(models.signals.post_delete, sender=Approval)
+def update_approval_state(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    state = get_approval_state(instance.event_id)
+    qs = Event.objects.filter(id=instance.event_id)
+    for old in qs.exclude(approval_state=state).values_list(
+        'approval_state', flat=True
+    ):
+        # without signals so the Event isn't saved as a whole
+        qs.update(approval_state=state)
+        approval_state_changed.send(
+            sender=Event,
+            event_id=instance.event_id,
+            old=old,
+            new=state
+        )
+    event = getattr(
+        instance,
+        Approval._meta.get_field('event').get_cache_name(),
+        None
+    )
+    if event is not None:
+        event.approval_state = state
+
+
+@receiver(models.signals.pre_save, sender=Event)
+def event_refresh_approval_state(sender, instance, raw, **kwargs):
+    # never save an approval state that's gone stale in memory
+    if instance.id and not raw:
+        instance.approval_state = get_approval_state(instance.id)
+
+
+@receiver(models.signals.post_save, sender=Event)
+@receiver(models.signals.post_delete, sender=Event)
+@receiver(models.signals.post_save, sender=Approval)
+@receiver(models.signals.post_delete, sender=Approval)
+def reset_next_transition(sender, instance, *args, **kwargs):
+    cache.delete('next_transition')
+
+
 class VidlySubmission(models.Model):
     event = models.ForeignKey(Event)
     url = models.URLField()
@@ -628,6 +797,30 @@ class VidlySubmission(models.Model):
     submission_error = models.TextField(blank=True, null=True)
 
 
+class VideoInfo(models.Model):
+    """Metadata about an event's video file as extracted with ffprobe."""
+    event = models.OneToOneField(Event)
+    duration = models.PositiveIntegerField(null=True)  # seconds
+    width = models.PositiveIntegerField(null=True)
+    height = models.PositiveIntegerField(null=True)
+    video_codec = models.CharField(max_length=50, blank=True)
+    audio_codec = models.CharField(max_length=50, blank=True)
+    format_name = models.CharField(max_length=100, blank=True)
+    bitrate = models.PositiveIntegerField(null=True)  # bits per second
+    size = models.BigIntegerField(null=True)  # bytes
+    # if it was the HD version (hd_mp4) of a Vid.ly video that was probed
+    hd = models.BooleanField(default=False)
+    modified = models.DateTimeField(auto_now=True)
+
+    def __repr__(self):
+        return "<%s: %dx%d %s>" % (
+            self.__class__.__name__,
+            self.width or 0,
+            self.height or 0,
+            self.video_codec,
+        )
+
+
 @receiver(models.signals.post_save, sender=Event)
 @receiver(models.signals.post_save, sender=Approval)
 def event_clear_cache(sender, **kwargs):
@@ -638,6 +831,18 @@ def event_clear_cache(sender, **kwargs):
     cache.delete('autocomplete:patterns')
 
 
+def make_slug_cache_key(slug):
+    """return the cache key for what the slug in an URL like
+    `/<slug>/` matches, in any case."""
+    return 'slug-matches:%s' % hashlib.md5(
+        slug.lower().encode('utf-8')
+    ).hexdigest()
+
+
+def forget_slugs(*slugs):
+    cache.delete_many([make_slug_cache_key(x) for x in slugs if x])
+
+
 @receiver(models.signals.pre_save, sender=Event)
 def event_update_slug(sender, instance, raw, *args, **kwargs):
     if raw:
@@ -645,15 +850,50 @@ def event_update_slug(sender, instance, raw, *args, **kwargs):
     if not instance.slug:
         instance.slug = unique_slugify(instance.title, [Event, EventOldSlug],
                                        instance.start_time.strftime('%Y%m%d'))
+    # whatever the new slug resolved to before (most likely nothing),
+    # it's now this event
+    forget_slugs(instance.slug)
     try:
         old = Event.objects.get(id=instance.id)
         if instance.slug != old.slug:
             [x.delete() for x in EventOldSlug.objects.filter(slug=old.slug)]
             EventOldSlug.objects.create(slug=old.slug, event=instance)
+            # all the old slugs now need to redirect to the new one
+            forget_slugs(*(
+                [old.slug] +
+                [
+                    x[0] for x in
+                    EventOldSlug.objects.filter(event=instance)
+                    .values_list('slug')
+                ]
+            ))
     except Event.DoesNotExist:
         pass
 
 
+@receiver(models.signals.post_delete, sender=Event)
+def event_forget_slug(sender, instance, **kwargs):
+    forget_slugs(instance.slug)
+
+
+class EventTombstone(models.Model):
+    """Remembers that an event has been deleted so that whoever has a copy
+    of it (e.g. the manage events page) can find out."""
+    event_id = models.IntegerField()
+    deleted = models.DateTimeField(default=_get_now, db_index=True)
+
+
+@receiver(models.signals.post_delete, sender=Event)
+def event_create_tombstone(sender, instance, **kwargs):
+    EventTombstone.objects.create(event_id=instance.id)
+
+
+@receiver(models.signals.post_save, sender=FlatPage)
+@receiver(models.signals.post_delete, sender=FlatPage)
+def flatpage_forget_slug(sender, instance, **kwargs):
+    forget_slugs(instance.url.strip('/'))
+
+
 @receiver(models.signals.pre_save, sender=Event)
 def event_consistent_times(sender, instance, raw, *arg, **kwargs):
     # Fix an edge case with disappearing events.
@@ -694,8 +934,24 @@ class URLTransform(models.Model):
     order = models.IntegerField(default=1)
 
 
+class QuarantinedEvent(models.Model):
+    """Events that a background job (e.g. fetching durations) failed to
+    process and should leave alone for a while."""
+    event = models.ForeignKey(Event)
+    job = models.CharField(max_length=100)
+    reason = models.TextField(blank=True)
+    created = models.DateTimeField(default=_get_now)
+    expires = models.DateTimeField(db_index=True)
+
+    class Meta:
+        unique_together = ('event', 'job')
+
+    def __unicode__(self):
+        return '%s (%s)' % (self.job, self.reason)
+
+
 class EventHitStats(models.Model):
-    event = models.ForeignKey(Event, unique=True, db_index=True)
+    event = models.OneToOneField(Event)
     total_hits = models.IntegerField()
     shortcode = models.CharField(max_length=100)
     modified = models.DateTimeField(default=_get_now)
@@ -708,6 +964,109 @@ def update_modified(sender, instance, raw, *args, **kwargs):
     instance.modified = _get_now()
 
 
+def make_event_context_cache_key(event_id, privacy_tier):
+    """return the cache key for the parts of the event page that are the
+    same for everyone in the same privacy tier (see
+    `airmozilla.main.views.PrivacyTier`)"""
+    return 'event-context:%s:%s' % (event_id, privacy_tier)
+
+
+def make_event_video_version_cache_key(event_id):
+    return 'event-video-version:%s' % event_id
+
+
+def get_event_video_version(event_id):
+    """return a string that changes whenever the embeddable video page
+    of this event has to be rendered again"""
+    cache_key = make_event_video_version_cache_key(event_id)
+    version = cache.get(cache_key)
+    if version is None:
+        version = uuid.uuid4().hex
+        cache.set(cache_key, version, settings.EVENT_VIDEO_CACHE_TTL)
+    return version
+
+
+def make_event_video_cache_key(event_id, autoplay, host, secure):
+    """return the cache key for the rendered embeddable video page.
+    Its absolute URLs depend on the host and scheme it's requested with,
+    and since they can't all be known when it has to be forgotten it's
+    forgotten by changing its version (see `get_event_video_version()`)."""
+    return 'event-video:%s:%s:%d:%d:%s' % (
+        event_id,
+        get_event_video_version(event_id),
+        autoplay,
+        secure,
+        hashlib.md5(host.encode('utf-8')).hexdigest()
+    )
+
+
+def forget_event_context(*event_ids):
+    cache.delete_many([
+        make_event_context_cache_key(event_id, privacy_tier)
+        for event_id in event_ids
+        for privacy_tier, __ in Event.PRIVACY_CHOICES
+    ] + [
+        make_event_video_version_cache_key(event_id)
+        for event_id in event_ids
+    ])
+
+
+@receiver(models.signals.post_save, sender=Event)
+@receiver(models.signals.post_delete, sender=Event)
+def event_forget_context(sender, instance, **kwargs):
+    forget_event_context(instance.id)
+
+
+@receiver(models.signals.post_save, sender=Approval)
+@receiver(models.signals.post_delete, sender=Approval)
+@receiver(models.signals.post_save, sender=CuratedGroup)
+@receiver(models.signals.post_delete, sender=CuratedGroup)
+@receiver(models.signals.post_save, sender=EventHitStats)
+@receiver(models.signals.post_delete, sender=EventHitStats)
+@receiver(models.signals.post_save, sender=VidlySubmission)
+@receiver(models.signals.post_delete, sender=VidlySubmission)
+def event_related_forget_context(sender, instance, **kwargs):
+    forget_event_context(instance.event_id)
+
+
+@receiver(models.signals.m2m_changed, sender=Event.participants.through)
+@receiver(models.signals.m2m_changed, sender=Event.tags.through)
+@receiver(models.signals.m2m_changed, sender=Event.channels.through)
+def event_m2m_forget_context(sender, instance, action, reverse, pk_set,
+                             **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        forget_event_context(instance.id)
+    elif pk_set:
+        forget_event_context(*pk_set)
+    else:
+        # e.g. `participant.event_set.clear()`
+        forget_event_context(*(
+            sender.objects
+            .filter(**{instance._meta.module_name: instance})
+            .values_list('event_id', flat=True)
+        ))
+
+
+@receiver(models.signals.post_save, sender=Participant)
+@receiver(models.signals.post_save, sender=Tag)
+@receiver(models.signals.post_save, sender=Channel)
+def m2m_related_forget_context(sender, instance, created, raw, **kwargs):
+    if raw or created:
+        return
+    through = {
+        Participant: Event.participants.through,
+        Tag: Event.tags.through,
+        Channel: Event.channels.through,
+    }[sender]
+    forget_event_context(*(
+        through.objects
+        .filter(**{instance._meta.module_name: instance})
+        .values_list('event_id', flat=True)
+    ))
+
+
 class LocationDefaultEnvironment(models.Model):
     location = models.ForeignKey(Location)
     privacy = models.CharField(max_length=40, choices=Event.PRIVACY_CHOICES,
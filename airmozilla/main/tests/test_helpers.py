@@ -7,15 +7,18 @@ from nose.tools import eq_, ok_
 import jinja2
 
 from django.conf import settings
+from django.core.cache import cache
 from django.db.utils import IntegrityError
 from django.test.client import RequestFactory
+from django.test.utils import override_settings
 
 from funfactory.urlresolvers import reverse
 
 from airmozilla.base.tests.testbase import DjangoTestCase
+from airmozilla.main import thumbnails
+from airmozilla.main.thumbnails import get_thumbnail, generate_thumbnail
 from airmozilla.main.helpers import (
     thumbnail,
-    get_thumbnail,
     pluralize,
     short_desc,
     truncate_words,
@@ -28,7 +31,7 @@ from airmozilla.main.helpers import (
 class TestThumbnailHelper(DjangoTestCase):
 
     def setUp(self):
-
+        super(TestThumbnailHelper, self).setUp()
         sample_file = os.path.join(
             os.path.dirname(__file__),
             'animage.png'
@@ -47,22 +50,22 @@ class TestThumbnailHelper(DjangoTestCase):
         if os.path.isfile(self.destination):
             os.remove(self.destination)
 
+    @override_settings(THUMBNAIL_BACKGROUND=False)
     def test_thumbnail(self):
         nailed = thumbnail(os.path.basename(self.destination), '10x10')
         eq_(nailed.width, 10)
         # we don't want these lying around in local install
         nailed.delete()
 
-    @mock.patch('airmozilla.main.helpers.time')
-    @mock.patch('airmozilla.main.helpers.get_thumbnail')
-    def test_thumbnail_with_some_integrityerrors(self, mocked_get_thumbnail,
-                                                 mocked_time):
+    @override_settings(THUMBNAIL_BACKGROUND=False)
+    @mock.patch('airmozilla.main.thumbnails.get_thumbnail')
+    def test_thumbnail_with_integrityerror(self, mocked_get_thumbnail):
 
         runs = []
 
         def proxy(*args, **kwargs):
             runs.append(args)
-            if len(runs) < 3:
+            if len(runs) < 2:
                 raise IntegrityError('bla')
             return get_thumbnail(*args, **kwargs)
 
@@ -70,9 +73,71 @@ class TestThumbnailHelper(DjangoTestCase):
 
         nailed = thumbnail(os.path.basename(self.destination), '10x10')
         eq_(nailed.width, 10)
+        eq_(len(runs), 2)
         # we don't want these lying around in local install
         nailed.delete()
 
+    @mock.patch('airmozilla.main.thumbnails.enqueue')
+    def test_thumbnail_in_background(self, mocked_enqueue):
+        filename = os.path.basename(self.destination)
+        with self.settings(THUMBNAIL_BACKGROUND=True):
+            placeholder = thumbnail(filename, '16x9', crop='center')
+            eq_(placeholder.width, 16)
+            eq_(placeholder.height, 9)
+            ok_(placeholder.url.endswith(settings.THUMBNAIL_PLACEHOLDER))
+            mocked_enqueue.assert_called_with(filename, '16x9', crop='center')
+
+            # pretend the background worker did its job
+            nailed = generate_thumbnail(filename, '16x9', crop='center')
+            cached = thumbnail(filename, '16x9', crop='center')
+            eq_(cached.url, nailed.url)
+            eq_(mocked_enqueue.call_count, 1)
+        nailed.delete()
+
+    @mock.patch('airmozilla.main.thumbnails.enqueue')
+    def test_thumbnail_batch(self, mocked_enqueue):
+        filename = os.path.basename(self.destination)
+        nailed = generate_thumbnail(filename, '16x9', crop='center')
+        cache.clear()
+        with self.settings(THUMBNAIL_BACKGROUND=True):
+            batch = thumbnails.ThumbnailBatch([
+                (filename, '16x9', {'crop': 'center'}),
+                (filename, '32x18', {'crop': 'center'}),
+            ])
+            eq_(len(batch), 2)
+            with self.assertNumQueries(0):
+                thumb = batch.get(filename, '16x9', crop='center')
+                eq_(thumb.url, nailed.url)
+                placeholder = batch.get(filename, '32x18', crop='center')
+                eq_(placeholder.width, 32)
+                ok_(placeholder.url.endswith(settings.THUMBNAIL_PLACEHOLDER))
+            mocked_enqueue.assert_called_once_with(
+                filename,
+                '32x18',
+                crop='center'
+            )
+
+            # the second time it's all in the cache
+            with self.assertNumQueries(0):
+                thumbnails.ThumbnailBatch([
+                    (filename, '16x9', {'crop': 'center'}),
+                    (filename, '32x18', {'crop': 'center'}),
+                ])
+        nailed.delete()
+
+    @mock.patch('airmozilla.main.thumbnails._start_worker')
+    def test_enqueue_only_once(self, mocked_start_worker):
+        filename = os.path.basename(self.destination)
+        ok_(thumbnails.enqueue(filename, '10x10', crop='center'))
+        ok_(not thumbnails.enqueue(filename, '10x10', crop='center'))
+        # different options
+        ok_(thumbnails.enqueue(filename, '10x10'))
+        eq_(thumbnails._queue.qsize(), 2)
+        while not thumbnails._queue.empty():
+            thumbnails._queue.get()
+        thumbnails._queued.clear()
+        cache.clear()
+
 
 class TestPluralizer(DjangoTestCase):
 
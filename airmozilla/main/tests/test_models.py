@@ -1,18 +1,22 @@
 import datetime
 
 from django.contrib.auth.models import Group, User
+from django.core.cache import cache
 from django.test import TestCase
 from django.utils import timezone
 from django.utils.timezone import utc
 from django.core.files import File
 
 from nose.tools import ok_, eq_
+import mock
 
 from airmozilla.main.models import (
     Approval,
     Event,
     EventOldSlug,
     Location,
+    fix_approval_states,
+    get_next_transition,
     most_recent_event,
     RecruitmentMessage,
     Picture
@@ -68,6 +72,31 @@ class EventTests(TestCase):
         event1.save()
         eq_(most_recent_event(), event1)
 
+    def test_summary(self):
+        date = datetime.datetime(2099, 1, 1, 18, 0, 0).replace(tzinfo=utc)
+        Event.objects.create(
+            title='Event 1',
+            status=Event.STATUS_INITIATED,
+            start_time=date,
+            transcript='Long ' * 1000,
+            template_environment={'tag': 'abc123'},
+        )
+        event, = Event.objects.summary('description')
+        for name in Event.SUMMARY_DEFERRED_FIELDS + ('description',):
+            ok_(name not in event.__dict__)
+        ok_('title' in event.__dict__)
+        # the JSON isn't decoded until it's needed
+        ok_(isinstance(event.__dict__['template_environment'], basestring))
+        eq_(event.template_environment, {'tag': 'abc123'})
+        ok_(isinstance(event.__dict__['template_environment'], dict))
+
+        # it can be chained
+        eq_(Event.objects.filter(title='Event 1').summary().count(), 1)
+
+        # and deferred ones can still be accessed
+        with self.assertNumQueries(1):
+            eq_(event.transcript, 'Long ' * 1000)
+
 
 class EventStateTests(TestCase):
     def test_event_state(self):
@@ -170,6 +199,128 @@ class EventStateTests(TestCase):
         app.save()
         ok_(not to_approve.needs_approval())
 
+    def test_approval_state(self):
+        event = Event.objects.create(
+            status=Event.STATUS_SCHEDULED,
+            start_time=timezone.now(),
+        )
+        eq_(event.approval_state, Event.APPROVAL_STATE_APPROVED)
+
+        def get_state():
+            return Event.objects.get(id=event.id).approval_state
+
+        app1 = Approval.objects.create(event=event)
+        app2 = Approval.objects.create(event=event)
+        eq_(get_state(), Event.APPROVAL_STATE_PENDING)
+        eq_(event.approval_state, Event.APPROVAL_STATE_PENDING)
+
+        app1.processed = True
+        app1.approved = True
+        app1.save()
+        eq_(get_state(), Event.APPROVAL_STATE_PENDING)
+
+        app2.processed = True
+        app2.save()
+        eq_(get_state(), Event.APPROVAL_STATE_REJECTED)
+        ok_(event not in Event.objects.approved())
+        ok_(not event.needs_approval())
+
+        app2.delete()
+        eq_(get_state(), Event.APPROVAL_STATE_APPROVED)
+        ok_(event in Event.objects.approved())
+
+        # saving an instance that doesn't know doesn't undo it
+        stale = Event.objects.get(id=event.id)
+        Approval.objects.create(event=event)
+        stale.title = 'Different'
+        stale.save()
+        eq_(get_state(), Event.APPROVAL_STATE_PENDING)
+
+    def test_fix_approval_states(self):
+        event = Event.objects.create(
+            status=Event.STATUS_SCHEDULED,
+            start_time=timezone.now(),
+        )
+        event2 = Event.objects.create(
+            status=Event.STATUS_SCHEDULED,
+            start_time=timezone.now(),
+        )
+        Approval.objects.create(event=event)
+        Approval.objects.create(event=event2, processed=True)
+        eq_(fix_approval_states(), {})
+
+        # changed without any signals
+        Event.objects.all().update(
+            approval_state=Event.APPROVAL_STATE_APPROVED
+        )
+        wrong = fix_approval_states(dry_run=True)
+        eq_(wrong, {
+            Event.APPROVAL_STATE_PENDING: [event.id],
+            Event.APPROVAL_STATE_REJECTED: [event2.id],
+        })
+        ok_(event in Event.objects.approved())
+        eq_(fix_approval_states(), wrong)
+        ok_(event not in Event.objects.approved())
+        eq_(
+            Event.objects.get(id=event2.id).approval_state,
+            Event.APPROVAL_STATE_REJECTED
+        )
+        eq_(fix_approval_states(), {})
+
+    @mock.patch('airmozilla.main.models._get_now')
+    def test_bucketed_now(self, mocked_now):
+        now = datetime.datetime(2014, 1, 1, 12, 0, 47, 123, tzinfo=utc)
+        mocked_now.return_value = now
+        # live in 7 seconds from now
+        event = Event.objects.create(
+            status=Event.STATUS_SCHEDULED,
+            start_time=now + datetime.timedelta(minutes=10, seconds=7),
+        )
+        with self.settings(NOW_BUCKET_SECONDS=30, LIVE_MARGIN=10):
+            # the same as it was at 12:00:30
+            ok_(event in Event.objects.upcoming())
+            ok_(event not in Event.objects.live())
+            mocked_now.return_value = now + datetime.timedelta(seconds=15)
+            ok_(event not in Event.objects.upcoming())
+            ok_(event in Event.objects.live())
+
+        mocked_now.return_value = now
+        with self.settings(NOW_BUCKET_SECONDS=0, LIVE_MARGIN=10):
+            ok_(event in Event.objects.upcoming())
+            mocked_now.return_value = now + datetime.timedelta(seconds=8)
+            ok_(event in Event.objects.live())
+
+    @mock.patch('airmozilla.main.models._get_now')
+    def test_get_next_transition(self, mocked_now):
+        cache.clear()
+        now = datetime.datetime(2014, 1, 1, 12, 0, 0, tzinfo=utc)
+        mocked_now.return_value = now
+        with self.settings(NOW_BUCKET_SECONDS=30, LIVE_MARGIN=10):
+            eq_(get_next_transition(), None)
+            upcoming = Event.objects.create(
+                status=Event.STATUS_SCHEDULED,
+                start_time=now + datetime.timedelta(hours=1),
+            )
+            goes_live = now + datetime.timedelta(minutes=50)
+            eq_(get_next_transition(), goes_live)
+            with self.assertNumQueries(0):
+                eq_(get_next_transition(), goes_live)
+
+            archiving = Event.objects.create(
+                status=Event.STATUS_SCHEDULED,
+                start_time=now - datetime.timedelta(hours=1),
+                archive_time=now + datetime.timedelta(minutes=5),
+            )
+            eq_(get_next_transition(), archiving.archive_time)
+
+            # once it's archived the next one is when the other goes live
+            mocked_now.return_value = now + datetime.timedelta(minutes=6)
+            eq_(get_next_transition(), goes_live)
+
+            # unless it's no longer approved
+            Approval.objects.create(event=upcoming)
+            eq_(get_next_transition(), None)
+
 
 class ForeignKeyTests(TestCase):
     fixtures = ['airmozilla/manage/tests/main_testdata.json']
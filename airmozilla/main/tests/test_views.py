@@ -17,6 +17,8 @@ from django.utils.timezone import utc
 from django.conf import settings
 from django.core.cache import cache
 from django.core.files import File
+from django.test.client import RequestFactory
+from django.test.utils import override_settings
 
 from funfactory.urlresolvers import reverse
 from nose.tools import eq_, ok_
@@ -39,6 +41,7 @@ from airmozilla.main.models import (
     RecruitmentMessage,
     Picture,
     VidlySubmission,
+    VideoInfo,
 )
 from airmozilla.base.tests.test_mozillians import (
     Response,
@@ -118,6 +121,57 @@ class TestPages(DjangoTestCase):
         )
         ok_(is_contributor(contributor))
 
+    def test_privacy_tier(self):
+        from airmozilla.main.views import PrivacyTier
+        anonymous = PrivacyTier(AnonymousUser())
+        eq_(anonymous.tier, 'public')
+        eq_(anonymous.privacy_filter, {'privacy': Event.PRIVACY_PUBLIC})
+        eq_(anonymous.privacy_exclude, {})
+
+        employee = User.objects.create_user(
+            'worker', 'worker@mozilla.com', 'secret'
+        )
+        company = PrivacyTier(employee)
+        eq_(company.tier, 'company')
+        eq_(company.privacy_filter, {})
+        eq_(company.privacy_exclude, {})
+
+        contributor = User.objects.create_user(
+            'nigel', 'nigel@live.com', 'secret'
+        )
+        UserProfile.objects.create(
+            user=contributor,
+            contributor=True
+        )
+        contributors = PrivacyTier(contributor)
+        eq_(contributors.tier, 'contributors')
+        eq_(contributors.privacy_filter, {})
+        eq_(contributors.privacy_exclude, {'privacy': Event.PRIVACY_COMPANY})
+        # it's only worked out once
+        with self.assertNumQueries(0):
+            eq_(contributors.tier, 'contributors')
+
+        events = Event.objects.all()
+        eq_(
+            list(company.filter(events)),
+            list(events)
+        )
+        eq_(
+            list(anonymous.filter(events)),
+            list(events.filter(privacy=Event.PRIVACY_PUBLIC))
+        )
+        eq_(
+            list(contributors.filter(events)),
+            list(events.exclude(privacy=Event.PRIVACY_COMPANY))
+        )
+
+    def test_privacy_tier_middleware(self):
+        from airmozilla.main.middleware import PrivacyTierMiddleware
+        request = RequestFactory().get('/')
+        request.user = AnonymousUser()
+        PrivacyTierMiddleware().process_request(request)
+        eq_(request.privacy_tier.tier, 'public')
+
     def test_is_employee(self):
         from airmozilla.main.views import is_employee
         user = User.objects.create(username='a', email='some@crack.com')
@@ -471,6 +525,43 @@ class TestPages(DjangoTestCase):
             not in response.content
         )
 
+    def test_event_context_cached(self):
+        event = Event.objects.get(title='Test event')
+        vidly = Template.objects.create(
+            name="Vid.ly HD",
+            content='<iframe src="{{ tag }}"></iframe>'
+        )
+        event.template = vidly
+        event.template_environment = {'tag': 'abc123'}
+        event.save()
+        url = reverse('main:event', kwargs={'slug': event.slug})
+        with self.settings(EVENT_CONTEXT_CACHE_TTL=60):
+            response = self.client.get(url)
+            eq_(response.status_code, 200)
+            ok_('Greatness' not in response.content)
+            ok_('format=hd_mp4' not in response.content)
+
+            # everything that's shown is forgotten when it changes
+            tag, __ = Tag.objects.get_or_create(name='Greatness')
+            event.tags.add(tag)
+            VidlySubmission.objects.create(
+                event=event,
+                url='https://example.com/file.mov',
+                tag='abc123',
+                hd=True
+            )
+            response = self.client.get(url)
+            eq_(response.status_code, 200)
+            ok_('Greatness' in response.content)
+            ok_('format=hd_mp4' in response.content)
+
+            tag.name = 'Brilliance'
+            tag.save()
+            response = self.client.get(url)
+            eq_(response.status_code, 200)
+            ok_('Greatness' not in response.content)
+            ok_('Brilliance' in response.content)
+
     def test_private_event_redirect(self):
         event = Event.objects.get(title='Test event')
         event.privacy = Event.PRIVACY_COMPANY
@@ -541,6 +632,56 @@ class TestPages(DjangoTestCase):
             reverse('main:event', kwargs={'slug': old_event_slug.event.slug})
         )
 
+    def test_resolve_slug(self):
+        from airmozilla.main.views import resolve_slug
+        event = Event.objects.get(title='Test event')
+        old_event_slug = EventOldSlug.objects.get(slug='test-old-slug')
+        with self.settings(
+            SLUG_RESOLUTION_POSITIVE_TTL=60,
+            SLUG_RESOLUTION_NEGATIVE_TTL=60
+        ):
+            eq_(resolve_slug(event.slug), ('event', event.id))
+            eq_(resolve_slug(event.slug.upper()), ('event', event.id))
+            eq_(
+                resolve_slug(old_event_slug.slug),
+                ('redirect', old_event_slug.event.slug)
+            )
+            eq_(resolve_slug('not-yet'), ('not-found', None))
+
+            # it's remembered
+            with self.assertNumQueries(0):
+                eq_(resolve_slug(event.slug), ('event', event.id))
+                eq_(resolve_slug('not-yet'), ('not-found', None))
+
+            # ...until the slugs change
+            previous_slug = event.slug
+            event.slug = 'not-yet'
+            event.save()
+            eq_(resolve_slug('not-yet'), ('event', event.id))
+            eq_(resolve_slug(previous_slug), ('redirect', 'not-yet'))
+            eq_(
+                resolve_slug(old_event_slug.slug),
+                ('redirect', 'not-yet')
+            )
+
+            # an exact match is preferred, whichever is looked up first
+            other = Event.objects.get(id=event.id)
+            other.id = None
+            other.slug = 'NOT-YET'
+            other.save()
+            eq_(resolve_slug('NOT-YET'), ('event', other.id))
+            with self.assertNumQueries(0):
+                eq_(resolve_slug('not-yet'), ('event', event.id))
+                eq_(resolve_slug('NOT-YET'), ('event', other.id))
+
+            response = self.client.get('/never-heard-of-it/')
+            eq_(response.status_code, 404)
+            with self.assertNumQueries(0):
+                eq_(
+                    resolve_slug('never-heard-of-it'),
+                    ('not-found', None)
+                )
+
     def test_participant(self):
         """Participant pages always respond successfully."""
         participant = Participant.objects.get(name='Tim Mickel')
@@ -990,6 +1131,43 @@ class TestPages(DjangoTestCase):
             in response.content
         )
 
+    def test_feed_with_enclosure(self):
+        delay = datetime.timedelta(days=1)
+
+        event1 = Event.objects.get(title='Test event')
+        event1.status = Event.STATUS_SCHEDULED
+        event1.start_time -= delay
+        event1.archive_time = event1.start_time
+        vidly_template = Template.objects.create(
+            name='Vid.ly Something',
+            content='<script>'
+        )
+        event1.template = vidly_template
+        event1.template_environment = {'tag': 'abc123'}
+        event1.save()
+
+        url = reverse('main:feed', args=('public',))
+        response = self.client.get(url)
+        eq_(response.status_code, 200)
+        ok_('<enclosure' not in response.content)
+
+        VideoInfo.objects.create(
+            event=event1,
+            duration=1157,
+            size=123456789,
+            hd=True,
+        )
+        cache.clear()
+        response = self.client.get(url)
+        eq_(response.status_code, 200)
+        enclosure, = re.findall('<enclosure[^>]+>', response.content)
+        ok_('length="123456789"' in enclosure)
+        ok_('type="video/mp4"' in enclosure)
+        ok_(
+            'url="https://vid.ly/abc123?content=video&amp;format=hd_mp4"'
+            in enclosure
+        )
+
     def test_feed_cache(self):
         delay = datetime.timedelta(days=1)
 
@@ -1812,6 +1990,89 @@ class TestPages(DjangoTestCase):
         eq_(response['X-Frame-Options'], 'ALLOWALL')
         ok_(event.title in response.content)
 
+    def test_view_event_video_only_cached(self):
+        event = Event.objects.get(title='Test event')
+        url = reverse('main:event_video', kwargs={'slug': event.slug})
+        with self.settings(
+            EVENT_VIDEO_CACHE_TTL=60,
+            SLUG_RESOLUTION_POSITIVE_TTL=60
+        ):
+            response = self.client.get(url)
+            eq_(response.status_code, 200)
+            eq_(response['X-Frame-Options'], 'ALLOWALL')
+            ok_('public' in response['Cache-Control'])
+            ok_('max-age=60' in response['Cache-Control'])
+            ok_(event.title in response.content)
+
+            with self.assertNumQueries(0):
+                response = self.client.get(url)
+            eq_(response.status_code, 200)
+            ok_(event.title in response.content)
+            ok_('http://testserver/' in response.content)
+
+            # its link back is absolute so each host is cached separately
+            response = self.client.get(url, HTTP_HOST='example.com')
+            eq_(response.status_code, 200)
+            ok_('http://example.com/' in response.content)
+            ok_('http://testserver/' not in response.content)
+
+            # autoplay is cached separately
+            response = self.client.get(url, {'autoplay': 'true'})
+            eq_(response.status_code, 200)
+
+            event.title = 'Different title'
+            event.save()
+            response = self.client.get(url)
+            eq_(response.status_code, 200)
+            ok_('Different title' in response.content)
+
+            # not public anymore
+            event.privacy = Event.PRIVACY_COMPANY
+            event.save()
+            response = self.client.get(url)
+            eq_(response.status_code, 200)
+            ok_('Not a public event' in response.content)
+            ok_('public' not in response.get('Cache-Control', ''))
+
+    def test_view_event_video_only_not_cached(self):
+        event = Event.objects.get(title='Test event')
+        url = reverse('main:event_video', kwargs={'slug': event.slug})
+        with self.settings(
+            EVENT_VIDEO_CACHE_TTL=60,
+            SLUG_RESOLUTION_POSITIVE_TTL=60
+        ):
+            # the template makes tokens that expire
+            event.template.content = (
+                '{{ vidly_tokenize("abc123", 90) }}'
+            )
+            event.template.save()
+            with mock.patch('airmozilla.manage.vidly.tokenize') as p:
+                p.return_value = 'token1'
+                response = self.client.get(url)
+                eq_(response.status_code, 200)
+                ok_('token1' in response.content)
+                ok_('public' not in response.get('Cache-Control', ''))
+
+                p.return_value = 'token2'
+                response = self.client.get(url)
+                eq_(response.status_code, 200)
+                ok_('token2' in response.content)
+
+            # live events change when they're archived
+            event.template.content = 'Plain'
+            event.template.save()
+            event.archive_time = None
+            event.start_time = timezone.now() - datetime.timedelta(hours=1)
+            event.save()
+            assert event.is_live()
+            response = self.client.get(url)
+            eq_(response.status_code, 200)
+            ok_('public' not in response.get('Cache-Control', ''))
+            event.title = 'Different title'
+            event.save()
+            response = self.client.get(url)
+            ok_('Different title' in response.content)
+
     def test_view_event_video_only_not_public(self):
         event = Event.objects.get(title='Test event')
         event.privacy = Event.PRIVACY_COMPANY
@@ -2323,7 +2584,7 @@ class TestPages(DjangoTestCase):
         ok_(event3.title in response.content)
 
     @mock.patch('logging.error')
-    @mock.patch('requests.get')
+    @mock.patch('airmozilla.base.mozillians.session.get')
     def test_view_curated_group_event(self, rget, rlogging):
 
         def mocked_get(url, **options):
@@ -2395,7 +2656,7 @@ class TestPages(DjangoTestCase):
         ))
 
     @mock.patch('logging.error')
-    @mock.patch('requests.get')
+    @mock.patch('airmozilla.base.mozillians.session.get')
     def test_view_curated_group_event_as_staff(self, rget, rlogging):
 
         def mocked_get(url, **options):
@@ -2500,6 +2761,7 @@ class TestPages(DjangoTestCase):
         eq_(response['Access-Control-Allow-Origin'], '*')
         ok_('<allow-access-from domain="*" />' in response.content)
 
+    @override_settings(THUMBNAIL_BACKGROUND=False)
     def test_picture_over_placeholder(self):
         event = Event.objects.get(title='Test event')
         assert event in Event.objects.live()
@@ -2770,7 +3032,7 @@ class TestPages(DjangoTestCase):
             not in response.content
         )
 
-    @mock.patch('requests.get')
+    @mock.patch('airmozilla.base.mozillians.session.get')
     def test_contributors_page(self, rget):
 
         def mocked_get(url, **options):
@@ -0,0 +1,254 @@
+"""Thumbnails that never make the request wait for PIL.
+
+`get_thumbnail_or_placeholder()` only looks in sorl's key value store for
+an already generated thumbnail. If there isn't one, it returns a
+placeholder and queues up the generation in a background thread so the
+next request gets the real thing.
+
+`generate_thumbnail()` is the blocking version for code that really needs
+the thumbnail file (e.g. when tweeting or pre-generating thumbnails).
+
+`ThumbnailBatch` looks up the thumbnails of a whole listing in one go so
+that it doesn't do one key value store lookup per thumbnail. A page with
+more than one listing (e.g. the home page and its sidebar widgets) does
+one such lookup for each.
+"""
+
+import re
+import Queue
+import hashlib
+import logging
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.utils import IntegrityError
+
+from funfactory.helpers import static
+from sorl.thumbnail import default, get_thumbnail
+from sorl.thumbnail.images import ImageFile
+from sorl.thumbnail.images import deserialize_image_file
+from sorl.thumbnail.conf import settings as sorl_settings
+from sorl.thumbnail.conf import defaults as sorl_defaults
+from sorl.thumbnail.kvstores.base import add_prefix
+from sorl.thumbnail.kvstores import cached_db_kvstore
+from sorl.thumbnail.models import KVStore as KVStoreModel
+
+
+# How long (in seconds) other processes consider a thumbnail as being
+# generated by someone else.
+QUEUED_TIMEOUT = 60
+
+_queue = Queue.Queue()
+_queued = set()
+_lock = threading.Lock()
+_worker = None
+
+
+class Placeholder(object):
+    """quacks like the ImageFile returned by sorl for templates"""
+
+    def __init__(self, geometry):
+        width, height = re.match('(\d*)x?(\d*)', geometry).groups()
+        width = width and int(width) or None
+        height = height and int(height) or None
+        # the placeholder image is 16:9
+        self.width = width or height * 16 / 9
+        self.height = height or width * 9 / 16
+        self.url = static(settings.THUMBNAIL_PLACEHOLDER)
+
+    def __repr__(self):
+        return '<%s: %sx%s>' % (
+            self.__class__.__name__,
+            self.width,
+            self.height
+        )
+
+
+def _get_name(source):
+    # `source` is either a file (e.g. `event.picture.file`) or a file name
+    return getattr(source, 'name', source)
+
+
+def _get_thumbnail_file(name, geometry, options):
+    """return the (not necessarily existing) ImageFile that sorl would
+    create for this source, geometry and options."""
+    source = ImageFile(name)
+    options = dict(options)
+    backend = default.backend
+    for key, value in backend.default_options.iteritems():
+        options.setdefault(key, value)
+    for key, attr in backend.extra_options:
+        value = getattr(sorl_settings, attr)
+        if value != getattr(sorl_defaults, attr):
+            options.setdefault(key, value)
+    return ImageFile(
+        backend._get_thumbnail_filename(source, geometry, options),
+        default.storage
+    )
+
+
+def get_cached_thumbnail(source, geometry, **options):
+    """return the thumbnail if it has already been generated or else
+    None."""
+    name = _get_name(source)
+    if not name:
+        return None
+    return default.kvstore.get(_get_thumbnail_file(name, geometry, options))
+
+
+def generate_thumbnail(source, geometry, **options):
+    """return the thumbnail, generating it if it has to."""
+    try:
+        return get_thumbnail(source, geometry, **options)
+    except IOError:
+        return None
+    except IntegrityError:
+        # Another process stored the same thumbnail in the key value
+        # store at the same time (see
+        # https://bugzilla.mozilla.org/show_bug.cgi?id=817765) so now it's
+        # there and we can use that.
+        return get_thumbnail(source, geometry, **options)
+
+
+def _make_queue_key(name, geometry, options):
+    return 'thumbnail-queued:%s' % hashlib.md5(
+        repr((name, geometry, sorted(options.items())))
+    ).hexdigest()
+
+
+def enqueue(source, geometry, **options):
+    """queue up the generation of the thumbnail unless it's already
+    queued up (by this or any other process).
+    Returns True if it was queued up."""
+    name = _get_name(source)
+    key = _make_queue_key(name, geometry, options)
+    with _lock:
+        if key in _queued:
+            return False
+        if not cache.add(key, True, QUEUED_TIMEOUT):
+            return False
+        _queued.add(key)
+    _queue.put((key, name, geometry, options))
+    _start_worker()
+    return True
+
+
+def _start_worker():
+    global _worker
+    with _lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_work, name='thumbnails')
+            _worker.daemon = True
+            _worker.start()
+
+
+def _work():
+    while True:
+        key, name, geometry, options = _queue.get()
+        try:
+            generate_thumbnail(name, geometry, **options)
+        except Exception:
+            logging.error(
+                "Failed to generate thumbnail of %r", name,
+                exc_info=True
+            )
+        finally:
+            with _lock:
+                _queued.discard(key)
+            cache.delete(key)
+            # this thread gets its own database connection
+            connection.close()
+            _queue.task_done()
+
+
+def get_thumbnail_or_placeholder(source, geometry, **options):
+    """return the thumbnail if it has already been generated or else
+    a placeholder (and make sure the thumbnail gets generated)."""
+    if not _get_name(source):
+        return None
+    if not settings.THUMBNAIL_BACKGROUND:
+        return generate_thumbnail(source, geometry, **options)
+    thumb = get_cached_thumbnail(source, geometry, **options)
+    if thumb is None:
+        enqueue(source, geometry, **options)
+        thumb = Placeholder(geometry)
+    return thumb
+
+
+def get_cached_thumbnails(items):
+    """return a list of thumbnails (or None if not generated yet) for a
+    list of (source, geometry, options) tuples.
+
+    With sorl's default cached_db key value store that's one
+    `cache.get_many()` and at most one database query."""
+    thumbnail_files = []
+    for source, geometry, options in items:
+        name = _get_name(source)
+        thumbnail_files.append(
+            name and _get_thumbnail_file(name, geometry, options) or None
+        )
+
+    if not isinstance(default.kvstore, cached_db_kvstore.KVStore):
+        return [
+            x and default.kvstore.get(x) or None
+            for x in thumbnail_files
+        ]
+
+    keys = [add_prefix(x.key) for x in thumbnail_files if x]
+    values = cache.get_many(keys)
+    missing = [x for x in keys if x not in values]
+    if missing:
+        for kv in KVStoreModel.objects.filter(key__in=missing):
+            values[kv.key] = kv.value
+        # just like the key value store, remember the ones that aren't
+        # there to avoid the database lookup next time
+        cache.set_many(
+            dict(
+                (x, values.get(x, cached_db_kvstore.EMPTY_VALUE))
+                for x in missing
+            ),
+            sorl_settings.THUMBNAIL_CACHE_TIMEOUT
+        )
+
+    thumbnails = []
+    for thumbnail_file in thumbnail_files:
+        value = thumbnail_file and values.get(add_prefix(thumbnail_file.key))
+        if value is None or value == cached_db_kvstore.EMPTY_VALUE:
+            thumbnails.append(None)
+        else:
+            thumbnails.append(deserialize_image_file(value))
+    return thumbnails
+
+
+def _make_batch_key(source, geometry, options):
+    return _get_name(source), geometry, tuple(sorted(options.items()))
+
+
+class ThumbnailBatch(object):
+    """the thumbnails for a listing, looked up all at once.
+
+    `get()` works like `get_thumbnail_or_placeholder()` but doesn't have
+    to do a lookup for the thumbnails in the batch."""
+
+    def __init__(self, items):
+        items = list(items)
+        self._thumbnails = {}
+        if settings.THUMBNAIL_BACKGROUND:
+            thumbnails = get_cached_thumbnails(items)
+            for item, thumb in zip(items, thumbnails):
+                self._thumbnails[_make_batch_key(*item)] = thumb
+
+    def __len__(self):
+        return len(self._thumbnails)
+
+    def get(self, source, geometry, **options):
+        key = _make_batch_key(source, geometry, options)
+        if key not in self._thumbnails or not key[0]:
+            return get_thumbnail_or_placeholder(source, geometry, **options)
+        thumb = self._thumbnails[key]
+        if thumb is None:
+            enqueue(source, geometry, **options)
+            thumb = Placeholder(geometry)
+        return thumb
@@ -14,13 +14,16 @@ from django.contrib.auth.decorators import login_required
 from django.utils import timezone
 from django.utils.timezone import utc
 from django.contrib.syndication.views import Feed
+from django.contrib.flatpages.models import FlatPage
 from django.contrib.flatpages.views import flatpage
 from django.views.generic.base import View
+from django.utils.cache import patch_cache_control
 from django.db.models import Count, Q
 from django.db import transaction
 
 from slugify import slugify
 from funfactory.urlresolvers import reverse
+import jingo
 from jingo import Template
 import vobject
 from sorl.thumbnail import get_thumbnail
@@ -39,6 +42,10 @@ from airmozilla.main.models import (
     EventRevision,
     Picture,
     VidlySubmission,
+    VideoInfo,
+    make_slug_cache_key,
+    make_event_context_cache_key,
+    make_event_video_cache_key,
 )
 from airmozilla.base.utils import (
     paginate,
@@ -83,19 +90,9 @@ def home(request, page=1, channel_slug=settings.DEFAULT_CHANNEL_SLUG):
 
     request.channels = channels
 
-    privacy_filter = {}
-    privacy_exclude = {}
-    if request.user.is_active:
-        if is_contributor(request.user):
-            privacy_exclude = {'privacy': Event.PRIVACY_COMPANY}
-    else:
-        privacy_filter = {'privacy': Event.PRIVACY_PUBLIC}
+    privacy_tier = get_privacy_tier(request)
 
-    archived_events = Event.objects.archived()
-    if privacy_filter:
-        archived_events = archived_events.filter(**privacy_filter)
-    elif privacy_exclude:
-        archived_events = archived_events.exclude(**privacy_exclude)
+    archived_events = privacy_tier.filter(Event.objects.archived().summary())
     archived_events = archived_events.order_by('-start_time')
 
     archived_events = archived_events.select_related('picture')
@@ -119,13 +116,9 @@ def home(request, page=1, channel_slug=settings.DEFAULT_CHANNEL_SLUG):
         # no live events when filtering by tag
         live_events = Event.objects.none()
     else:
-        live_events = (Event.objects.live()
+        live_events = (Event.objects.live().summary()
                        .order_by('start_time'))
-
-        if privacy_filter:
-            live_events = live_events.filter(**privacy_filter)
-        elif privacy_exclude:
-            live_events = live_events.exclude(**privacy_exclude)
+        live_events = privacy_tier.filter(live_events)
 
         # apply the mandatory channels filter
         # but only do this if it's not filtered by tags
@@ -168,16 +161,8 @@ def home(request, page=1, channel_slug=settings.DEFAULT_CHANNEL_SLUG):
                       archived_paged.previous_page_number())
             )
 
-    events_qs = Event.objects.archived().all()
-    if request.user.is_active:
-        if is_contributor(request.user):
-            feed_privacy = 'contributors'
-            events_qs = events_qs.exclude(privacy=Event.PRIVACY_COMPANY)
-        else:
-            feed_privacy = 'company'
-    else:
-        events_qs = events_qs.filter(privacy=Event.PRIVACY_PUBLIC)
-        feed_privacy = 'public'
+    events_qs = privacy_tier.filter(Event.objects.archived().all())
+    feed_privacy = privacy_tier.tier
 
     channel_children = []
     for child in channel.get_children().order_by('name'):
@@ -243,20 +228,98 @@ def is_employee(user):
     return is_
 
 
-def can_view_event(event, user):
+class PrivacyTier(object):
+    """What events the user is allowed to see.
+
+    The `tier` is one of 'public' (anonymous), 'contributors' (logged in
+    contributors) or 'company' (logged in staff), which is also what is
+    used in the feed URLs.
+    Working out if the user is a contributor is only done once, when
+    first needed.
+    """
+
+    PUBLIC = 'public'
+    CONTRIBUTORS = 'contributors'
+    COMPANY = 'company'
+
+    def __init__(self, user):
+        self.user = user
+        self._tier = None
+
+    @property
+    def tier(self):
+        if self._tier is None:
+            if not self.user.is_active:
+                self._tier = self.PUBLIC
+            elif is_contributor(self.user):
+                self._tier = self.CONTRIBUTORS
+            else:
+                self._tier = self.COMPANY
+        return self._tier
+
+    @property
+    def anonymous(self):
+        return self.tier == self.PUBLIC
+
+    @property
+    def contributor(self):
+        return self.tier == self.CONTRIBUTORS
+
+    @property
+    def privacy_filter(self):
+        if self.anonymous:
+            return {'privacy': Event.PRIVACY_PUBLIC}
+        return {}
+
+    @property
+    def privacy_exclude(self):
+        if self.contributor:
+            return {'privacy': Event.PRIVACY_COMPANY}
+        return {}
+
+    def filter(self, qs, prefix=''):
+        """return the queryset of events (or of something with a foreign
+        key to events if `prefix` is e.g. 'event__') filtered down to what
+        this user is allowed to see."""
+        if self.privacy_filter:
+            return qs.filter(**dict(
+                (prefix + k, v) for k, v in self.privacy_filter.items()
+            ))
+        elif self.privacy_exclude:
+            return qs.exclude(**dict(
+                (prefix + k, v) for k, v in self.privacy_exclude.items()
+            ))
+        return qs
+
+    def __repr__(self):
+        return '<%s: %s>' % (self.__class__.__name__, self.tier)
+
+
+def get_privacy_tier(request):
+    """return the request's PrivacyTier, even if the middleware hasn't
+    been run for this request (e.g. requests made with RequestFactory)"""
+    privacy_tier = getattr(request, 'privacy_tier', None)
+    if privacy_tier is None:
+        privacy_tier = request.privacy_tier = PrivacyTier(request.user)
+    return privacy_tier
+
+
+def can_view_event(event, user, privacy_tier=None):
     """return True if the current user has right to view this event"""
     if event.privacy == Event.PRIVACY_PUBLIC:
         return True
     elif not user.is_active:
         return False
 
+    if privacy_tier is None:
+        privacy_tier = PrivacyTier(user)
     # you're logged in
     if event.privacy == Event.PRIVACY_COMPANY:
         # but then it's not good enough to be contributor
-        if is_contributor(user):
+        if privacy_tier.contributor:
             return False
     else:
-        if not is_contributor(user):
+        if not privacy_tier.contributor:
             # staff can always see it
             return True
         curated_groups = [
@@ -264,7 +327,7 @@ def can_view_event(event, user):
             CuratedGroup.objects.filter(event=event).values_list('name')
         ]
         if curated_groups:
-            return mozillians.in_groups(
+            return mozillians.in_groups_cached(
                 user.email,
                 curated_groups
             )
@@ -272,6 +335,135 @@ def can_view_event(event, user):
     return True
 
 
+SLUG_EVENT = 'event'
+SLUG_REDIRECT = 'redirect'
+SLUG_FLATPAGE = 'flatpage'
+SLUG_NOT_FOUND = 'not-found'
+
+
+def _lower_slug_filter(qs, slug):
+    # written out like this so it can use the lower(slug) index
+    return qs.extra(
+        where=['LOWER(%s.slug) = %%s' % qs.model._meta.db_table],
+        params=[slug.lower()]
+    )
+
+
+def resolve_slug(slug, refresh=False):
+    """return what `/<slug>/` is as a tuple of one of these:
+
+        (SLUG_EVENT, <event id>)
+        (SLUG_REDIRECT, <the event's current slug>)
+        (SLUG_FLATPAGE, None)
+        (SLUG_NOT_FOUND, None)
+
+    The answer is cached (not finding anything for a shorter time) and
+    forgotten when event slugs or flat pages change. It's cached for the
+    slug in any case, with every event it matches, so which of them is
+    an exact match is picked each time.
+    """
+    cache_key = make_slug_cache_key(slug)
+    found = None
+    if not refresh:
+        found = cache.get(cache_key)
+    if found is None:
+        found = _find_slug(slug)
+        kind, __ = found
+        if kind == SLUG_NOT_FOUND:
+            timeout = settings.SLUG_RESOLUTION_NEGATIVE_TTL
+        else:
+            timeout = settings.SLUG_RESOLUTION_POSITIVE_TTL
+        if timeout:
+            cache.set(cache_key, found, timeout)
+
+    kind, value = found
+    if kind == SLUG_EVENT:
+        # an exact match is preferred
+        exact = [x for x, event_slug in value if event_slug == slug]
+        return SLUG_EVENT, (exact or [value[0][0]])[0]
+    return kind, value
+
+
+def _find_slug(slug):
+    """like resolve_slug() but with a list of (id, slug) of every event
+    whose slug matches, in any case, instead of an event ID"""
+    events = list(
+        _lower_slug_filter(Event.objects.all(), slug)
+        .values_list('id', 'slug')
+    )
+    if events:
+        return SLUG_EVENT, events
+    old_slugs = _lower_slug_filter(EventOldSlug.objects.all(), slug)
+    for (event_slug,) in old_slugs.values_list('event__slug')[:1]:
+        return SLUG_REDIRECT, event_slug
+    if FlatPage.objects.filter(
+        Q(url__iexact='/%s' % slug) | Q(url__iexact='/%s/' % slug)
+    ).exists():
+        return SLUG_FLATPAGE, None
+    return SLUG_NOT_FOUND, None
+
+
+def get_event_context_data(event, privacy_tier):
+    """return the parts of the event page that don't depend on who's
+    looking at it (other than by their privacy tier).
+
+    They're cached until the event or anything related to it changes (see
+    `airmozilla.main.models.forget_event_context()`).
+    """
+    cache_key = make_event_context_cache_key(event.id, privacy_tier.tier)
+    data = cache.get(cache_key)
+    if data is not None:
+        return data
+
+    hits = None
+    stats_query = (
+        EventHitStats.objects.filter(event=event)
+        .values_list('total_hits', flat=True)
+    )
+    for total_hits in stats_query:
+        hits = total_hits
+
+    vidly_hd = None
+    if (
+        event.status != Event.STATUS_PENDING and event.is_public() and
+        event.has_vidly_template() and event.template_environment and
+        event.template_environment.get('tag')
+    ):
+        vidly_hd = False  # default
+        vidly_submissions = (
+            VidlySubmission.objects
+            .filter(event=event, tag=event.template_environment['tag'])
+            .order_by('-submission_time')
+        )
+        for vidly_submission in vidly_submissions.values('hd'):
+            vidly_hd = vidly_submission['hd']
+            break
+
+    data = {
+        'not_approved': (
+            event.approval_state != Event.APPROVAL_STATE_APPROVED
+        ),
+        'hits': hits,
+        'channels': list(event.channels.all()),
+        'participants': list(
+            event.participants.filter(cleared=Participant.CLEARED_YES)
+        ),
+        'tags': [t.name for t in event.tags.all()],
+        # needed for the _event_privacy.html template
+        'curated_groups': [
+            x[0] for x in
+            CuratedGroup.objects
+            .filter(event=event)
+            .values_list('name')
+            .order_by('name')
+        ],
+        'vidly_hd': vidly_hd,
+    }
+    if settings.EVENT_CONTEXT_CACHE_TTL:
+        cache.set(cache_key, data, settings.EVENT_CONTEXT_CACHE_TTL)
+    return data
+
+
 class EventView(View):
     """Video, description, and other metadata."""
 
@@ -288,11 +480,18 @@ class EventView(View):
 
     def cant_find_event(self, request, slug):
         """return an appropriate response if no event can be found"""
+        if resolve_slug(slug)[0] == SLUG_NOT_FOUND:
+            # no point asking for a flat page
+            raise http.Http404(slug)
         return flatpage(request, slug)
 
     def can_view_event(self, event, request):
         """wrapper on the utility function can_view_event()"""
-        return can_view_event(event, request.user)
+        return can_view_event(
+            event,
+            request.user,
+            privacy_tier=get_privacy_tier(request)
+        )
 
     def get_default_context(self, event, request):
         context = {}
@@ -308,19 +507,47 @@ class EventView(View):
         )
         return context
 
-    def get_event(self, slug, request):
+    def render_video(self, event, request):
+        """return the event's template rendered (or '' if there's nothing
+        to show yet)"""
+        if not event.template or event.is_upcoming():
+            return ''
+        # The only acceptable way to make autoplay be on
+        # is to send ?autoplay=true
+        # All other attempts will switch it off.
+        autoplay = request.GET.get('autoplay', 'false') == 'true'
+        context = {
+            'md5': lambda s: hashlib.md5(s).hexdigest(),
+            'event': event,
+            'request': request,
+            'datetime': datetime.datetime.utcnow(),
+            'vidly_tokenize': vidly.tokenize,
+            'edgecast_tokenize': edgecast_tokenize,
+            'popcorn_url': event.popcorn_url,
+            'autoplay': autoplay and 'true' or 'false',  # javascript
+        }
+        if isinstance(event.template_environment, dict):
+            context.update(event.template_environment)
+        template = Template(event.template.content)
         try:
-            return Event.objects.get(slug=slug)
-        except Event.DoesNotExist:
+            return template.render(context)
+        except vidly.VidlyTokenizeError, msg:
+            return '<code style="color:red">%s</code>' % msg
+
+    def get_event(self, slug, request):
+        kind, value = resolve_slug(slug)
+        if kind == SLUG_EVENT:
             try:
-                return Event.objects.get(slug__iexact=slug)
+                return Event.objects.get(id=value)
             except Event.DoesNotExist:
-                try:
-                    old_slug = EventOldSlug.objects.get(slug=slug)
-                    return redirect('main:event', slug=old_slug.event.slug)
-                except EventOldSlug.DoesNotExist:
-                    # does it exist as a static page
-                    return self.cant_find_event(request, slug)
+                # it was deleted since
+                kind, value = resolve_slug(slug, refresh=True)
+                if kind == SLUG_EVENT:
+                    return Event.objects.get(id=value)
+        if kind == SLUG_REDIRECT:
+            return redirect('main:event', slug=value)
+        # does it exist as a static page
+        return self.cant_find_event(request, slug)
 
     def get(self, request, slug):
         event = self.get_event(slug, request)
@@ -337,7 +564,9 @@ class EventView(View):
             else:
                 warning = "Event is not publicly visible - not scheduled."
 
-        if event.approval_set.filter(approved=False).exists():
+        event_data = get_event_context_data(event, get_privacy_tier(request))
+
+        if event_data['not_approved']:
             if not request.user.is_active:
                 return http.HttpResponse('Event not approved')
             else:
@@ -345,36 +574,9 @@ class EventView(View):
 
         hits = None
 
-        template_tagged = ''
-        if event.template and not event.is_upcoming():
-            # The only acceptable way to make autoplay be on
-            # is to send ?autoplay=true
-            # All other attempts will switch it off.
-            autoplay = request.GET.get('autoplay', 'false') == 'true'
-            context = {
-                'md5': lambda s: hashlib.md5(s).hexdigest(),
-                'event': event,
-                'request': request,
-                'datetime': datetime.datetime.utcnow(),
-                'vidly_tokenize': vidly.tokenize,
-                'edgecast_tokenize': edgecast_tokenize,
-                'popcorn_url': event.popcorn_url,
-                'autoplay': autoplay and 'true' or 'false',  # javascript
-            }
-            if isinstance(event.template_environment, dict):
-                context.update(event.template_environment)
-            template = Template(event.template.content)
-            try:
-                template_tagged = template.render(context)
-            except vidly.VidlyTokenizeError, msg:
-                template_tagged = '<code style="color:red">%s</code>' % msg
-
-            stats_query = (
-                EventHitStats.objects.filter(event=event)
-                .values_list('total_hits', flat=True)
-            )
-            for total_hits in stats_query:
-                hits = total_hits
+        template_tagged = self.render_video(event, request)
+        if template_tagged:
+            hits = event_data['hits']
 
         can_manage_edit_event = (
             request.user.is_active and
@@ -385,58 +587,30 @@ class EventView(View):
             request.user.is_active
         )
 
-        request.channels = event.channels.all()
-
-        participants = (
-            event.participants.filter(cleared=Participant.CLEARED_YES)
-        )
+        request.channels = event_data['channels']
 
         # needed for the open graph stuff
         event.url = reverse('main:event', args=(event.slug,))
 
-        # needed for the _event_privacy.html template
-        curated_groups = [
-            x[0] for x in
-            CuratedGroup.objects
-            .filter(event=event)
-            .values_list('name')
-            .order_by('name')
-        ]
-
         context = self.get_default_context(event, request)
         context.update({
             'event': event,
             'pending': event.status == Event.STATUS_PENDING,
             'video': template_tagged,
-            'participants': participants,
+            'participants': event_data['participants'],
             'warning': warning,
             'can_manage_edit_event': can_manage_edit_event,
             'can_edit_event': can_edit_event,
             'Event': Event,
             'hits': hits,
-            'tags': [t.name for t in event.tags.all()],
+            'tags': event_data['tags'],
             'channels': request.channels,
-            'curated_groups': curated_groups,
+            'curated_groups': event_data['curated_groups'],
         })
 
-        if (
-            not context['pending'] and event.is_public() and
-            event.has_vidly_template() and event.template_environment
-        ):
-            if event.template_environment.get('tag'):
-                context['vidly_tag'] = event.template_environment['tag']
-                hd = False  # default
-                vidly_submissions = (
-                    VidlySubmission.objects
-                    .filter(event=event, tag=context['vidly_tag'])
-                    .order_by('-submission_time')
-                )
-
-                for vidly_submission in vidly_submissions.values('hd'):
-                    hd = vidly_submission['hd']
-                    break
-
-                context['vidly_hd'] = hd
+        if event_data['vidly_hd'] is not None:
+            context['vidly_tag'] = event.template_environment['tag']
+            context['vidly_hd'] = event_data['vidly_hd']
 
         if event.pin:
             if (
@@ -602,9 +776,83 @@ class EventVideoView(EventView):
         context['embedded'] = self.embedded
         return context
 
+    def can_cache_embedded(self, event):
+        """return true if the embedded page can be cached and shared as
+        is, i.e. it won't change without the event changing.
+
+        What's shown for upcoming and live events changes as they start
+        and end, and templates that tokenize the video URL make tokens
+        that expire.
+        """
+        if event.is_upcoming() or event.is_live():
+            return False
+        if event.template and 'tokenize' in event.template.content:
+            return False
+        return True
+
+    def get_embedded(self, request, slug):
+        """return the response for the common case of a public, approved
+        event being embedded, or None if it's not that simple.
+
+        Unlike the event page, this doesn't need anything the embed
+        doesn't show so it's one query and the rendered page is cached.
+        """
+        kind, event_id = resolve_slug(slug)
+        if kind != SLUG_EVENT:
+            return None
+        autoplay = request.GET.get('autoplay', 'false') == 'true'
+        cache_key = make_event_video_cache_key(
+            event_id,
+            autoplay,
+            request.get_host(),
+            request.is_secure()
+        )
+        content = cache.get(cache_key)
+        if content is None:
+            events = (
+                Event.objects
+                .filter(
+                    id=event_id,
+                    privacy=Event.PRIVACY_PUBLIC,
+                    status__in=(Event.STATUS_SCHEDULED, Event.STATUS_PENDING)
+                )
+                .filter(Q(pin__isnull=True) | Q(pin=''))
+                .filter(approval_state=Event.APPROVAL_STATE_APPROVED)
+                .select_related('template')
+            )
+            for event in events:
+                break
+            else:
+                return None
+            context = self.get_default_context(event, request)
+            context.update({
+                'event': event,
+                'pending': event.status == Event.STATUS_PENDING,
+                'video': self.render_video(event, request),
+            })
+            # no context processors (i.e. no sidebar)
+            content = jingo.env.get_template(self.template_name).render(
+                context
+            )
+            if not self.can_cache_embedded(event):
+                return http.HttpResponse(content)
+            if settings.EVENT_VIDEO_CACHE_TTL:
+                cache.set(cache_key, content, settings.EVENT_VIDEO_CACHE_TTL)
+        response = http.HttpResponse(content)
+        patch_cache_control(
+            response,
+            public=True,
+            max_age=settings.EVENT_VIDEO_CACHE_TTL
+        )
+        return response
+
     def get(self, request, slug):
         self.embedded = request.GET.get('embedded', 'true') == 'true'
-        response = super(EventVideoView, self).get(request, slug)
+        response = None
+        if self.embedded:
+            response = self.get_embedded(request, slug)
+        if response is None:
+            response = super(EventVideoView, self).get(request, slug)
         # ALLOWALL is what YouTube uses for sharing
         if self.embedded:
             response['X-Frame-Options'] = 'ALLOWALL'
@@ -890,7 +1138,7 @@ def events_calendar_ical(request, privacy=None):
     cal = vobject.iCalendar()
 
     now = timezone.now()
-    base_qs = Event.objects.approved()
+    base_qs = Event.objects.approved().summary()
     if privacy == 'public':
         base_qs = base_qs.filter(privacy=Event.PRIVACY_PUBLIC)
         title = 'Air Mozilla Public Events'
@@ -969,7 +1217,7 @@ class EventsFeed(Feed):
     def items(self):
         now = timezone.now()
         qs = (
-            Event.objects.approved()
+            Event.objects.approved().summary()
             .filter(start_time__lt=now,
                     channels=self._channel)
             .order_by('-start_time')
@@ -978,7 +1226,12 @@ class EventsFeed(Feed):
             qs = qs.filter(privacy=Event.PRIVACY_PUBLIC)
         elif self.private_or_public == 'contributors':
             qs = qs.exclude(privacy=Event.PRIVACY_COMPANY)
-        return qs[:settings.FEED_SIZE]
+        events = list(qs[:settings.FEED_SIZE])
+        self._video_infos = dict(
+            (x.event_id, x)
+            for x in VideoInfo.objects.filter(event__in=events)
+        )
+        return events
 
     def item_title(self, event):
         return event.title
@@ -996,26 +1249,33 @@ class EventsFeed(Feed):
     def item_pubdate(self, event):
         return event.start_time
 
+    def item_enclosure_url(self, event):
+        video_info = self._video_infos.get(event.id)
+        if (
+            video_info and video_info.size and event.is_public() and
+            event.has_vidly_template() and
+            event.template_environment.get('tag')
+        ):
+            return 'https://vid.ly/%s?content=video&format=%s' % (
+                event.template_environment['tag'],
+                video_info.hd and 'hd_mp4' or 'mp4'
+            )
+
+    def item_enclosure_length(self, event):
+        return self._video_infos[event.id].size
+
+    def item_enclosure_mime_type(self, event):
+        return 'video/mp4'
+
 
 def channels(request):
     channels = []
 
-    privacy_filter = {}
-    privacy_exclude = {}
-    if request.user.is_active:
-        if is_contributor(request.user):
-            feed_privacy = 'contributors'
-            privacy_exclude = {'privacy': Event.PRIVACY_COMPANY}
-        else:
-            feed_privacy = 'company'
-    else:
-        privacy_filter = {'privacy': Event.PRIVACY_PUBLIC}
-        feed_privacy = 'public'
-    events = Event.objects.filter(status=Event.STATUS_SCHEDULED)
-    if privacy_filter:
-        events = events.filter(**privacy_filter)
-    elif privacy_exclude:
-        events = events.exclude(**privacy_exclude)
+    privacy_tier = get_privacy_tier(request)
+    feed_privacy = privacy_tier.tier
+    events = privacy_tier.filter(
+        Event.objects.filter(status=Event.STATUS_SCHEDULED)
+    )
 
     channels_qs = (
         Channel.objects
@@ -1069,16 +1329,16 @@ def tag_cloud(request, THRESHOLD=1):
         .values('tag_id')
         .annotate(Count('tag__id'))
     )
-    if request.user.is_active:
-        if is_contributor(request.user):
-            # because of a bug in Django we can't use qs.exclude()
-            qs = qs.filter(
-                Q(event__privacy=Event.PRIVACY_CONTRIBUTORS)
-                |
-                Q(event__privacy=Event.PRIVACY_PUBLIC)
-            )
+    privacy_tier = get_privacy_tier(request)
+    if privacy_tier.contributor:
+        # because of a bug in Django we can't use qs.exclude()
+        qs = qs.filter(
+            Q(event__privacy=Event.PRIVACY_CONTRIBUTORS)
+            |
+            Q(event__privacy=Event.PRIVACY_PUBLIC)
+        )
     else:
-        qs = qs.filter(event__privacy=Event.PRIVACY_PUBLIC)
+        qs = privacy_tier.filter(qs, prefix='event__')
     tags_map = dict(
         (x['id'], x['name'])
         for x in
@@ -1115,20 +1375,9 @@ def calendar_data(request):
     start = start.replace(tzinfo=utc)
     end = end.replace(tzinfo=utc)
 
-    events = Event.objects.approved()
-
-    privacy_filter = {}
-    privacy_exclude = {}
-    if request.user.is_active:
-        if is_contributor(request.user):
-            privacy_exclude = {'privacy': Event.PRIVACY_COMPANY}
-    else:
-        privacy_filter = {'privacy': Event.PRIVACY_PUBLIC}
-
-    if privacy_filter:
-        events = events.filter(**privacy_filter)
-    elif privacy_exclude:
-        events = events.exclude(**privacy_exclude)
+    events = get_privacy_tier(request).filter(
+        Event.objects.approved().summary()
+    )
 
     events = events.filter(
         start_time__gte=start,
@@ -1154,7 +1403,7 @@ def permission_denied(request, slug):
     context = {}
     event = get_object_or_404(Event, slug=slug)
     context['event'] = event
-    context['is_contributor'] = is_contributor(request.user)
+    context['is_contributor'] = get_privacy_tier(request).contributor
     context['is_company_only'] = event.privacy == Event.PRIVACY_COMPANY
 
     curated_groups = CuratedGroup.objects.filter(event=event).order_by('name')
@@ -1224,8 +1473,7 @@ def unpicked_pictures(request):
     pictures = Picture.objects.filter(event__isnull=False)
     events = Event.objects.archived()
     assert request.user.is_active
-    if is_contributor(request.user):
-        events = events.exclude(privacy=Event.PRIVACY_COMPANY)
+    events = get_privacy_tier(request).filter(events)
 
     events = events.filter(id__in=pictures.values('event'))
     events = events.exclude(picture__in=pictures)
@@ -0,0 +1,252 @@
+"""
+The numbers in the badges of the manage navigation.
+
+Instead of counting on every page they're kept in the cache and added
+to or subtracted from when something changes whether it's counted (see
+the signal receivers in manage/models.py). Whatever isn't in the cache
+is counted when it's needed. The reconcile_badges cron job counts them
+all again in case anything changed without signals, e.g. with
+`QuerySet.update()`.
+"""
+import collections
+
+from django.conf import settings
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.db.models import Q, Count
+
+from airmozilla.main.models import (
+    Approval,
+    Event,
+    SuggestedEvent,
+    EventTweet
+)
+
+
+EVENTS = 'badges:events'
+# counted for each group, see make_approvals_cache_key()
+APPROVALS = 'badges:approvals'
+TWEETS = 'badges:tweets'
+SUGGESTIONS = 'badges:suggestions'
+
+
+def make_user_groups_cache_key(user_id):
+    return 'badges:groups:%s' % user_id
+
+
+def make_approvals_cache_key(group_id):
+    return '%s:%s' % (APPROVALS, group_id)
+
+
+def count_events():
+    return Event.objects.initiated().count()
+
+
+def count_approvals(group_ids=None):
+    """return a dict of the number of approvals for each group"""
+    qs = (
+        Approval.objects
+        .filter(processed=False, group__isnull=False)
+        .exclude(event__status=Event.STATUS_REMOVED)
+    )
+    if group_ids is not None:
+        qs = qs.filter(group_id__in=group_ids)
+    qs = qs.values('group_id').annotate(count=Count('id'))
+    return dict((x['group_id'], x['count']) for x in qs)
+
+
+def count_tweets():
+    return (
+        EventTweet.objects.filter(
+            Q(sent_date__isnull=True) | Q(error__isnull=False)
+        )
+        .count()
+    )
+
+
+def count_suggestions():
+    return (
+        SuggestedEvent.objects
+        .filter(accepted=None)
+        .exclude(submitted=None)
+        .count()
+    )
+
+
+COUNTERS = {
+    EVENTS: count_events,
+    TWEETS: count_tweets,
+    SUGGESTIONS: count_suggestions,
+}
+
+# Whether a row is counted, by the fields that decide it. These have to
+# agree with the count_*() functions.
+ROWS = {
+    EVENTS: (
+        Event,
+        ('status', 'approval_state'),
+        lambda status, approval_state: (
+            status == Event.STATUS_INITIATED or
+            approval_state != Event.APPROVAL_STATE_APPROVED
+        )
+    ),
+    TWEETS: (
+        EventTweet,
+        ('sent_date', 'error'),
+        lambda sent_date, error: sent_date is None or error is not None
+    ),
+    SUGGESTIONS: (
+        SuggestedEvent,
+        ('accepted', 'submitted'),
+        lambda accepted, submitted: accepted is None and submitted is not None
+    ),
+}
+
+
+def is_approval_counted(processed, group_id, event_status):
+    return (
+        not processed and
+        group_id is not None and
+        event_status != Event.STATUS_REMOVED
+    )
+
+
+def counting():
+    """whether there are counts in the cache to keep up to date"""
+    return bool(settings.BADGES_CACHE_TTL)
+
+
+def get_state(key, pk):
+    """return the values of the fields that decide if the row is counted
+    as they are in the database, or None if it's not there"""
+    model, fields, __ = ROWS[key]
+    for values in model.objects.filter(pk=pk).values_list(*fields):
+        return values
+
+
+def get_instance_state(key, instance):
+    model, fields, __ = ROWS[key]
+    return tuple(
+        getattr(instance, model._meta.get_field(x).attname) for x in fields
+    )
+
+
+def get_approval_values(pk):
+    """like get_state() but what is_approval_counted() takes"""
+    qs = Approval.objects.filter(pk=pk)
+    for values in qs.values_list('processed', 'group', 'event__status'):
+        return values
+
+
+def _change(key, delta):
+    if not delta:
+        return
+    try:
+        if delta > 0:
+            cache.incr(key, delta)
+        else:
+            cache.decr(key, -delta)
+    except ValueError:
+        # it's not in the cache so it'll be counted when it's needed
+        pass
+
+
+def changed(key, before, after):
+    """a row has changed from one state to another (see get_state()).
+    None means it didn't exist or doesn't anymore."""
+    counted = ROWS[key][2]
+    _change(
+        key,
+        (after is not None and counted(*after)) -
+        (before is not None and counted(*before))
+    )
+
+
+def approvals_changed(before, after):
+    """an approval has changed (see get_approval_values())"""
+    deltas = collections.defaultdict(int)
+    for state, delta in ((before, -1), (after, 1)):
+        if state is not None and is_approval_counted(*state):
+            __, group_id, __ = state
+            deltas[group_id] += delta
+    for group_id, delta in deltas.items():
+        _change(make_approvals_cache_key(group_id), delta)
+
+
+def approvals_moved(group_ids, delta):
+    """these approvals (by their groups) started or stopped being
+    counted all at once, e.g. because their event was removed"""
+    for group_id in group_ids:
+        _change(make_approvals_cache_key(group_id), delta)
+
+
+def reconcile():
+    """count everything again and remember it"""
+    if not counting():
+        return
+    counts = dict((key, counter()) for key, counter in COUNTERS.items())
+    for group_id in Group.objects.values_list('id', flat=True):
+        counts[make_approvals_cache_key(group_id)] = 0
+    for group_id, count in count_approvals().items():
+        counts[make_approvals_cache_key(group_id)] = count
+    cache.set_many(counts, settings.BADGES_CACHE_TTL)
+
+
+def _remember(counts):
+    # with add() so that it doesn't undo a change made since it was
+    # counted
+    if counting():
+        for key, count in counts.items():
+            cache.add(key, count, settings.BADGES_CACHE_TTL)
+
+
+def get_counts(keys, user=None):
+    """return a dict of the counts of these keys. The count of APPROVALS
+    is of those for the groups `user` is in, so then `user` has to be
+    passed. It takes one or, for APPROVALS, two cache lookups unless
+    something's not been counted yet."""
+    lookup = [x for x in keys if x != APPROVALS]
+    if APPROVALS in keys:
+        groups_cache_key = make_user_groups_cache_key(user.id)
+        lookup.append(groups_cache_key)
+    counts = cache.get_many(lookup)
+
+    missing = dict(
+        (key, COUNTERS[key]())
+        for key in keys
+        if key != APPROVALS and key not in counts
+    )
+    counts.update(missing)
+    _remember(missing)
+
+    if APPROVALS in keys:
+        group_ids = counts.pop(groups_cache_key, None)
+        if group_ids is None:
+            group_ids = list(user.groups.values_list('id', flat=True))
+            if counting():
+                cache.set(
+                    groups_cache_key,
+                    group_ids,
+                    settings.BADGES_CACHE_TTL
+                )
+        approvals = cache.get_many(
+            [make_approvals_cache_key(x) for x in group_ids]
+        )
+        missing_group_ids = [
+            x for x in group_ids
+            if make_approvals_cache_key(x) not in approvals
+        ]
+        if missing_group_ids:
+            missing = dict(
+                (make_approvals_cache_key(x), 0) for x in missing_group_ids
+            )
+            for group_id, count in count_approvals(missing_group_ids).items():
+                missing[make_approvals_cache_key(group_id)] = count
+            approvals.update(missing)
+            _remember(missing)
+        counts[APPROVALS] = sum(approvals.values())
+    return counts
+
+
+def forget_user_groups(*user_ids):
+    cache.delete_many([make_user_groups_cache_key(x) for x in user_ids])
@@ -1,32 +1,30 @@
-from django.db.models import Q
-from airmozilla.main.models import (
-    Approval,
-    Event,
-    # Participant,
-    SuggestedEvent,
-    EventTweet
-)
+# from airmozilla.main.models import Participant
+from airmozilla.manage import badges as badges_
 
 
 def badges(request):
     if not request.path.startswith('/manage/'):
         return {}
     context = {'badges': {}}
-    # Event manager badge for unprocessed events
-    if request.user.has_perm('main.change_event_others'):
-        events = Event.objects.initiated().count()
-        if events > 0:
-            context['badges']['events'] = events
-    # Approval inbox badge
-    if request.user.has_perm('main.change_approval'):
-        approvals = (Approval.objects.filter(
-            group__in=request.user.groups.all(),
-            processed=False)
-            .exclude(event__status=Event.STATUS_REMOVED)
-            .count()
-        )
-        if approvals > 0:
-            context['badges']['approvals'] = approvals
+    can_see = {
+        # Event manager badge for unprocessed events
+        badges_.EVENTS: request.user.has_perm('main.change_event_others'),
+        # Approval inbox badge
+        badges_.APPROVALS: request.user.has_perm('main.change_approval'),
+        # Unsent tweets
+        badges_.TWEETS: request.user.has_perm('main.change'),
+        badges_.SUGGESTIONS: request.user.has_perm('main.add_event'),
+    }
+    # the approvals are counted for the groups the user is in
+    counts = badges_.get_counts(
+        [key for key, can in can_see.items() if can],
+        user=can_see[badges_.APPROVALS] and request.user or None
+    )
+
+    if counts.get(badges_.EVENTS):
+        context['badges']['events'] = counts[badges_.EVENTS]
+    if counts.get(badges_.APPROVALS):
+        context['badges']['approvals'] = counts[badges_.APPROVALS]
 
     # Commented out because we're not using it
     # # Uncleared participants badge
@@ -37,25 +35,9 @@ def badges(request):
     #     if participants > 0:
     #         context['badges']['part_edit'] = participants
 
-    # Unsent tweets
-    if request.user.has_perm('main.change'):
-        tweets = (
-            EventTweet.objects.filter(
-                Q(sent_date__isnull=True) | Q(error__isnull=False)
-            )
-            .count()
-        )
-        if tweets:
-            context['badges']['tweets'] = tweets
-
-    if request.user.has_perm('main.add_event'):
-        suggestions = (
-            SuggestedEvent.objects
-            .filter(accepted=None)
-            .exclude(submitted=None)
-            .count()
-        )
-        if suggestions > 0:
-            context['badges']['suggestions'] = suggestions
+    if counts.get(badges_.TWEETS):
+        context['badges']['tweets'] = counts[badges_.TWEETS]
+    if counts.get(badges_.SUGGESTIONS):
+        context['badges']['suggestions'] = counts[badges_.SUGGESTIONS]
     context['is_superuser'] = request.user.is_superuser
     return context
@@ -1,15 +1,21 @@
 import datetime
 
+from django.conf import settings
 from django.core.cache import cache
+from django.utils import timezone
 
 import cronjobs
 
 from airmozilla.cronlogger.decorators import capture
+from airmozilla.base import mozillians
+from airmozilla.main.models import CuratedGroup, EventTombstone
 from . import tweeter
 from . import pestering
 from . import event_hit_stats
 from . import archiver
 from . import videoinfo
+from . import badges
+from . import url_transformer
 
 
 @cronjobs.register
@@ -50,8 +56,11 @@ def update_event_hit_stats():
 @capture
 def fetch_durations():
     videoinfo.fetch_durations(
-        max_=3,
+        max_=10,
         verbose=True,
+        probe=True,
+        processes=settings.VIDEOINFO_PROCESSES,
+        timeout=settings.VIDEOINFO_TIMEOUT,
     )
 
 
@@ -67,8 +76,45 @@ def import_screencaptures():
 @capture
 def fetch_screencaptures():
     videoinfo.fetch_screencaptures(
-        max_=2,
+        max_=4,
         verbose=True,
         import_=False,
         save_locally=True,
+        extraction=videoinfo.EXTRACTION_SINGLE,
+        processes=settings.VIDEOINFO_PROCESSES,
+        timeout=settings.VIDEOINFO_TIMEOUT,
     )
+
+
+@cronjobs.register
+@capture
+def prewarm_curated_groups():
+    groups = (
+        CuratedGroup.objects
+        .values_list('name', flat=True)
+        .distinct()
+    )
+    counts = mozillians.prewarm_group_members(groups)
+    for name in sorted(counts):
+        print name.encode('utf-8'), counts[name]
+
+
+@cronjobs.register
+@capture
+def purge_event_tombstones():
+    old = timezone.now() - datetime.timedelta(
+        days=settings.EVENT_TOMBSTONE_DAYS
+    )
+    EventTombstone.objects.filter(deleted__lt=old).delete()
+
+
+@cronjobs.register
+@capture
+def reconcile_badges():
+    badges.reconcile()
+
+
+@cronjobs.register
+@capture
+def flush_url_transform_use_counts():
+    url_transformer.flush_use_counts()
@@ -360,8 +360,8 @@ class EventTweetForm(BaseModelForm):
             )
 
         if event.placeholder_img:
-            from airmozilla.main.helpers import thumbnail
-            thumb = thumbnail(event.placeholder_img, '100x100')
+            from airmozilla.main.thumbnails import generate_thumbnail
+            thumb = generate_thumbnail(event.placeholder_img, '100x100')
 
             self.fields['include_placeholder'].help_text = (
                 '<img src="%(url)s" alt="placeholder" class="thumbnail" '
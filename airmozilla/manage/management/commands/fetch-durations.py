@@ -26,6 +26,19 @@ class Command(BaseCommand):  # pragma: no cover
             default=False,
             help='Save the video file locally only if public event'
         ),
+        make_option(
+            '--probe', action='store_true', dest='probe',
+            default=False,
+            help='Use ffprobe to also store resolution, codecs, bitrate etc.'
+        ),
+        make_option(
+            '--processes', action='store', dest='processes', default=1,
+            help='Number of events to process in parallel (default 1)'
+        ),
+        make_option(
+            '--timeout', action='store', dest='timeout', default=None,
+            help='Max. seconds per event when using --processes'
+        ),
     )
 
     def handle(self, **options):
@@ -35,5 +48,8 @@ class Command(BaseCommand):  # pragma: no cover
             dry_run=options['dry_run'],
             save_locally=options['save_locally'],
             save_locally_some=options['save_locally_some'],
+            probe=options['probe'],
+            processes=int(options['processes']),
+            timeout=options['timeout'] and int(options['timeout']),
             verbose=verbosity > 1
         )
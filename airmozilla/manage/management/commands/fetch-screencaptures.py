@@ -31,6 +31,19 @@ class Command(BaseCommand):  # pragma: no cover
             default=False,
             help='Save the video file locally only if public event'
         ),
+        make_option(
+            '--extraction', action='store', dest='extraction',
+            default=None,
+            help='sequential, parallel or single (default from settings)'
+        ),
+        make_option(
+            '--processes', action='store', dest='processes', default=1,
+            help='Number of events to process in parallel (default 1)'
+        ),
+        make_option(
+            '--timeout', action='store', dest='timeout', default=None,
+            help='Max. seconds per event when using --processes'
+        ),
     )
 
     def handle(self, **options):
@@ -42,5 +55,8 @@ class Command(BaseCommand):  # pragma: no cover
             save_locally=options['save_locally'],
             save_locally_some=options['save_locally_some'],
             import_=import_,
+            extraction=options['extraction'],
+            processes=int(options['processes']),
+            timeout=options['timeout'] and int(options['timeout']),
             verbose=verbosity > 1
         )
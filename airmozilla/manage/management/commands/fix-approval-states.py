@@ -0,0 +1,35 @@
+from optparse import make_option
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from airmozilla.main.models import fix_approval_states
+
+
+class Command(BaseCommand):  # pragma: no cover
+
+    help = (
+        'Check that the approval state of every event matches its '
+        'approvals and fix the ones that do not'
+    )
+
+    option_list = BaseCommand.option_list + (
+        make_option(
+            '--dry-run', action='store_true', dest='dry_run', default=False,
+            help='Only report the events that are wrong'
+        ),
+    )
+
+    @transaction.commit_on_success
+    def handle(self, **options):
+        wrong = fix_approval_states(dry_run=options['dry_run'])
+        verb = options['dry_run'] and 'should be' or 'changed to'
+        for state, event_ids in sorted(wrong.items()):
+            print "%d events %s %r: %s" % (
+                len(event_ids),
+                verb,
+                state,
+                ', '.join(str(x) for x in sorted(event_ids))
+            )
+        if not wrong:
+            print "All approval states are correct"
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from airmozilla.manage.tagging import merge_case_duplicate_tags
+
+
+class Command(BaseCommand):  # pragma: no cover
+
+    help = (
+        'Merge all tags that only differ in case into the one used the most'
+    )
+
+    @transaction.commit_on_success
+    def handle(self, **options):
+        count = merge_case_duplicate_tags()
+        if int(options['verbosity']) > 0:
+            print "Merged %d tag%s" % (count, count != 1 and 's' or '')
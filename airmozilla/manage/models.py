@@ -3,9 +3,172 @@ from django.contrib.auth.models import User
 from django.dispatch import receiver
 from django.db import models
 
+from airmozilla.main.models import (
+    Approval,
+    Event,
+    SuggestedEvent,
+    EventTweet,
+    URLMatch,
+    URLTransform,
+    approval_state_changed,
+    get_approval_state
+)
+from airmozilla.manage import badges
+from airmozilla.manage import url_transformer
+
+
+# what the badge counts of the other models are kept under
+BADGES_KEYS = {
+    EventTweet: badges.TWEETS,
+    SuggestedEvent: badges.SUGGESTIONS,
+}
+
 
 @receiver(models.signals.post_save, sender=User)
 @receiver(models.signals.m2m_changed, sender=User.groups.through)
 def invalidate_user_cache(sender, instance, **kwargs):
     cache_key = '_get_all_users'
     cache.delete(cache_key)
+
+
+@receiver(models.signals.m2m_changed, sender=User.groups.through)
+def forget_badges_user_groups(sender, instance, action, reverse, pk_set,
+                              **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        badges.forget_user_groups(instance.id)
+    elif pk_set:
+        badges.forget_user_groups(*pk_set)
+    else:
+        # e.g. `group.user_set.clear()`
+        badges.forget_user_groups(*(
+            instance.user_set.values_list('id', flat=True)
+        ))
+
+
+# The badge counts are added to or subtracted from when a row starts or
+# stops being counted, so what it was like before is remembered first.
+@receiver(models.signals.pre_save, sender=Event)
+@receiver(models.signals.pre_delete, sender=Event)
+def remember_badges_event(sender, instance, raw=False, **kwargs):
+    if raw or not badges.counting():
+        return
+    instance._badges_before = (
+        instance.id and badges.get_state(badges.EVENTS, instance.id)
+    )
+
+
+@receiver(models.signals.post_save, sender=Event)
+def update_badges_event(sender, instance, raw=False, **kwargs):
+    if raw or not badges.counting():
+        return
+    before = instance._badges_before
+    after = badges.get_instance_state(badges.EVENTS, instance)
+    badges.changed(badges.EVENTS, before, after)
+    if before:
+        was_removed = before[0] == Event.STATUS_REMOVED
+        is_removed = instance.status == Event.STATUS_REMOVED
+        if was_removed != is_removed:
+            badges.approvals_moved(
+                Approval.objects
+                .filter(event=instance, processed=False, group__isnull=False)
+                .values_list('group_id', flat=True),
+                was_removed and 1 or -1
+            )
+
+
+@receiver(models.signals.post_delete, sender=Event)
+def update_badges_deleted_event(sender, instance, **kwargs):
+    if not badges.counting() or not instance._badges_before:
+        return
+    status, __ = instance._badges_before
+    # its approvals have been deleted by now and that has already been
+    # counted as changing its approval state
+    badges.changed(
+        badges.EVENTS,
+        (status, get_approval_state(instance.id)),
+        None
+    )
+
+
+@receiver(approval_state_changed, sender=Event)
+def update_badges_event_approval_state(sender, event_id, old, new,
+                                       **kwargs):
+    if not badges.counting():
+        return
+    for status in Event.objects.filter(id=event_id).values_list(
+        'status', flat=True
+    ):
+        badges.changed(badges.EVENTS, (status, old), (status, new))
+
+
+@receiver(models.signals.pre_save, sender=Approval)
+@receiver(models.signals.pre_delete, sender=Approval)
+def remember_badges_approval(sender, instance, raw=False, **kwargs):
+    if raw or not badges.counting():
+        return
+    instance._badges_before = (
+        instance.id and badges.get_approval_values(instance.id)
+    )
+
+
+@receiver(models.signals.post_save, sender=Approval)
+def update_badges_approval(sender, instance, raw=False, **kwargs):
+    if raw or not badges.counting():
+        return
+    status = (
+        Event.objects
+        .filter(id=instance.event_id)
+        .values_list('status', flat=True)[0]
+    )
+    badges.approvals_changed(
+        instance._badges_before,
+        (instance.processed, instance.group_id, status)
+    )
+
+
+@receiver(models.signals.post_delete, sender=Approval)
+def update_badges_deleted_approval(sender, instance, **kwargs):
+    if badges.counting():
+        badges.approvals_changed(instance._badges_before, None)
+
+
+@receiver(models.signals.pre_save, sender=EventTweet)
+@receiver(models.signals.pre_delete, sender=EventTweet)
+@receiver(models.signals.pre_save, sender=SuggestedEvent)
+@receiver(models.signals.pre_delete, sender=SuggestedEvent)
+def remember_badges_row(sender, instance, raw=False, **kwargs):
+    if raw or not badges.counting():
+        return
+    instance._badges_before = (
+        instance.id and badges.get_state(BADGES_KEYS[sender], instance.id)
+    )
+
+
+@receiver(models.signals.post_save, sender=EventTweet)
+@receiver(models.signals.post_save, sender=SuggestedEvent)
+def update_badges_row(sender, instance, raw=False, **kwargs):
+    if raw or not badges.counting():
+        return
+    key = BADGES_KEYS[sender]
+    badges.changed(
+        key,
+        instance._badges_before,
+        badges.get_instance_state(key, instance)
+    )
+
+
+@receiver(models.signals.post_delete, sender=EventTweet)
+@receiver(models.signals.post_delete, sender=SuggestedEvent)
+def update_badges_deleted_row(sender, instance, **kwargs):
+    if badges.counting():
+        badges.changed(BADGES_KEYS[sender], instance._badges_before, None)
+
+
+@receiver(models.signals.post_save, sender=URLMatch)
+@receiver(models.signals.post_delete, sender=URLMatch)
+@receiver(models.signals.post_save, sender=URLTransform)
+@receiver(models.signals.post_delete, sender=URLTransform)
+def forget_url_transformer_rules(sender, **kwargs):
+    url_transformer.forget_rules()
@@ -10,34 +10,35 @@ var serializeObject = function(obj) {
     return str.join("&");
 };
 
-function escapeRegExp(string){
-    return string.replace(/([.*+?^=!:${}()|\[\]\/\\])/g, "\\$1");
-}
-
 
-// We already have a limitTo filter built-in to angular,
-// let's make a startFrom filter
-app.filter('startFrom', function() {
-    return function(input, start) {
-        start = +start; //parse to int
-        return input.slice(start);
-    };
-});
+// The data views send a list of field names and each row as a list
+// of values in that order. Turn that back into a list of objects.
+function decodeColumnar(table) {
+    return table.rows.map(function(row) {
+        var item = {};
+        table.fields.forEach(function(field, i) {
+            if (row[i] !== null) {
+                item[field] = row[i];
+            }
+        });
+        return item;
+    });
+}
 
 
-EventManagerController.$inject = ['$scope', '$http'];
+EventManagerController.$inject = ['$scope', '$http', '$timeout'];
 
-function EventManagerController($scope, $http) {
+function EventManagerController($scope, $http, $timeout) {
     'use strict';
 
     $scope.first_loading = true;
-    $scope.second_loading = true;
     function fetchEvents(params) {
         var url = location.pathname + 'data/';
         url += '?' + serializeObject(params);
         return $http.get(url);
     }
     $scope.events = [];
+    $scope.count = 0;
     $scope.currentPage = 0;
     $scope.sorting = 'modified';
     $scope.sorting_reverse = true;
@@ -78,17 +79,13 @@ function EventManagerController($scope, $http) {
         }
     });
 
-    $scope.numberOfPages = function(items){
-        if (typeof items === 'undefined') return 0;
-        return Math.ceil(items.length / $scope.pageSize);
+    $scope.numberOfPages = function() {
+        return Math.ceil($scope.count / $scope.pageSize);
     };
     $scope.formatDate = function(date) {
         return moment(date).format('ddd, MMM D, YYYY, h:mma UTCZZ');
     };
 
-    $scope.resetCurrentPage = function() {
-        $scope.currentPage = 0;
-    };
     $scope.resetFilter = function(key) {
         $scope[key] = '';
     };
@@ -116,139 +113,20 @@ function EventManagerController($scope, $http) {
     };
 
     $scope.search_title = '';
-    var search_title_regexes = [];
-    var search_slug_regex = null;
-    $scope.$watch('search_title', function(value) {
-        search_title_regexes = [];
-        angular.forEach(value.trim().split(' '), function(part) {
-            search_title_regexes.push(new RegExp('\\b' + escapeRegExp(part), 'i'));
-        });
-        if (value.trim()) {
-            search_slug_regex = new RegExp('^' + escapeRegExp(value.trim()), 'i');
-        }
-        $scope.currentPage = 0;
-    });
-
     $scope.search_location = '';
-    var search_location_regex = null;
-    $scope.$watch('search_location', function(value) {
-        search_location_regex = new RegExp(escapeRegExp(value), 'i');
-        $scope.currentPage = 0;
-    });
-
     $scope.search_cat_chan = '';
-    var search_cat_chan_regex = null;
-    $scope.$watch('search_cat_chan', function(value) {
-        search_cat_chan_regex = new RegExp(escapeRegExp(value), 'i');
-        $scope.currentPage = 0;
-    });
-
     $scope.search_status = '';
     $scope.search_privacy = '';
     $scope.search_start_time = '';
     $scope.search_archived = '';
     $scope.search_only = '';
 
-    $scope.$watch('search_status', function() {
-        $scope.currentPage = 0;
-    });
-    $scope.$watch('search_privacy', function() {
-        $scope.currentPage = 0;
-    });
-    $scope.$watch('search_start_time', function() {
-        $scope.currentPage = 0;
-    });
-    $scope.$watch('search_archived', function() {
-        $scope.currentPage = 0;
-    });
-    $scope.$watch('search_only', function() {
-        $scope.currentPage = 0;
-    });
-
-    $scope.filterBySearch = function(event) {
-        if (!$scope.hasFilter()) return true;
-
-        // gimme a reason NOT to include this
-        if ($scope.search_title) {
-            var unmatched = false;
-            angular.forEach(search_title_regexes, function(regex) {
-                if (!unmatched && !regex.test(event.title)) {
-                    unmatched = true;
-                }
-            });
-            if (unmatched && search_slug_regex && search_slug_regex.test(event.slug)) {
-                unmatched = false;
-            }
-            // at least one regex said no
-            if (unmatched) return false;
-        }
-        if ($scope.search_location) {
-            if (!search_location_regex.test(event.location)) {
-                return false;
-            }
-        }
-        if ($scope.search_cat_chan) {
-            // it must match either the category or one of the channels
-            var something = false;
-            if (search_cat_chan_regex.test(event.category)) {
-                something = true;
-            } else {
-                angular.forEach(event.channels, function(channel) {
-                    if (!something && search_cat_chan_regex.test(channel)) {
-                        something = true;
-                    }
-                });
-            }
-            //if (!something) return false;
-            return something;
-        }
-        if ($scope.search_status && $scope.search_status !== event.status) {
-            return false;
-        }
-        if ($scope.search_privacy && $scope.search_privacy !== event.privacy) {
-            return false;
-        }
-        if ($scope.search_start_time && !in_search_start_time_range(moment(event.start_time_iso))) {
-            return false;
-        }
-        if ($scope.search_archived) {
-            if ($scope.search_archived === 'archived') {
-                if (!event.archive_time) {
-                    return false;
-                }
-            } else {
-                if (event.archive_time) {
-                    return false;
-                }
-            }
-        }
-        if ($scope.search_only) {
-            if ($scope.search_only === 'upcoming') {
-                return !!event.is_upcoming;
-            } else if ($scope.search_only === 'needs_approval') {
-                return !!event.needs_approval;
-            } else if ($scope.search_only === 'live') {
-                return !!event.is_live;
-            } else if ($scope.search_only === 'mozillian') {
-                return !!event.mozillian;
-            } else {
-                console.warn('Unrecognized option', $scope.search_only);
-            }
-        }
-        return true;
-    };
-    var search_start_times = [];
     $scope.$watch('search_start_time', function(value) {
         if (value) {
-            value = moment.utc(value);
-            search_start_times = [value, value.clone().add('days', 1)];
-            $scope.sorting = 'start_time_iso';
+            $scope.sorting = 'start_time';
             $scope.sorting_reverse = true;
         }
     });
-    function in_search_start_time_range(date) {
-        return date > search_start_times[0];
-    }
 
     $scope.selectSearchStatus = function(status) {
         $scope.search_status = status;
@@ -263,8 +141,48 @@ function EventManagerController($scope, $http) {
             $scope.search_only = only;
         }
     };
+
+    // the filtering is done by the server with these parameters
+    var filterParams = {
+        search_title: 'title',
+        search_location: 'location',
+        search_cat_chan: 'channel',
+        search_status: 'status',
+        search_privacy: 'privacy',
+        search_start_time: 'start_time',
+        search_archived: 'archived',
+        search_only: 'only'
+    };
+
+    // what to ask the server for, apart from which page
+    function getParams() {
+        var params = {
+            page_size: $scope.pageSize,
+            sort: ($scope.sorting_reverse ? '-' : '') + $scope.sorting
+        };
+        angular.forEach(filterParams, function(param, key) {
+            var value = ($scope[key] || '').trim();
+            if (value) {
+                params[param] = value;
+            }
+        });
+        return params;
+    }
     /* End filtering */
 
+    /* The server sends one page at a time with a cursor for the next
+       one, so we remember the cursors of the pages we've been to. */
+    var cursors = [null];
+    $scope.hasNextPage = function() {
+        return !!cursors[$scope.currentPage + 1];
+    };
+    $scope.goToPage = function(page) {
+        if (page === 0 || cursors[page]) {
+            $scope.currentPage = page;
+            load();
+        }
+    };
+
     $scope.urls = {};
     $scope.url = function(viewname, item) {
         if (!$scope.urls[viewname]) {
@@ -273,28 +191,42 @@ function EventManagerController($scope, $http) {
         return $scope.urls[viewname].replace('0', item);
     };
 
-    function loadAll() {
-        fetchEvents({})
-          .success(function(data) {
-              $scope.events = data.events;
-          }).error(function(data, status) {
-              console.warn('Failed to fetch ALL events', status);
-          }).finally(function() {
-              $scope.second_loading = false;
-          });
-    }
-
-    function loadSome() {
-        fetchEvents({limit: $scope.pageSize})
+    var latest = 0;
+    function load() {
+        var page = $scope.currentPage;
+        var params = getParams();
+        if (cursors[page]) {
+            params.after = cursors[page];
+        }
+        var request = ++latest;
+        fetchEvents(params)
           .success(function(data) {
+              // an older request that finished late
+              if (request !== latest) return;
               $scope.urls = data.urls;
-              $scope.events = data.events;
-              loadAll();
+              $scope.events = decodeColumnar(data.events);
+              cursors[page + 1] = data.next;
+              // only sent for the first page
+              if (data.count !== null) {
+                  $scope.count = data.count;
+              }
           }).error(function(data, status) {
               console.warn('Failed to fetch events', status);
           }).finally(function() {
               $scope.first_loading = false;
           });
     }
-    loadSome();
+
+    // start from the first page again when the filtering, sorting or
+    // page size changes
+    var loadTimeout = null;
+    $scope.$watch(function() {
+        return serializeObject(getParams());
+    }, function(value, old) {
+        $scope.currentPage = 0;
+        cursors = [null];
+        $timeout.cancel(loadTimeout);
+        // wait a little in case you're still typing
+        loadTimeout = $timeout(load, value === old ? 0 : 300);
+    });
 }
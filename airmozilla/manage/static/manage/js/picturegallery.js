@@ -10,10 +10,6 @@ var serializeObject = function(obj) {
     return str.join("&");
 };
 
-function escapeRegExp(string){
-    return string.replace(/([.*+?^=!:${}()|\[\]\/\\])/g, "\\$1");
-}
-
 
 // from https://gist.github.com/yrezgui/5653591
 app.filter( 'filesize', function () {
@@ -42,19 +38,23 @@ app.filter( 'filesize', function () {
      };
 });
 
-// We already have a limitTo filter built-in to angular,
-// let's make a startFrom filter
-app.filter('startFrom', function() {
-    return function(input, start) {
-        if (angular.isUndefined(input)) return input;
-        start = +start; //parse to int
-        return input.slice(start);
-    };
-});
+// The data views send a list of field names and each row as a list
+// of values in that order. Turn that back into a list of objects.
+function decodeColumnar(table) {
+    return table.rows.map(function(row) {
+        var item = {};
+        table.fields.forEach(function(field, i) {
+            if (row[i] !== null) {
+                item[field] = row[i];
+            }
+        });
+        return item;
+    });
+}
 
 
-app.controller('PictureGalleryController', ['$scope', '$http',
-    function($scope, $http) {
+app.controller('PictureGalleryController', ['$scope', '$http', '$timeout',
+    function($scope, $http, $timeout) {
         'use strict';
 
         // When you load the picture gallery for a specific event, it will set
@@ -67,13 +67,17 @@ app.controller('PictureGalleryController', ['$scope', '$http',
 
         $scope.currentPage = 0;
 
+        // the current event's own pictures go before all the others
+        $scope.own_pictures = [];
+        $scope.pictures = [];
+        $scope.count = 0;
+
         $scope.deleteAllConfirmation = false;
 
         $scope.deleteAllSuccess = false;
 
-        $scope.numberOfPages = function(items){
-            if (typeof items === 'undefined') return 0;
-            return Math.ceil(items.length / $scope.pageSize);
+        $scope.numberOfPages = function() {
+            return Math.ceil($scope.count / $scope.pageSize);
         };
 
         /* Page size */
@@ -92,7 +96,6 @@ app.controller('PictureGalleryController', ['$scope', '$http',
             if (window.localStorage) {
                 window.localStorage.setItem(pageSizeStorageKey, value);
             }
-            $scope.currentPage = 0;
         });
         /* End page size */
 
@@ -132,60 +135,37 @@ app.controller('PictureGalleryController', ['$scope', '$http',
         };
 
         $scope.search_notes = '';
-        var search_notes_regex = null;
-        $scope.$watch('search_notes', function(value) {
-            search_notes_regex = new RegExp('\\b' + escapeRegExp(value), 'i');
-            $scope.currentPage = 0;
-        });
-
         $scope.search_created = '';
-        var search_created_a, search_created_b;
-        $scope.$watch('search_created', function(value) {
-            //var v = moment(value);
-            if (value === 'today') {
-                search_created_a = moment().startOf('day');
-                search_created_b = null;
-            } else if (value === 'yesterday') {
-                search_created_b = moment().startOf('day');
-                search_created_a = search_created_b.subtract(1, 'days');
-            } else if (value === 'this_week') {
-                search_created_a = moment().startOf('week');
-                search_created_b = null;
-            } else if (value === 'older_than_this_week') {
-                search_created_a = null;
-                search_created_b = moment().startOf('week');
-            } else if (value) {
-                console.warn("Unrecognized value for search_created", value);
-            }
-            $scope.currentPage = 0;
-        });
 
-        $scope.filterBySearch = function(item) {
-            // gimme a reason NOT to include this
-            if ($scope.search_notes) {
-                if (!search_notes_regex.test(item.notes)) {
-                    return false;
-                }
+        // what to ask the server for, apart from which page
+        function getParams() {
+            var params = {page_size: $scope.pageSize};
+            var notes = ($scope.search_notes || '').trim();
+            if (notes) {
+                params.notes = notes;
             }
-
-            if ($scope.search_created) {
-                var created = moment(item.created);
-                if (search_created_a && search_created_b) {
-                    if (created < search_created_a || created > search_created_b) {
-                        return false;
-                    }
-                } else if (search_created_a) {
-                    if (created < search_created_a) {
-                        return false;
-                    }
-                } else if (search_created_b) {
-                    if (created > search_created_b) {
-                        return false;
-                    }
-                }
+            var created_after = null;
+            var created_before = null;
+            if ($scope.search_created === 'today') {
+                created_after = moment().startOf('day');
+            } else if ($scope.search_created === 'yesterday') {
+                created_before = moment().startOf('day');
+                created_after = created_before.clone().subtract(1, 'days');
+            } else if ($scope.search_created === 'this_week') {
+                created_after = moment().startOf('week');
+            } else if ($scope.search_created === 'older_than_this_week') {
+                created_before = moment().startOf('week');
+            } else if ($scope.search_created) {
+                console.warn("Unrecognized value for search_created", $scope.search_created);
             }
-            return true;
-        };
+            if (created_after) {
+                params.created_after = created_after.toISOString();
+            }
+            if (created_before) {
+                params.created_before = created_before.toISOString();
+            }
+            return params;
+        }
         /* End filtering */
 
         $scope.associatePicture = function(picture) {
@@ -239,10 +219,11 @@ app.controller('PictureGalleryController', ['$scope', '$http',
                 headers: {'Content-Type': 'application/x-www-form-urlencoded'},
                 data: serializeObject(data)
             }).success(function(data) {
-                $scope.pictures.splice(
-                    $scope.pictures.indexOf(picture),
-                    1
-                );
+                [$scope.own_pictures, $scope.pictures].forEach(function(pictures) {
+                    if (pictures.indexOf(picture) > -1) {
+                        pictures.splice(pictures.indexOf(picture), 1);
+                    }
+                });
             }).error(function(data, status) {
                 console.warn('Failed to delete picture with event', status);
             });
@@ -260,9 +241,7 @@ app.controller('PictureGalleryController', ['$scope', '$http',
                 headers: {'Content-Type': 'application/x-www-form-urlencoded'},
                 data: serializeObject(data)
             }).success(function(data) {
-                $scope.pictures = $scope.pictures.filter(function(picture) {
-                    return picture.event !== CURRENT_EVENT;
-                });
+                $scope.own_pictures = [];
                 $scope.deleteAllSuccess = true;
             }).error(function(data, status) {
                 console.warn('Failed to delete pictures for this event', status);
@@ -276,28 +255,99 @@ app.controller('PictureGalleryController', ['$scope', '$http',
             return $scope.urls[viewname].replace('0', item);
         };
 
-        function fetchPictures() {
+        function fetchPictures(params) {
             var url = location.pathname + 'data/';
             if (window.location.search) {
-                url += window.location.search;
+                url += window.location.search + '&';
+            } else {
+                url += '?';
             }
+            url += serializeObject(params);
             return $http.get(url);
         }
 
+        // the current event's own pictures go first
+        $scope.shownPictures = function() {
+            if ($scope.currentPage) {
+                return $scope.pictures;
+            }
+            return $scope.own_pictures.concat($scope.pictures);
+        };
+
+        /* The server sends one page at a time with a cursor for the next
+           one, so we remember the cursors of the pages we've been to. */
+        var cursors = [null];
+        $scope.hasNextPage = function() {
+            return !!cursors[$scope.currentPage + 1];
+        };
+        $scope.goToPage = function(page) {
+            if (page === 0 || cursors[page]) {
+                $scope.currentPage = page;
+                load();
+            }
+        };
+
+        var latest = 0;
         function load() {
-            fetchPictures()
+            var page = $scope.currentPage;
+            var params = getParams();
+            if (cursors[page]) {
+                params.after = cursors[page];
+            }
+            if ($scope.current_event) {
+                params.own = 'no';
+            }
+            var request = ++latest;
+            fetchPictures(params)
                 .success(function(data) {
-                    $scope.pictures = data.pictures;
+                    // an older request that finished late
+                    if (request !== latest) return;
+                    $scope.pictures = decodeColumnar(data.pictures);
                     $scope.stats = data.stats;
-                    console.log(data.stats);
                     $scope.urls = data.urls;
+                    cursors[page + 1] = data.next;
+                    // only sent for the first page
+                    if (data.count !== null) {
+                        $scope.count = data.count;
+                    }
                 }).error(function(data, status) {
                     console.warn('Failed to fetch pictures', status);
                 }).finally(function() {
                     $scope.loading = false;
                 });
         }
-        // initial load
-        load();
+
+        // there aren't many of those so they're all on the first page
+        var latestOwn = 0;
+        function loadOwn() {
+            if (!$scope.current_event) return;
+            var params = getParams();
+            params.own = 'yes';
+            params.page_size = 1000;
+            var request = ++latestOwn;
+            fetchPictures(params)
+                .success(function(data) {
+                    if (request !== latestOwn) return;
+                    $scope.own_pictures = decodeColumnar(data.pictures);
+                }).error(function(data, status) {
+                    console.warn('Failed to fetch event pictures', status);
+                });
+        }
+
+        // start from the first page again when the filtering or page
+        // size changes
+        var loadTimeout = null;
+        $scope.$watch(function() {
+            return serializeObject(getParams());
+        }, function(value, old) {
+            $scope.currentPage = 0;
+            cursors = [null];
+            $timeout.cancel(loadTimeout);
+            // wait a little in case you're still typing
+            loadTimeout = $timeout(function() {
+                load();
+                loadOwn();
+            }, value === old ? 0 : 300);
+        });
 
     }]);
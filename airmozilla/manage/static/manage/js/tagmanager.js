@@ -10,20 +10,20 @@ var serializeObject = function(obj) {
     return str.join("&");
 };
 
-function escapeRegExp(string){
-    return string.replace(/([.*+?^=!:${}()|\[\]\/\\])/g, "\\$1");
-}
-
 
-// We already have a limitTo filter built-in to angular,
-// let's make a startFrom filter
-app.filter('startFrom', function() {
-    return function(input, start) {
-        if (angular.isUndefined(input)) return input;
-        start = +start; //parse to int
-        return input.slice(start);
-    };
-});
+// The data views send a list of field names and each row as a list
+// of values in that order. Turn that back into a list of objects.
+function decodeColumnar(table) {
+    return table.rows.map(function(row) {
+        var item = {};
+        table.fields.forEach(function(field, i) {
+            if (row[i] !== null) {
+                item[field] = row[i];
+            }
+        });
+        return item;
+    });
+}
 
 
 TagManagerController.$inject = ['$scope', '$http', '$timeout'];
@@ -60,7 +60,8 @@ function TagManagerController($scope, $http, $timeout) {
         url += '?' + serializeObject(params);
         return $http.get(url);
     }
-    $scope.events = [];
+    $scope.tags = [];
+    $scope.count = 0;
     $scope.currentPage = 0;
 
     var pageSize = 10;  // default
@@ -78,34 +79,15 @@ function TagManagerController($scope, $http, $timeout) {
         if (window.localStorage) {
             window.localStorage.setItem(pageSizeStorageKey, value);
         }
-        $scope.currentPage = 0;
-    });
-
-    $scope.$watch('currentPage', function(value) {
-        if (value) {
-            window.location.hash = '#' + (++value);
-        }
     });
 
-    $timeout(function() {
-        var hash_page_regex = new RegExp(/#(\d+)/);
-        if (hash_page_regex.test(window.location.hash)) {
-            var page = +window.location.hash.match(hash_page_regex)[1];
-            $scope.currentPage = --page;
-        }
-    }, 100);
-
-    $scope.numberOfPages = function(items){
-        if (typeof items === 'undefined') return 0;
-        return Math.ceil(items.length / $scope.pageSize);
+    $scope.numberOfPages = function() {
+        return Math.ceil($scope.count / $scope.pageSize);
     };
     $scope.formatDate = function(date) {
         return moment(date).format('ddd, MMM D, YYYY, h:mma UTCZZ');
     };
 
-    $scope.resetCurrentPage = function() {
-        $scope.currentPage = 0;
-    };
     $scope.resetFilter = function(key) {
         $scope[key] = '';
     };
@@ -120,53 +102,83 @@ function TagManagerController($scope, $http, $timeout) {
     };
 
     $scope.search_minimum = '';
-
     $scope.search_name = '';
-    var search_name_regex = null;
-    $scope.$watch('search_name', function(value) {
-        search_name_regex = new RegExp('\\b' + escapeRegExp(value), 'i');
-        $scope.currentPage = 0;
-    });
-
-    $scope.filterBySearch = function(item) {
-        if (!$scope.hasFilter()) return true;
 
-        // gimme a reason NOT to include this
-        if ($scope.search_name) {
-            if (!search_name_regex.test(item.name)) {
-                return false;
-            }
+    // what to ask the server for, apart from which page
+    function getParams() {
+        var params = {
+            page_size: $scope.pageSize,
+            sort: ($scope.sort_by_desc ? '-' : '') + $scope.sort_by
+        };
+        var name = ($scope.search_name || '').trim();
+        if (name) {
+            params.name = name;
         }
-        if ($scope.search_minimum) {
-            if (item._usage_count < $scope.search_minimum) {
-                return false;
-            }
+        // ignore it till it's a number
+        var minimum = parseInt($scope.search_minimum, 10);
+        if (!isNaN(minimum)) {
+            params.minimum = minimum;
         }
-        return true;
-    };
-
-    $scope.filterByRepeated = function(item) {
         if ($scope.show_only_repeated === 'yes') {
-            return item._repeated;
+            params.repeated = 'yes';
         }
-        return true;
-    };
+        return params;
+    }
     /* End filtering */
 
+    /* The server sends one page at a time with a cursor for the next
+       one, so we remember the cursors of the pages we've been to. */
+    var cursors = [null];
+    $scope.hasNextPage = function() {
+        return !!cursors[$scope.currentPage + 1];
+    };
+    $scope.goToPage = function(page) {
+        if (page === 0 || cursors[page]) {
+            $scope.currentPage = page;
+            load();
+        }
+    };
+
     $scope.url = function(viewname, item) {
         return $scope.urls[viewname].replace('0', item);
     };
 
-    function loadAll() {
-        fetchTags({})
+    var latest = 0;
+    function load() {
+        var page = $scope.currentPage;
+        var params = getParams();
+        if (cursors[page]) {
+            params.after = cursors[page];
+        }
+        var request = ++latest;
+        fetchTags(params)
           .success(function(data) {
-              $scope.tags = data.tags;
+              // an older request that finished late
+              if (request !== latest) return;
               $scope.urls = data.urls;
+              $scope.tags = decodeColumnar(data.tags);
+              cursors[page + 1] = data.next;
+              // only sent for the first page
+              if (data.count !== null) {
+                  $scope.count = data.count;
+              }
           }).error(function(data, status) {
-              console.warn('Failed to fetch ALL tags', status);
+              console.warn('Failed to fetch tags', status);
           }).finally(function() {
               $scope.loading = false;
           });
     }
-    loadAll();
+
+    // start from the first page again when the filtering, sorting or
+    // page size changes
+    var loadTimeout = null;
+    $scope.$watch(function() {
+        return serializeObject(getParams());
+    }, function(value, old) {
+        $scope.currentPage = 0;
+        cursors = [null];
+        $timeout.cancel(loadTimeout);
+        // wait a little in case you're still typing
+        loadTimeout = $timeout(load, value === old ? 0 : 300);
+    });
 }
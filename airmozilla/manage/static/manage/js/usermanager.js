@@ -10,25 +10,25 @@ var serializeObject = function(obj) {
     return str.join("&");
 };
 
-function escapeRegExp(string){
-    return string.replace(/([.*+?^=!:${}()|\[\]\/\\])/g, "\\$1");
-}
-
 
-// We already have a limitTo filter built-in to angular,
-// let's make a startFrom filter
-app.filter('startFrom', function() {
-    return function(input, start) {
-        if (angular.isUndefined(input)) return input;
-        start = +start; //parse to int
-        return input.slice(start);
-    };
-});
+// The data views send a list of field names and each row as a list
+// of values in that order. Turn that back into a list of objects.
+function decodeColumnar(table) {
+    return table.rows.map(function(row) {
+        var item = {};
+        table.fields.forEach(function(field, i) {
+            if (row[i] !== null) {
+                item[field] = row[i];
+            }
+        });
+        return item;
+    });
+}
 
 
-UserManagerController.$inject = ['$scope', '$http'];
+UserManagerController.$inject = ['$scope', '$http', '$timeout'];
 
-function UserManagerController($scope, $http) {
+function UserManagerController($scope, $http, $timeout) {
     'use strict';
 
     $scope.sorting = 'last_login';
@@ -57,7 +57,8 @@ function UserManagerController($scope, $http) {
         url += '?' + serializeObject(params);
         return $http.get(url);
     }
-    $scope.events = [];
+    $scope.users = [];
+    $scope.count = 0;
     $scope.currentPage = 0;
 
     var pageSize = 10;  // default
@@ -77,17 +78,13 @@ function UserManagerController($scope, $http) {
         }
     });
 
-    $scope.numberOfPages = function(items){
-        if (typeof items === 'undefined') return 0;
-        return Math.ceil(items.length / $scope.pageSize);
+    $scope.numberOfPages = function() {
+        return Math.ceil($scope.count / $scope.pageSize);
     };
     $scope.formatDate = function(date) {
         return moment(date).format('ddd, MMM D, YYYY, h:mma UTCZZ');
     };
 
-    $scope.resetCurrentPage = function() {
-        $scope.currentPage = 0;
-    };
     $scope.resetFilter = function(key) {
         $scope[key] = '';
     };
@@ -104,87 +101,87 @@ function UserManagerController($scope, $http) {
     };
 
     $scope.search_email = '';
-    var search_email_regex = null;
-    $scope.$watch('search_email', function(value) {
-        search_email_regex = new RegExp('\\b' + escapeRegExp(value), 'i');
-        $scope.currentPage = 0;
-    });
-
     $scope.search_group = '';
-    var search_group_regex = null;
-    $scope.$watch('search_group', function(value) {
-        search_group_regex = new RegExp(escapeRegExp(value), 'i');
-        $scope.currentPage = 0;
-    });
-
     $scope.search_staff = '';
+    $scope.search_status = '';
+
+    // the filtering is done by the server with these parameters
+    var filterParams = {
+        search_email: 'email',
+        search_group: 'group',
+        search_staff: 'staff',
+        search_status: 'status'
+    };
 
-    $scope.filterBySearch = function(item) {
-        // if (!$scope.hasFilter()) return true;
-
-        // gimme a reason NOT to include this
-        if ($scope.search_email) {
-            if (!search_email_regex.test(item.email)) {
-                return false;
-            }
-        }
-        if ($scope.search_staff) {
-            if ($scope.search_staff === 'staff') {
-                if (!item.is_staff) {
-                    return false;
-                }
-            } else {
-                if (item.is_staff) {
-                    return false;
-                }
-            }
-        }
-        if ($scope.search_group) {
-            if (!item.groups) return false;
-            var matched = false;
-            if ($scope.search_group === '*') {
-                return item.groups.length;
-            }
-            item.groups.forEach(function(group) {
-                if (search_group_regex.test(group)) {
-                    matched = true;
-                }
-            });
-            return matched;
-        }
-        if ($scope.search_status) {
-            if ($scope.search_status === 'contributor') {
-                if (!item.is_contributor) {
-                    return false;
-                }
-            } else if ($scope.search_status === 'superuser') {
-                if (!item.is_superuser) {
-                    return false;
-                }
-            } else if ($scope.search_status === 'inactive') {
-                if (!item.is_inactive) {
-                    return false;
-                }
+    // what to ask the server for, apart from which page
+    function getParams() {
+        var params = {
+            page_size: $scope.pageSize,
+            sort: ($scope.sorting_reverse ? '-' : '') + $scope.sorting
+        };
+        angular.forEach(filterParams, function(param, key) {
+            var value = ($scope[key] || '').trim();
+            if (value) {
+                params[param] = value;
             }
+        });
+        return params;
+    }
+    /* End filtering */
+
+    /* The server sends one page at a time with a cursor for the next
+       one, so we remember the cursors of the pages we've been to. */
+    var cursors = [null];
+    $scope.hasNextPage = function() {
+        return !!cursors[$scope.currentPage + 1];
+    };
+    $scope.goToPage = function(page) {
+        if (page === 0 || cursors[page]) {
+            $scope.currentPage = page;
+            load();
         }
-        return true;
     };
-    /* End filtering */
 
     $scope.url = function(viewname, item) {
         return $scope.urls[viewname].replace('0', item);
     };
 
-    function loadAll() {
-        fetchUsers({})
+    var latest = 0;
+    function load() {
+        var page = $scope.currentPage;
+        var params = getParams();
+        if (cursors[page]) {
+            params.after = cursors[page];
+        }
+        var request = ++latest;
+        fetchUsers(params)
           .success(function(data) {
+              // an older request that finished late
+              if (request !== latest) return;
               $scope.urls = data.urls;
-              $scope.users = data.users;
+              $scope.users = decodeColumnar(data.users);
+              cursors[page + 1] = data.next;
+              // only sent for the first page
+              if (data.count !== null) {
+                  $scope.count = data.count;
+              }
           }).error(function(data, status) {
-              console.warn('Failed to fetch ALL', status);
+              console.warn('Failed to fetch users', status);
           }).finally(function() {
               $scope.loading = false;
           });
     }
-    loadAll();
+
+    // start from the first page again when the filtering, sorting or
+    // page size changes
+    var loadTimeout = null;
+    $scope.$watch(function() {
+        return serializeObject(getParams());
+    }, function(value, old) {
+        $scope.currentPage = 0;
+        cursors = [null];
+        $timeout.cancel(loadTimeout);
+        // wait a little in case you're still typing
+        loadTimeout = $timeout(load, value === old ? 0 : 300);
+    });
 }
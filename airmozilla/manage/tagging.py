@@ -0,0 +1,120 @@
+"""
+Merging and deleting tags in bulk.
+
+Instead of adding and removing tags event by event (several queries
+each) these work on the tables behind `Event.tags`, `EventRevision.tags`
+and `SuggestedEvent.tags` directly so the number of queries doesn't
+depend on how many events use the tags.
+No `m2m_changed` signals are sent so the cached event contexts are
+forgotten explicitly.
+"""
+import collections
+
+from django.db.models import Count
+
+from airmozilla.main.models import (
+    Event,
+    EventRevision,
+    SuggestedEvent,
+    Tag,
+    forget_event_context
+)
+
+
+def _get_tag_throughs():
+    """yield each table of tags and the name of the column that points
+    to what's tagged"""
+    for model in (Event, EventRevision, SuggestedEvent):
+        through = model.tags.through
+        column = through._meta.get_field(model._meta.module_name).attname
+        yield through, column
+
+
+def merge_tags(merges):
+    """`merges` maps the ID of each tag to get rid of to the ID of the
+    tag to use instead. Anything tagged with both afterwards only gets
+    it once. The merged tags are deleted."""
+    if not merges:
+        return
+    if set(merges) & set(merges.values()):
+        raise ValueError('Can not merge into a tag that is merged itself')
+    replaced_by = collections.defaultdict(list)
+    for tag_id, replacement_id in merges.items():
+        replaced_by[replacement_id].append(tag_id)
+
+    event_ids = set()
+    for through, column in _get_tag_throughs():
+        rows = (
+            through.objects
+            .filter(tag_id__in=set(merges) | set(merges.values()))
+            .order_by('id')
+            .values_list('id', column, 'tag_id')
+        )
+        # the (object, tag) pairs there will be when it's all done
+        taken = set(
+            (owner_id, tag_id)
+            for __, owner_id, tag_id in rows
+            if tag_id not in merges
+        )
+        duplicates = []
+        for id, owner_id, tag_id in rows:
+            if tag_id not in merges:
+                continue
+            if through is Event.tags.through:
+                event_ids.add(owner_id)
+            pair = (owner_id, merges[tag_id])
+            if pair in taken:
+                duplicates.append(id)
+            else:
+                taken.add(pair)
+        if duplicates:
+            through.objects.filter(id__in=duplicates).delete()
+        for replacement_id, tag_ids in replaced_by.items():
+            (
+                through.objects
+                .filter(tag_id__in=tag_ids)
+                .update(tag=replacement_id)
+            )
+
+    Tag.objects.filter(id__in=merges.keys()).delete()
+    forget_event_context(*event_ids)
+
+
+def delete_tags(tag_ids):
+    """delete the tags and untag everything that had them"""
+    tag_ids = list(tag_ids)
+    event_ids = (
+        Event.tags.through.objects
+        .filter(tag_id__in=tag_ids)
+        .values_list('event_id', flat=True)
+    )
+    forget_event_context(*event_ids)
+    for through, __ in _get_tag_throughs():
+        through.objects.filter(tag_id__in=tag_ids).delete()
+    Tag.objects.filter(id__in=tag_ids).delete()
+
+
+def merge_case_duplicate_tags():
+    """merge all tags that are the same but for their case into the one
+    used by most events (or the oldest one if that's a tie).
+    Returns the number of tags merged away."""
+    counts = dict(
+        Event.tags.through.objects
+        .values('tag_id')
+        .annotate(count=Count('tag'))
+        .values_list('tag_id', 'count')
+    )
+    spellings = collections.defaultdict(list)
+    for tag_id, name in Tag.objects.order_by('id').values_list('id', 'name'):
+        spellings[name.lower()].append(tag_id)
+
+    merges = {}
+    for tag_ids in spellings.values():
+        if len(tag_ids) < 2:
+            continue
+        keep = max(tag_ids, key=lambda x: (counts.get(x, 0), -x))
+        for tag_id in tag_ids:
+            if tag_id != keep:
+                merges[tag_id] = keep
+    merge_tags(merges)
+    return len(merges)
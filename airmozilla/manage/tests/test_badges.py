@@ -0,0 +1,122 @@
+from django.contrib.auth.models import Group, User
+from django.core.cache import cache
+from django.test import TestCase
+from django.test.client import RequestFactory
+
+from nose.tools import eq_
+
+from airmozilla.main.models import Approval, Event
+from airmozilla.manage import badges
+from airmozilla.manage.context_processors import badges as badges_context
+
+
+class BadgesTestCase(TestCase):
+    fixtures = ['airmozilla/manage/tests/main_testdata.json']
+
+    def setUp(self):
+        super(BadgesTestCase, self).setUp()
+        cache.clear()
+
+    def test_counts_updated_by_signals(self):
+        event = Event.objects.get(title='Test event')
+        group = Group.objects.create(name='PR')
+        user = User.objects.create_user('bob', 'bob@mozilla.com', 'x')
+        user.groups.add(group)
+        keys = list(badges.COUNTERS) + [badges.APPROVALS]
+        with self.settings(BADGES_CACHE_TTL=60):
+            badges.reconcile()
+            counts = badges.get_counts(keys, user=user)
+            eq_(counts[badges.EVENTS], 0)
+            eq_(counts[badges.APPROVALS], 0)
+
+            approval = Approval.objects.create(event=event, group=group)
+            with self.assertNumQueries(0):
+                counts = badges.get_counts(keys, user=user)
+            eq_(counts[badges.EVENTS], 1)
+            eq_(counts[badges.APPROVALS], 1)
+
+            event.status = Event.STATUS_REMOVED
+            event.save()
+            counts = badges.get_counts(keys, user=user)
+            eq_(counts[badges.EVENTS], 1)
+            eq_(counts[badges.APPROVALS], 0)
+            event.status = Event.STATUS_SCHEDULED
+            event.save()
+            eq_(badges.get_counts(keys, user=user)[badges.APPROVALS], 1)
+
+            approval.processed = True
+            approval.approved = True
+            approval.save()
+            counts = badges.get_counts(keys, user=user)
+            eq_(counts[badges.EVENTS], 0)
+            eq_(counts[badges.APPROVALS], 0)
+
+            Approval.objects.create(event=event, group=group)
+            Approval.objects.create(event=event, group=group)
+            counts = badges.get_counts(keys, user=user)
+            eq_(counts[badges.EVENTS], 1)
+            eq_(counts[badges.APPROVALS], 2)
+            event.delete()
+            counts = badges.get_counts(keys, user=user)
+            eq_(counts[badges.EVENTS], 0)
+            eq_(counts[badges.APPROVALS], 0)
+
+    def test_counts_not_recounted_by_signals(self):
+        event = Event.objects.get(title='Test event')
+        group = Group.objects.create(name='PR')
+        with self.settings(BADGES_CACHE_TTL=60):
+            # pretend there are others that haven't been counted
+            cache.set(badges.EVENTS, 10)
+            cache.set(badges.make_approvals_cache_key(group.id), 10)
+            approval = Approval.objects.create(event=event, group=group)
+            eq_(cache.get(badges.EVENTS), 11)
+            eq_(cache.get(badges.make_approvals_cache_key(group.id)), 11)
+            approval.delete()
+            eq_(cache.get(badges.EVENTS), 10)
+            eq_(cache.get(badges.make_approvals_cache_key(group.id)), 10)
+
+            # what's not in the cache is left to be counted
+            cache.delete(badges.EVENTS)
+            Approval.objects.create(event=event, group=group)
+            eq_(cache.get(badges.EVENTS), None)
+
+    def test_reconcile(self):
+        event = Event.objects.get(title='Test event')
+        group = Group.objects.create(name='PR')
+        with self.settings(BADGES_CACHE_TTL=60):
+            Approval.objects.create(event=event, group=group)
+            eq_(badges.get_counts([badges.EVENTS])[badges.EVENTS], 1)
+
+            # no signals
+            Approval.objects.all().update(processed=True, approved=True)
+            eq_(badges.get_counts([badges.EVENTS])[badges.EVENTS], 1)
+            badges.reconcile()
+            eq_(badges.get_counts([badges.EVENTS])[badges.EVENTS], 0)
+
+    def test_context_processor(self):
+        event = Event.objects.get(title='Test event')
+        group = Group.objects.create(name='PR')
+        other_group = Group.objects.create(name='Other')
+        Approval.objects.create(event=event, group=group)
+        Approval.objects.create(event=event, group=other_group)
+        user = User.objects.create_superuser('bob', 'bob@mozilla.com', 'x')
+        user.groups.add(group)
+
+        request = RequestFactory().get('/manage/')
+        request.user = user
+        with self.settings(BADGES_CACHE_TTL=60):
+            context = badges_context(request)
+            eq_(context['badges'], {'events': 1, 'approvals': 1})
+
+            with self.assertNumQueries(0):
+                context = badges_context(request)
+            eq_(context['badges'], {'events': 1, 'approvals': 1})
+
+            # when the user's groups change
+            user.groups.add(other_group)
+            context = badges_context(request)
+            eq_(context['badges'], {'events': 1, 'approvals': 2})
+
+        request = RequestFactory().get('/')
+        request.user = user
+        eq_(badges_context(request), {})
@@ -0,0 +1,120 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+
+from nose.tools import eq_, ok_, assert_raises
+
+from airmozilla.main.models import (
+    Event,
+    EventRevision,
+    SuggestedEvent,
+    Tag
+)
+from airmozilla.manage.tagging import (
+    merge_tags,
+    delete_tags,
+    merge_case_duplicate_tags
+)
+
+
+class TaggingTestCase(TestCase):
+    fixtures = ['airmozilla/manage/tests/main_testdata.json']
+
+    def _create_events(self, number, *tags):
+        event = Event.objects.get(title='Test event')
+        events = []
+        for i in range(number):
+            other = Event.objects.create(
+                title='Event %d' % i,
+                slug='event-%d' % i,
+                start_time=event.start_time,
+            )
+            for tag in tags:
+                other.tags.add(tag)
+            events.append(other)
+        return events
+
+    def _count_queries(self, function, *args):
+        connection.use_debug_cursor = True
+        try:
+            before = len(connection.queries)
+            function(*args)
+            return len(connection.queries) - before
+        finally:
+            connection.use_debug_cursor = False
+
+    def test_merge_tags(self):
+        t1 = Tag.objects.create(name='Tagg')
+        t2 = Tag.objects.create(name='TaGG')
+        t3 = Tag.objects.create(name='tAgg')
+
+        event = Event.objects.get(title='Test event')
+        event.tags.add(t1)
+        event2, event3 = self._create_events(2)
+        event2.tags.add(t1, t2)
+        event3.tags.add(t2, t3)
+        revision = EventRevision.objects.create_from_event(event3)
+        suggested_event = SuggestedEvent.objects.create(
+            user=User.objects.create(username='bob'),
+            title='Suggested',
+            slug='suggested',
+        )
+        suggested_event.tags.add(t1, t3)
+
+        merge_tags({t1.id: t2.id, t3.id: t2.id})
+
+        eq_(list(Tag.objects.filter(name__iexact='tagg')), [t2])
+        eq_(Event.objects.filter(tags=t2).count(), 3)
+        eq_(Event.tags.through.objects.filter(tag=t2).count(), 3)
+        eq_(list(revision.tags.all()), [t2])
+        eq_(list(suggested_event.tags.all()), [t2])
+        ok_(Tag.objects.get(name='testing') in event.tags.all())
+
+    def test_merge_tags_constant_queries(self):
+        t1 = Tag.objects.create(name='Tagg')
+        t2 = Tag.objects.create(name='TaGG')
+        self._create_events(1, t1, t2)
+        few = self._count_queries(merge_tags, {t1.id: t2.id})
+
+        t1 = Tag.objects.create(name='Tagg')
+        self._create_events(10, t1)
+        self._create_events(10, t1, t2)
+        eq_(self._count_queries(merge_tags, {t1.id: t2.id}), few)
+        eq_(Event.objects.filter(tags=t2).count(), 21)
+
+    def test_merge_tags_into_merged_tag(self):
+        t1 = Tag.objects.create(name='Tagg')
+        t2 = Tag.objects.create(name='TaGG')
+        t3 = Tag.objects.create(name='tAgg')
+        assert_raises(ValueError, merge_tags, {t1.id: t2.id, t2.id: t3.id})
+
+    def test_delete_tags(self):
+        t1 = Tag.objects.create(name='Tagg')
+        t2 = Tag.objects.create(name='Other')
+        events = self._create_events(3, t1, t2)
+        revision = EventRevision.objects.create_from_event(events[0])
+
+        delete_tags([t1.id])
+        ok_(not Tag.objects.filter(name='Tagg'))
+        eq_(Event.objects.filter(tags=t2).count(), 3)
+        ok_(not Event.tags.through.objects.filter(tag_id=t1.id))
+        eq_(list(revision.tags.all()), [t2])
+
+    def test_merge_case_duplicate_tags(self):
+        t1 = Tag.objects.create(name='Tagg')
+        t2 = Tag.objects.create(name='TaGG')
+        t3 = Tag.objects.create(name='tAgg')
+        other = Tag.objects.create(name='Other')
+        other2 = Tag.objects.create(name='OTHER')
+        self._create_events(1, t1)
+        self._create_events(2, t2, t3)
+
+        eq_(merge_case_duplicate_tags(), 3)
+        # t2 and t3 are used as much but t2 is older
+        eq_(list(Tag.objects.filter(name__iexact='tagg')), [t2])
+        eq_(Event.objects.filter(tags=t2).count(), 3)
+        # neither is used so the oldest is kept
+        eq_(list(Tag.objects.filter(name__iexact='other')), [other])
+        ok_(not Tag.objects.filter(id=other2.id))
+
+        eq_(merge_case_duplicate_tags(), 0)
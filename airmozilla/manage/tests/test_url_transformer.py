@@ -1,7 +1,10 @@
 from nose.tools import eq_, ok_
+import mock
 
 from django.test import TestCase
+from django.test.utils import override_settings
 from django.conf import settings
+from django.core.cache import cache
 
 from airmozilla.main.models import URLMatch, URLTransform
 from airmozilla.manage import url_transformer
@@ -11,6 +14,7 @@ class URLTransformerTestCase(TestCase):
 
     def setUp(self):
         super(URLTransformerTestCase, self).setUp()
+        cache.clear()
         settings.URL_TRANSFORM_PASSWORDS = {
             'foo': 'bar',
         }
@@ -57,3 +61,85 @@ class URLTransformerTestCase(TestCase):
         ok_(not error)
         ok_(result.startswith('http://foo:'))
         ok_('bar' not in result)
+
+    def test_run_cached(self):
+        url = 'http://www.com/test'
+        match = URLMatch.objects.create(
+            name='Always Be Safe',
+            string='^http://'
+        )
+        URLTransform.objects.create(
+            match=match,
+            find='^http://',
+            replace_with='https://'
+        )
+        with self.settings(URL_TRANSFORM_CACHE_TTL=60):
+            eq_(url_transformer.run(url), ('https://www.com/test', None))
+            with self.assertNumQueries(0):
+                eq_(
+                    url_transformer.run(url),
+                    ('https://www.com/test', None)
+                )
+            # not changed, so not counted
+            url_transformer.run('https://www.com/test')
+            eq_(URLMatch.objects.get(id=match.id).use_count, 0)
+
+            eq_(url_transformer.flush_use_counts(), 1)
+            eq_(URLMatch.objects.get(id=match.id).use_count, 2)
+            eq_(url_transformer.flush_use_counts(), 0)
+            eq_(URLMatch.objects.get(id=match.id).use_count, 2)
+
+            # only one flush at a time
+            url_transformer.run(url)
+            eq_(url_transformer.get_unflushed_use_counts([match.id]), {
+                match.id: 1
+            })
+            cache.set(url_transformer.FLUSH_LOCK_CACHE_KEY, True, 60)
+            eq_(url_transformer.flush_use_counts(), 0)
+            cache.delete(url_transformer.FLUSH_LOCK_CACHE_KEY)
+            eq_(url_transformer.flush_use_counts(), 1)
+            eq_(URLMatch.objects.get(id=match.id).use_count, 3)
+            eq_(url_transformer.get_unflushed_use_counts([match.id]), {})
+
+            # changing a transform changes the rules
+            URLTransform.objects.create(
+                match=match,
+                find='test$',
+                replace_with='{{ password("foo") }}',
+                order=2
+            )
+            eq_(url_transformer.run(url), ('https://www.com/bar', None))
+
+    @override_settings(URL_TRANSFORM_CACHE_TTL=0)
+    def test_run_counts_use(self):
+        url = 'http://www.com/test'
+        match = URLMatch.objects.create(
+            name='Always Be Safe',
+            string='^http://'
+        )
+        URLTransform.objects.create(
+            match=match,
+            find='^http://',
+            replace_with='https://'
+        )
+        other = URLMatch.objects.create(
+            name='Never used',
+            string='^ftp://'
+        )
+        url_transformer.run(url)
+        url_transformer.run(url)
+        url_transformer.run(url, dry=True)
+        eq_(URLMatch.objects.get(id=match.id).use_count, 2)
+        eq_(URLMatch.objects.get(id=other.id).use_count, 0)
+
+    def test_count_use_evicted(self):
+        match = URLMatch.objects.create(
+            name='Always Be Safe',
+            string='^http://'
+        )
+        with self.settings(URL_TRANSFORM_CACHE_TTL=60):
+            # as if it was evicted between being added and incremented
+            with mock.patch.object(cache, 'incr') as mocked_incr:
+                mocked_incr.side_effect = ValueError
+                url_transformer.count_use(match.id)
+            eq_(URLMatch.objects.get(id=match.id).use_count, 1)
@@ -0,0 +1,263 @@
+import os
+import shutil
+import time
+import tempfile
+import threading
+
+from nose.tools import eq_, ok_
+
+from django.test import TestCase
+from django.conf import settings
+
+from airmozilla.manage import video_cache
+
+
+class VideoCacheTestCase(TestCase):
+
+    _original_directory_name = settings.VIDEO_CACHE_DIRECTORY_NAME
+    _original_max_size = settings.VIDEO_CACHE_MAX_SIZE
+
+    def setUp(self):
+        super(VideoCacheTestCase, self).setUp()
+        settings.VIDEO_CACHE_DIRECTORY_NAME = (
+            'test_' + self._original_directory_name
+        )
+        self.downloaded = []
+
+    def tearDown(self):
+        assert settings.VIDEO_CACHE_DIRECTORY_NAME.startswith('test_')
+        settings.VIDEO_CACHE_MAX_SIZE = self._original_max_size
+        temp_dir = os.path.join(
+            tempfile.gettempdir(),
+            settings.VIDEO_CACHE_DIRECTORY_NAME
+        )
+        if os.path.isdir(temp_dir):
+            shutil.rmtree(temp_dir)
+        super(VideoCacheTestCase, self).tearDown()
+
+    def _download(self, url, filepath, **kwargs):
+        self.downloaded.append(url)
+        with open(filepath, 'wb') as f:
+            f.write('0' * 1000)
+
+    def test_get_downloads_once(self):
+        key = video_cache.make_key('abc123', hd=True)
+        headers = {'Content-Length': '1000', 'ETag': '"xxx"'}
+        filepath = video_cache.get(
+            key,
+            'https://vid.ly/abc123',
+            'abc123.mp4',
+            headers,
+            self._download
+        )
+        ok_(os.path.isfile(filepath))
+        ok_(filepath.endswith('abc123.mp4'))
+        eq_(self.downloaded, ['https://vid.ly/abc123'])
+
+        filepath2 = video_cache.get(
+            key,
+            'https://vid.ly/abc123',
+            'abc123.mp4',
+            headers,
+            self._download
+        )
+        eq_(filepath, filepath2)
+        eq_(len(self.downloaded), 1)
+
+        # the SD version is a different file
+        video_cache.get(
+            video_cache.make_key('abc123', hd=False),
+            'https://vid.ly/abc123',
+            'abc123.mp4',
+            headers,
+            self._download
+        )
+        eq_(len(self.downloaded), 2)
+
+    def test_get_changed_remote_file(self):
+        key = video_cache.make_key('abc123')
+        video_cache.get(
+            key,
+            'https://vid.ly/abc123',
+            'abc123.mp4',
+            {'Content-Length': '1000', 'ETag': '"xxx"'},
+            self._download
+        )
+        eq_(len(self.downloaded), 1)
+        # the remote file has changed since
+        video_cache.get(
+            key,
+            'https://vid.ly/abc123',
+            'abc123.mp4',
+            {'Content-Length': '1000', 'ETag': '"yyy"'},
+            self._download
+        )
+        eq_(len(self.downloaded), 2)
+
+    def test_get_incomplete_download(self):
+        key = video_cache.make_key('abc123')
+        filepath = video_cache.get(
+            key,
+            'https://vid.ly/abc123',
+            'abc123.mp4',
+            {'Content-Length': '1000'},
+            self._download
+        )
+        with open(filepath, 'wb') as f:
+            f.write('0' * 10)
+        video_cache.get(
+            key,
+            'https://vid.ly/abc123',
+            'abc123.mp4',
+            {'Content-Length': '1000'},
+            self._download
+        )
+        eq_(len(self.downloaded), 2)
+        eq_(os.stat(filepath).st_size, 1000)
+
+    def test_evict_least_recently_used(self):
+        settings.VIDEO_CACHE_MAX_SIZE = 2500
+        filepaths = []
+        for i, tag in enumerate(('abc', 'def', 'ghi')):
+            filepath = video_cache.get(
+                video_cache.make_key(tag),
+                'https://vid.ly/%s' % tag,
+                '%s.mp4' % tag,
+                {},
+                self._download
+            )
+            # make sure they're not all created in the same second
+            os.utime(filepath, (1000 + i, 1000 + i))
+            filepaths.append(filepath)
+
+        # the oldest one is gone
+        ok_(not os.path.isfile(filepaths[0]))
+        ok_(os.path.isfile(filepaths[1]))
+        ok_(os.path.isfile(filepaths[2]))
+
+        # use the 'def' one
+        video_cache.get(
+            video_cache.make_key('def'),
+            'https://vid.ly/def',
+            'def.mp4',
+            {},
+            self._download
+        )
+        eq_(len(self.downloaded), 3)
+        video_cache.get(
+            video_cache.make_key('jkl'),
+            'https://vid.ly/jkl',
+            'jkl.mp4',
+            {},
+            self._download
+        )
+        ok_(os.path.isfile(filepaths[1]))
+        ok_(not os.path.isfile(filepaths[2]))
+
+    def test_get_resume_interrupted_download(self):
+        key = video_cache.make_key('abc123')
+        headers = {'Content-Length': '1000'}
+        partial_filepaths = []
+
+        def failing_download(url, filepath, **kwargs):
+            partial_filepaths.append(filepath)
+            with open(filepath, 'wb') as f:
+                f.write('0' * 10)
+            raise IOError('network hiccup')
+
+        self.assertRaises(
+            IOError,
+            video_cache.get,
+            key,
+            'https://vid.ly/abc123',
+            'abc123.mp4',
+            headers,
+            failing_download
+        )
+
+        def resuming_download(url, filepath, **kwargs):
+            # the partial file is still there
+            eq_(filepath, partial_filepaths[0])
+            eq_(os.stat(filepath).st_size, 10)
+            with open(filepath, 'ab') as f:
+                f.write('0' * 990)
+
+        filepath = video_cache.get(
+            key,
+            'https://vid.ly/abc123',
+            'abc123.mp4',
+            headers,
+            resuming_download
+        )
+        eq_(os.stat(filepath).st_size, 1000)
+        ok_(not os.path.isdir(os.path.dirname(partial_filepaths[0])))
+
+    def test_get_downloads_once_at_a_time(self):
+        key = video_cache.make_key('abc123')
+        headers = {'Content-Length': '1000'}
+        results = []
+
+        def get():
+            results.append(video_cache.get(
+                key,
+                'https://vid.ly/abc123',
+                'abc123.mp4',
+                headers,
+                self._download
+            ))
+
+        # someone else wants it too while it's being downloaded
+        other = threading.Thread(target=get)
+
+        def download(url, filepath, **kwargs):
+            other.start()
+            # it has to wait till this is done
+            other.join(0.2)
+            ok_(other.is_alive())
+            self._download(url, filepath, **kwargs)
+
+        filepath = video_cache.get(
+            key,
+            'https://vid.ly/abc123',
+            'abc123.mp4',
+            headers,
+            download
+        )
+        other.join()
+        eq_(results, [filepath])
+        eq_(len(self.downloaded), 1)
+
+    def test_evict_leaves_active_partial_downloads(self):
+        key = video_cache.make_key('abc123')
+        entry_dir = video_cache._get_entry_directory(key)
+        partial_dir = entry_dir + video_cache.PARTIAL_SUFFIX
+        os.mkdir(partial_dir)
+        old = time.time() - video_cache.PARTIAL_MAX_AGE - 1
+        os.utime(partial_dir, (old, old))
+        with video_cache._lock(entry_dir):
+            video_cache.evict()
+            ok_(os.path.isdir(partial_dir))
+        video_cache.evict()
+        ok_(not os.path.isdir(partial_dir))
+
+    def test_evict_leaves_videos_in_use(self):
+        settings.VIDEO_CACHE_MAX_SIZE = 500
+        with video_cache.using():
+            filepath = video_cache.get(
+                video_cache.make_key('abc'),
+                'https://vid.ly/abc',
+                'abc.mp4',
+                {},
+                self._download
+            )
+            entry_dir = os.path.dirname(filepath)
+            # someone else needs the room
+            with video_cache._lock(entry_dir, blocking=False) as locked:
+                ok_(not locked)
+            eq_(video_cache.evict(), 0)
+            ok_(os.path.isfile(filepath))
+
+        eq_(video_cache.evict(), 1)
+        ok_(not os.path.isdir(entry_dir))
+        # and so is its lock file
+        ok_(not os.path.isfile(entry_dir + video_cache.LOCK_SUFFIX))
@@ -1,16 +1,26 @@
 import os
 import sys
+import json
+import datetime
 import shutil
 import tempfile
 from cStringIO import StringIO
 
 from nose.tools import ok_, eq_
 import mock
+import requests
 
 from django.conf import settings
 from django.core.cache import cache
 
-from airmozilla.main.models import Event, Template, VidlySubmission, Picture
+from airmozilla.main.models import (
+    Event,
+    Template,
+    VidlySubmission,
+    Picture,
+    VideoInfo,
+    QuarantinedEvent,
+)
 from airmozilla.manage import videoinfo
 from airmozilla.base.tests.testbase import DjangoTestCase
 
@@ -37,22 +47,34 @@ class TestVideoinfo(DjangoTestCase):
     sample_jpg2 = 'airmozilla/manage/tests/tucker.jpg'
 
     _original_temp_directory_name = settings.SCREENCAPTURES_TEMP_DIRECTORY_NAME
+    _original_video_cache_directory_name = settings.VIDEO_CACHE_DIRECTORY_NAME
+    _original_thumbnail_processes = settings.SCREENCAPTURES_THUMBNAIL_PROCESSES
 
     def setUp(self):
         super(TestVideoinfo, self).setUp()
         settings.SCREENCAPTURES_TEMP_DIRECTORY_NAME = (
             'test_' + self._original_temp_directory_name
         )
+        settings.VIDEO_CACHE_DIRECTORY_NAME = (
+            'test_' + self._original_video_cache_directory_name
+        )
+        # other threads wouldn't see what's in the test transaction
+        settings.SCREENCAPTURES_THUMBNAIL_PROCESSES = 1
 
     def tearDown(self):
         cache.clear()
-        assert settings.SCREENCAPTURES_TEMP_DIRECTORY_NAME.startswith('test_')
-        temp_dir = os.path.join(
-            tempfile.gettempdir(),
-            settings.SCREENCAPTURES_TEMP_DIRECTORY_NAME
+        settings.SCREENCAPTURES_THUMBNAIL_PROCESSES = (
+            self._original_thumbnail_processes
         )
-        if os.path.isdir(temp_dir):
-            shutil.rmtree(temp_dir)
+        assert settings.SCREENCAPTURES_TEMP_DIRECTORY_NAME.startswith('test_')
+        assert settings.VIDEO_CACHE_DIRECTORY_NAME.startswith('test_')
+        for directory_name in (
+            settings.SCREENCAPTURES_TEMP_DIRECTORY_NAME,
+            settings.VIDEO_CACHE_DIRECTORY_NAME,
+        ):
+            temp_dir = os.path.join(tempfile.gettempdir(), directory_name)
+            if os.path.isdir(temp_dir):
+                shutil.rmtree(temp_dir)
         super(TestVideoinfo, self).tearDown()
 
     @mock.patch('airmozilla.manage.vidly.logging')
@@ -253,6 +275,93 @@ class TestVideoinfo(DjangoTestCase):
         output = buffer.getvalue()
         ok_('404' in output)
 
+    @mock.patch('airmozilla.manage.vidly.logging')
+    @mock.patch('airmozilla.manage.vidly.urllib2')
+    @mock.patch('requests.head')
+    def test_fetch_duration_fail_quarantined(
+        self, rhead, p_urllib2, p_logging
+    ):
+
+        def mocked_head(url, **options):
+            return _Response(
+                'Not Found',
+                404
+            )
+
+        rhead.side_effect = mocked_head
+
+        event = Event.objects.get(title='Test event')
+        template = Template.objects.create(
+            name='Vid.ly Something',
+            content="{{ tag }}"
+        )
+        event.template = template
+        event.template_environment = {'tag': 'abc123'}
+        event.save()
+
+        buffer = StringIO()
+        sys.stdout = buffer
+        try:
+            videoinfo.fetch_durations()
+        finally:
+            sys.stdout = sys.__stdout__
+
+        quarantined, = QuarantinedEvent.objects.all()
+        eq_(quarantined.event, event)
+        eq_(quarantined.job, 'fetch_duration')
+        eq_(quarantined.reason, '404')
+        eq_(rhead.call_count, 1)
+
+        # the second time it's skipped
+        sys.stdout = buffer
+        try:
+            videoinfo.fetch_durations()
+        finally:
+            sys.stdout = sys.__stdout__
+        eq_(rhead.call_count, 1)
+
+        # but not by the other job
+        Event.objects.filter(id=event.id).update(duration=60)
+        sys.stdout = buffer
+        try:
+            videoinfo.fetch_screencaptures()
+        finally:
+            sys.stdout = sys.__stdout__
+        eq_(rhead.call_count, 2)
+        eq_(QuarantinedEvent.objects.filter(event=event).count(), 2)
+
+        # until it expires
+        QuarantinedEvent.objects.update(
+            expires=quarantined.expires - datetime.timedelta(days=1)
+        )
+        sys.stdout = buffer
+        try:
+            videoinfo.fetch_durations()
+        finally:
+            sys.stdout = sys.__stdout__
+        eq_(rhead.call_count, 3)
+        eq_(QuarantinedEvent.objects.filter(event=event).count(), 2)
+
+    def test_fetch_duration_no_tag_quarantined(self):
+        event = Event.objects.get(title='Test event')
+        template = Template.objects.create(
+            name='Vid.ly Something',
+            content="{{ tag }}"
+        )
+        event.template = template
+        event.template_environment = {}
+        event.save()
+
+        buffer = StringIO()
+        sys.stdout = buffer
+        try:
+            videoinfo.fetch_durations()
+        finally:
+            sys.stdout = sys.__stdout__
+        quarantined, = QuarantinedEvent.objects.all()
+        eq_(quarantined.event, event)
+        eq_(quarantined.reason, 'No Vid.ly Tag or Ogg URL')
+
     @mock.patch('airmozilla.manage.vidly.logging')
     @mock.patch('airmozilla.manage.vidly.urllib2')
     @mock.patch('requests.head')
@@ -569,6 +678,170 @@ class TestVideoinfo(DjangoTestCase):
         ok_(ffmpeged_url2.endswith('file.mp4'))
         ok_(ffmpeged_url2.startswith('http://'))
 
+    @mock.patch('airmozilla.manage.vidly.logging')
+    @mock.patch('airmozilla.manage.vidly.urllib2')
+    @mock.patch('requests.head')
+    @mock.patch('requests.get')
+    @mock.patch('subprocess.Popen')
+    def test_fetch_duration_and_screencapture_download_once(
+        self, mock_popen, rget, rhead, p_urllib2, p_logging
+    ):
+
+        def mocked_head(url, **options):
+            return _Response(
+                '',
+                200,
+                headers={
+                    'Content-Length': '100000',
+                    'ETag': '"abc"',
+                }
+            )
+
+        rhead.side_effect = mocked_head
+
+        downloaded_urls = []
+
+        def mocked_get(url, **options):
+            downloaded_urls.append(url)
+            return _Response(
+                '0' * 100000,
+                200,
+                headers={
+                    'Content-Length': 100000
+                }
+            )
+
+        rget.side_effect = mocked_get
+
+        sample_jpg = self.sample_jpg
+
+        def mocked_popen(command, **kwargs):
+
+            class Inner:
+                def communicate(self):
+                    if command[1] == '-i':
+                        err = """
+            Duration: 00:19:17.47, start: 0.000000, bitrate: 1076 kb/s
+                        """
+                    else:
+                        shutil.copyfile(sample_jpg, command[-1])
+                        err = ''
+                    return '', err
+
+            return Inner()
+
+        mock_popen.side_effect = mocked_popen
+
+        event = Event.objects.get(title='Test event')
+        template = Template.objects.create(
+            name='Vid.ly Something',
+            content="{{ tag }}"
+        )
+        event.template = template
+        event.template_environment = {'tag': 'xyz123'}
+        event.save()
+
+        videoinfo.fetch_durations(save_locally=True)
+        event = Event.objects.get(id=event.id)
+        eq_(event.duration, 1157)
+        eq_(len(downloaded_urls), 1)
+
+        videoinfo.fetch_screencaptures(save_locally=True)
+        eq_(Picture.objects.filter(event=event).count(), 15)
+        # the video was not downloaded again
+        eq_(len(downloaded_urls), 1)
+
+    @mock.patch('airmozilla.manage.vidly.logging')
+    @mock.patch('airmozilla.manage.vidly.urllib2')
+    @mock.patch('requests.head')
+    @mock.patch('subprocess.Popen')
+    def test_fetch_duration_with_probe(
+        self, mock_popen, rhead, p_urllib2, p_logging
+    ):
+
+        def mocked_head(url, **options):
+            return _Response(
+                '',
+                200
+            )
+
+        rhead.side_effect = mocked_head
+
+        ffprobed_commands = []
+
+        def mocked_popen(command, **kwargs):
+            ffprobed_commands.append(command)
+            url = command[-1]
+
+            class Inner:
+                def communicate(self):
+                    if 'abc123' in url:
+                        return '', 'abc123: Invalid data found'
+                    out = json.dumps({
+                        'streams': [
+                            {
+                                'codec_type': 'video',
+                                'codec_name': 'h264',
+                                'width': 1280,
+                                'height': 720,
+                            },
+                            {
+                                'codec_type': 'audio',
+                                'codec_name': 'aac',
+                            },
+                        ],
+                        'format': {
+                            'format_name': 'mov,mp4,m4a,3gp,3g2,mj2',
+                            'duration': '1157.470000',
+                            'size': '155847214',
+                            'bit_rate': '1076000',
+                        },
+                    })
+                    return out, ''
+
+            return Inner()
+
+        mock_popen.side_effect = mocked_popen
+
+        event = Event.objects.get(title='Test event')
+        template = Template.objects.create(
+            name='Vid.ly Something',
+            content="{{ tag }}"
+        )
+        event.template = template
+        event.template_environment = {'tag': 'abc123'}
+        event.save()
+        assert event.duration is None
+
+        videoinfo.fetch_durations(probe=True)
+        event = Event.objects.get(id=event.id)
+        eq_(event.duration, None)
+        ok_(not VideoInfo.objects.filter(event=event))
+        command, = ffprobed_commands
+        eq_(command[0], 'ffprobe')
+        ok_('-show_streams' in command)
+
+        VidlySubmission.objects.create(
+            event=event,
+            url='https://s3.com/asomething.mov',
+            tag='xyz123',
+            hd=True,
+        )
+        event.template_environment = {'tag': 'xyz123'}
+        event.save()
+        videoinfo.fetch_durations(probe=True)
+        event = Event.objects.get(id=event.id)
+        eq_(event.duration, 1157)
+        video_info = event.videoinfo
+        eq_(video_info.duration, 1157)
+        eq_(video_info.width, 1280)
+        eq_(video_info.height, 720)
+        eq_(video_info.video_codec, 'h264')
+        eq_(video_info.audio_codec, 'aac')
+        eq_(video_info.bitrate, 1076000)
+        eq_(video_info.size, 155847214)
+        ok_(video_info.hd)
+
     @mock.patch('airmozilla.manage.vidly.logging')
     @mock.patch('airmozilla.manage.vidly.urllib2')
     @mock.patch('requests.head')
@@ -819,6 +1092,397 @@ class TestVideoinfo(DjangoTestCase):
             ["screencap-%02d.jpg" % x for x in range(1, 16)]
         )
 
+    @mock.patch('airmozilla.manage.vidly.logging')
+    @mock.patch('airmozilla.manage.vidly.urllib2')
+    @mock.patch('requests.head')
+    @mock.patch('subprocess.Popen')
+    def test_fetch_screencapture_single_extraction(
+        self, mock_popen, rhead, p_urllib2, p_log
+    ):
+
+        def mocked_head(url, **options):
+            return _Response(
+                '',
+                200
+            )
+
+        rhead.side_effect = mocked_head
+
+        ffmpeged_commands = []
+
+        sample_jpg = self.sample_jpg
+
+        def mocked_popen(command, **kwargs):
+            ffmpeged_commands.append(command)
+            output_template = command[-1]
+            number = int(command[command.index('-vframes') + 1])
+
+            class Inner:
+                def communicate(self):
+                    for i in range(1, number + 1):
+                        shutil.copyfile(sample_jpg, output_template % i)
+                    return '', ''
+
+            return Inner()
+
+        mock_popen.side_effect = mocked_popen
+
+        event = Event.objects.get(title='Test event')
+        template = Template.objects.create(
+            name='Vid.ly Something',
+            content="{{ tag }}"
+        )
+        event.template = template
+        event.duration = 1157
+        event.template_environment = {'tag': 'xyz123'}
+        event.save()
+
+        videoinfo.fetch_screencaptures(extraction='single')
+        # only one ffmpeg process for all pictures
+        command, = ffmpeged_commands
+        ok_('xyz123' in command[2])
+        ok_('fps=15/1157' in command)
+        eq_(Picture.objects.filter(event=event).count(), 15)
+
+    @mock.patch('airmozilla.manage.vidly.logging')
+    @mock.patch('airmozilla.manage.vidly.urllib2')
+    @mock.patch('requests.head')
+    @mock.patch('subprocess.Popen')
+    def test_fetch_screencapture_parallel_extraction(
+        self, mock_popen, rhead, p_urllib2, p_log
+    ):
+
+        def mocked_head(url, **options):
+            return _Response(
+                '',
+                200
+            )
+
+        rhead.side_effect = mocked_head
+
+        ffmpeged_urls = []
+
+        sample_jpg = self.sample_jpg
+
+        def mocked_popen(command, **kwargs):
+            url = command[4]
+            ffmpeged_urls.append(url)
+            destination = command[-1]
+
+            class Inner:
+                def communicate(self):
+                    shutil.copyfile(sample_jpg, destination)
+                    return '', ''
+
+            return Inner()
+
+        mock_popen.side_effect = mocked_popen
+
+        event = Event.objects.get(title='Test event')
+        template = Template.objects.create(
+            name='Vid.ly Something',
+            content="{{ tag }}"
+        )
+        event.template = template
+        event.duration = 1157
+        event.template_environment = {'tag': 'xyz123'}
+        event.save()
+
+        videoinfo.fetch_screencaptures(extraction='parallel')
+        eq_(len(ffmpeged_urls), 15)
+        eq_(Picture.objects.filter(event=event).count(), 15)
+        notes = [
+            x.notes for x in
+            Picture.objects.filter(event=event).order_by('-created')
+        ]
+        eq_(
+            notes,
+            ["Screencap %d" % x for x in range(1, 16)]
+        )
+
+    @mock.patch('requests.get')
+    def test_download_file_resume(self, rget):
+        content = ''.join(chr(i % 256) for i in range(10000))
+        requested_ranges = []
+
+        def mocked_get(url, **options):
+            range_ = options.get('headers', {}).get('Range')
+            requested_ranges.append(range_)
+            if range_:
+                start = int(range_.split('=')[1].split('-')[0])
+                return _Response(
+                    content[start:],
+                    206,
+                    headers={
+                        'Content-Length': str(len(content) - start),
+                        'Content-Range': 'bytes %d-%d/%d' % (
+                            start, len(content) - 1, len(content)
+                        ),
+                    }
+                )
+            return _Response(
+                content,
+                200,
+                headers={'Content-Length': str(len(content))}
+            )
+
+        rget.side_effect = mocked_get
+
+        directory = tempfile.mkdtemp()
+        try:
+            filepath = os.path.join(directory, 'file.mp4')
+            # pretend an earlier download got interrupted
+            with open(filepath, 'wb') as f:
+                f.write(content[:3000])
+            videoinfo._download_file('https://vid.ly/abc123', filepath)
+            eq_(requested_ranges, ['bytes=3000-'])
+            with open(filepath, 'rb') as f:
+                eq_(f.read(), content)
+        finally:
+            shutil.rmtree(directory)
+
+    @mock.patch('requests.get')
+    def test_download_file_incomplete(self, rget):
+
+        def mocked_get(url, **options):
+            return _Response(
+                '0' * 100,
+                200,
+                headers={'Content-Length': '1000'}
+            )
+
+        rget.side_effect = mocked_get
+
+        directory = tempfile.mkdtemp()
+        try:
+            filepath = os.path.join(directory, 'file.mp4')
+            self.assertRaises(
+                AssertionError,
+                videoinfo._download_file,
+                'https://vid.ly/abc123',
+                filepath
+            )
+        finally:
+            shutil.rmtree(directory)
+
+    @mock.patch('requests.head')
+    @mock.patch('requests.get')
+    def test_download_file_segments(self, rget, rhead):
+        content = ''.join(chr(i % 256) for i in range(10000))
+        requested_ranges = []
+
+        def mocked_head(url, **options):
+            return _Response(
+                '',
+                200,
+                headers={
+                    'Content-Length': str(len(content)),
+                    'Accept-Ranges': 'bytes',
+                }
+            )
+
+        rhead.side_effect = mocked_head
+
+        def mocked_get(url, **options):
+            range_ = options['headers']['Range']
+            requested_ranges.append(range_)
+            start, end = [int(x) for x in range_.split('=')[1].split('-')]
+            return _Response(
+                content[start:end + 1],
+                206,
+                headers={
+                    'Content-Range': 'bytes %d-%d/%d' % (
+                        start, end, len(content)
+                    ),
+                }
+            )
+
+        rget.side_effect = mocked_get
+
+        directory = tempfile.mkdtemp()
+        try:
+            filepath = os.path.join(directory, 'file.mp4')
+            videoinfo._download_file(
+                'https://vid.ly/abc123',
+                filepath,
+                segments=3
+            )
+            eq_(
+                sorted(requested_ranges),
+                ['bytes=0-3333', 'bytes=3334-6667', 'bytes=6668-9999']
+            )
+            with open(filepath, 'rb') as f:
+                eq_(f.read(), content)
+        finally:
+            shutil.rmtree(directory)
+
+    @mock.patch('requests.head')
+    @mock.patch('requests.get')
+    def test_download_file_segments_resume(self, rget, rhead):
+        content = ''.join(chr(i % 256) for i in range(10000))
+        requested_ranges = []
+
+        def mocked_get(url, **options):
+            range_ = options['headers']['Range']
+            requested_ranges.append(range_)
+            start, end = [int(x) for x in range_.split('=')[1].split('-')]
+            return _Response(
+                content[start:end + 1],
+                206,
+                headers={
+                    'Content-Range': 'bytes %d-%d/%d' % (
+                        start, end, len(content)
+                    ),
+                }
+            )
+
+        rget.side_effect = mocked_get
+
+        directory = tempfile.mkdtemp()
+        try:
+            filepath = os.path.join(directory, 'file.mp4')
+            # pretend an earlier segmented download got interrupted
+            with open(filepath + '.parts', 'w') as f:
+                json.dump(
+                    {'total': 10000, 'ranges': [[0, 4999], [5000, 9999]]},
+                    f
+                )
+            with open(filepath + '.0-4999.part', 'wb') as f:
+                f.write(content[:5000])
+            with open(filepath + '.5000-9999.part', 'wb') as f:
+                f.write(content[5000:6000])
+            videoinfo._download_file(
+                'https://vid.ly/abc123',
+                filepath,
+                segments=3
+            )
+            eq_(requested_ranges, ['bytes=6000-9999'])
+            ok_(not rhead.called)
+            with open(filepath, 'rb') as f:
+                eq_(f.read(), content)
+            eq_(os.listdir(directory), ['file.mp4'])
+        finally:
+            shutil.rmtree(directory)
+
+    @mock.patch('requests.head')
+    @mock.patch('requests.get')
+    def test_download_file_segments_never_started(self, rget, rhead):
+        content = ''.join(chr(i % 256) for i in range(9999))
+        failing = ['bytes=3333-6665', 'bytes=6666-9998']
+
+        def mocked_head(url, **options):
+            return _Response(
+                '',
+                200,
+                headers={
+                    'Content-Length': str(len(content)),
+                    'Accept-Ranges': 'bytes',
+                }
+            )
+
+        rhead.side_effect = mocked_head
+
+        def mocked_get(url, **options):
+            range_ = options['headers']['Range']
+            if range_ in failing:
+                raise requests.exceptions.ConnectionError(range_)
+            start, end = [int(x) for x in range_.split('=')[1].split('-')]
+            return _Response(
+                content[start:end + 1],
+                206,
+                headers={
+                    'Content-Range': 'bytes %d-%d/%d' % (
+                        start, end, len(content)
+                    ),
+                }
+            )
+
+        rget.side_effect = mocked_get
+
+        directory = tempfile.mkdtemp()
+        try:
+            filepath = os.path.join(directory, 'file.mp4')
+            # the middle and the last part never even get started
+            self.assertRaises(
+                requests.exceptions.ConnectionError,
+                videoinfo._download_file,
+                'https://vid.ly/abc123',
+                filepath,
+                segments=3
+            )
+            eq_(
+                sorted(os.listdir(directory)),
+                ['file.mp4.0-3332.part', 'file.mp4.parts']
+            )
+
+            del failing[:]
+            videoinfo._download_file(
+                'https://vid.ly/abc123',
+                filepath,
+                segments=3
+            )
+            eq_(rhead.call_count, 1)
+            with open(filepath, 'rb') as f:
+                eq_(f.read(), content)
+            eq_(os.listdir(directory), ['file.mp4'])
+        finally:
+            shutil.rmtree(directory)
+
+    @mock.patch('requests.get')
+    def test_download_file_resume_wrong_size(self, rget):
+
+        def mocked_get(url, **options):
+            return _Response(
+                '',
+                416,
+                headers={'Content-Range': 'bytes */10000'}
+            )
+
+        rget.side_effect = mocked_get
+
+        directory = tempfile.mkdtemp()
+        try:
+            filepath = os.path.join(directory, 'file.mp4')
+            with open(filepath, 'wb') as f:
+                f.write('x' * 12000)
+            self.assertRaises(
+                AssertionError,
+                videoinfo._download_file,
+                'https://vid.ly/abc123',
+                filepath
+            )
+            # so it starts over next time
+            ok_(not os.path.isfile(filepath))
+        finally:
+            shutil.rmtree(directory)
+
+    @mock.patch('requests.get')
+    def test_download_file_resume_wrong_range(self, rget):
+
+        def mocked_get(url, **options):
+            return _Response(
+                'x' * 1000,
+                206,
+                headers={'Content-Range': 'bytes 0-999/1000'}
+            )
+
+        rget.side_effect = mocked_get
+
+        directory = tempfile.mkdtemp()
+        try:
+            filepath = os.path.join(directory, 'file.mp4')
+            with open(filepath, 'wb') as f:
+                f.write('x' * 300)
+            self.assertRaises(
+                AssertionError,
+                videoinfo._download_file,
+                'https://vid.ly/abc123',
+                filepath
+            )
+            eq_(os.stat(filepath).st_size, 300)
+        finally:
+            shutil.rmtree(directory)
+
     def test_import_screencaptures_empty(self):
         """it should be possible to run this at any time, even if
         the dedicated temp directory does not exist yet. """
@@ -870,3 +1534,44 @@ class TestVideoinfo(DjangoTestCase):
         ok_(not os.path.isdir(event_temp_dir))
         ok_(os.path.isdir(temp_dir))
         eq_(Picture.objects.filter(event=event).count(), 2)
+
+    @mock.patch('airmozilla.manage.videoinfo.generate_thumbnail')
+    def test_import_screencaptures_pregenerates_thumbnails(self, p_thumbnail):
+        event = Event.objects.get(title='Test event')
+        temp_dir = os.path.join(
+            tempfile.gettempdir(),
+            settings.SCREENCAPTURES_TEMP_DIRECTORY_NAME
+        )
+        if not os.path.isdir(temp_dir):
+            os.mkdir(temp_dir)
+        directory_name = '%s_%s' % (event.id, event.slug)
+        event_temp_dir = os.path.join(temp_dir, directory_name)
+        os.mkdir(event_temp_dir)
+        shutil.copyfile(
+            self.sample_jpg,
+            os.path.join(event_temp_dir, 'screencap-01.jpg')
+        )
+        shutil.copyfile(
+            self.sample_jpg2,
+            os.path.join(event_temp_dir, 'screencap-02.jpg')
+        )
+
+        videoinfo.import_screencaptures()
+
+        pictures = Picture.objects.filter(event=event)
+        eq_(
+            sorted(x.notes for x in pictures),
+            ['Screencap 1', 'Screencap 2']
+        )
+        for picture in pictures:
+            ok_(picture.size)
+            ok_(picture.width)
+            ok_(picture.height)
+            ok_(os.path.isfile(picture.file.path))
+
+        geometries = settings.SCREENCAPTURES_THUMBNAIL_GEOMETRIES
+        eq_(p_thumbnail.call_count, 2 * len(geometries))
+        filenames = set(x[0][0] for x in p_thumbnail.call_args_list)
+        eq_(filenames, set(x.file.name for x in pictures))
+        geometry, options = geometries[0]
+        p_thumbnail.assert_any_call(pictures[0].file.name, geometry, **options)
@@ -16,7 +16,7 @@ from .base import ManageTestCase
 class TestCuratedGroups(ManageTestCase):
 
     @mock.patch('logging.error')
-    @mock.patch('requests.get')
+    @mock.patch('airmozilla.base.mozillians.session.get')
     def test_curated_groups_autocomplete(self, rget, rlogging):
 
         def mocked_get(url, **options):
@@ -15,6 +15,7 @@ from django.core import mail
 from django.utils import timezone
 from django.utils.timezone import utc
 from django.core.files import File
+from django.test.utils import override_settings
 
 from funfactory.urlresolvers import reverse
 
@@ -214,7 +215,9 @@ class TestEvents(ManageTestCase):
 
     def test_events_with_event_without_location(self):
         event = Event.objects.get(title='Test event')
-        response = self.client.get(reverse('manage:events_data'))
+        response = self.client.get(
+            reverse('manage:events_data'), {'all': 1}
+        )
         eq_(response.status_code, 200)
         results = json.loads(response.content)
         result = results['events'][0]
@@ -225,7 +228,9 @@ class TestEvents(ManageTestCase):
 
         event.location = None
         event.save()
-        response = self.client.get(reverse('manage:events_data'))
+        response = self.client.get(
+            reverse('manage:events_data'), {'all': 1}
+        )
         eq_(response.status_code, 200)
         results = json.loads(response.content)
         result = results['events'][0]
@@ -238,7 +243,9 @@ class TestEvents(ManageTestCase):
         event.upcoming = False
         event.popcorn_url = 'https://webmaker.org/123'
         event.save()
-        response = self.client.get(reverse('manage:events_data'))
+        response = self.client.get(
+            reverse('manage:events_data'), {'all': 1}
+        )
         eq_(response.status_code, 200)
         results = json.loads(response.content)
         result = results['events'][0]
@@ -246,7 +253,9 @@ class TestEvents(ManageTestCase):
 
     def test_events_data_with_pictures_count(self):
         event = Event.objects.get(title='Test event')
-        response = self.client.get(reverse('manage:events_data'))
+        response = self.client.get(
+            reverse('manage:events_data'), {'all': 1}
+        )
         eq_(response.status_code, 200)
         results = json.loads(response.content)
         result = results['events'][0]
@@ -256,7 +265,9 @@ class TestEvents(ManageTestCase):
                 file=File(fp),
                 event=event,
             )
-        response = self.client.get(reverse('manage:events_data'))
+        response = self.client.get(
+            reverse('manage:events_data'), {'all': 1}
+        )
         eq_(response.status_code, 200)
         results = json.loads(response.content)
         result = results['events'][0]
@@ -264,7 +275,9 @@ class TestEvents(ManageTestCase):
 
     def test_events_data_with_has_picture(self):
         event = Event.objects.get(title='Test event')
-        response = self.client.get(reverse('manage:events_data'))
+        response = self.client.get(
+            reverse('manage:events_data'), {'all': 1}
+        )
         eq_(response.status_code, 200)
         results = json.loads(response.content)
         result = results['events'][0]
@@ -275,7 +288,9 @@ class TestEvents(ManageTestCase):
             )
             event.picture = picture
             event.save()
-        response = self.client.get(reverse('manage:events_data'))
+        response = self.client.get(
+            reverse('manage:events_data'), {'all': 1}
+        )
         eq_(response.status_code, 200)
         results = json.loads(response.content)
         result = results['events'][0]
@@ -284,7 +299,9 @@ class TestEvents(ManageTestCase):
     def test_events_data_with_is_scheduled(self):
         event = Event.objects.get(title='Test event')
         assert event.status == Event.STATUS_SCHEDULED
-        response = self.client.get(reverse('manage:events_data'))
+        response = self.client.get(
+            reverse('manage:events_data'), {'all': 1}
+        )
         eq_(response.status_code, 200)
         results = json.loads(response.content)
         result = results['events'][0]
@@ -311,21 +328,180 @@ class TestEvents(ManageTestCase):
             location=event.location,
         )
         url = reverse('manage:events_data')
-        response = self.client.get(url)
+        response = self.client.get(url, {'all': 1})
         eq_(response.status_code, 200)
         result = json.loads(response.content)
         eq_(len(result['events']), 3)
 
-        response = self.client.get(url, {'limit': 2})
+        response = self.client.get(url, {'all': 1, 'limit': 2})
         eq_(response.status_code, 200)
         result = json.loads(response.content)
         eq_(len(result['events']), 2)
 
-        response = self.client.get(url, {'limit': -2})
+        response = self.client.get(url, {'all': 1, 'limit': -2})
         eq_(response.status_code, 200)
         result = json.loads(response.content)
         eq_(len(result['events']), 3)
 
+    def test_events_data_etag(self):
+        url = reverse('manage:events_data')
+        response = self.client.get(url)
+        eq_(response.status_code, 200)
+        ok_(json.loads(response.content)['watermark'])
+        etag = response['ETag']
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        eq_(response.status_code, 304)
+
+        event = Event.objects.get(title='Test event')
+        event.title = 'Different title'
+        event.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        eq_(response.status_code, 200)
+        ok_(response['ETag'] != etag)
+
+    def test_events_data_since(self):
+        event = Event.objects.get(title='Test event')
+        url = reverse('manage:events_data')
+        response = self.client.get(url)
+        eq_(response.status_code, 200)
+        result = json.loads(response.content)
+        eq_(len(result['events']['rows']), 1)
+
+        with self.settings(EVENTS_DATA_DELTA_OVERLAP=0):
+            response = self.client.get(url, {'since': result['watermark']})
+            eq_(response.status_code, 200)
+            changes = json.loads(response.content)
+            eq_(changes['events']['rows'], [])
+            eq_(changes['deleted'], [])
+            ok_(changes['watermark'] >= result['watermark'])
+
+            event2 = Event.objects.create(
+                title='Event 2',
+                slug='event2',
+                description=event.description,
+                start_time=event.start_time,
+                privacy=Event.PRIVACY_PUBLIC,
+                location=event.location,
+            )
+            response = self.client.get(url, {'since': changes['watermark']})
+            eq_(response.status_code, 200)
+            changes = json.loads(response.content)
+            title_index = changes['events']['fields'].index('title')
+            eq_(
+                [x[title_index] for x in changes['events']['rows']],
+                ['Event 2']
+            )
+            eq_(changes['deleted'], [])
+
+            event2_id = event2.id
+            event2.delete()
+            response = self.client.get(url, {'since': changes['watermark']})
+            eq_(response.status_code, 200)
+            changes = json.loads(response.content)
+            eq_(changes['events']['rows'], [])
+            eq_(changes['deleted'], [event2_id])
+
+        # a watermark that's too old means you get everything
+        response = self.client.get(url, {'since': '1000'})
+        eq_(response.status_code, 200)
+        result = json.loads(response.content)
+        ok_('deleted' not in result)
+        eq_(len(result['events']['rows']), 1)
+
+    def test_events_data_paginated(self):
+        event = Event.objects.get(title='Test event')
+        for i in range(2, 5):
+            Event.objects.create(
+                title='Event %d' % i,
+                slug='event%d' % i,
+                description=event.description,
+                start_time=event.start_time,
+                privacy=Event.PRIVACY_PUBLIC,
+                location=event.location,
+            )
+        url = reverse('manage:events_data')
+        response = self.client.get(url, {'page_size': 3, 'sort': 'title'})
+        eq_(response.status_code, 200)
+        result = json.loads(response.content)
+        fields = result['events']['fields']
+        title_index = fields.index('title')
+        ok_('id' in fields)
+        titles = [x[title_index] for x in result['events']['rows']]
+        eq_(titles, ['Event 2', 'Event 3', 'Event 4'])
+        ok_(result['next'])
+        eq_(result['count'], 4)
+
+        response = self.client.get(url, {
+            'page_size': 3,
+            'sort': 'title',
+            'after': result['next'],
+        })
+        eq_(response.status_code, 200)
+        result = json.loads(response.content)
+        titles = [x[title_index] for x in result['events']['rows']]
+        eq_(titles, ['Test event'])
+        eq_(result['next'], None)
+        # only counted for the first page
+        eq_(result['count'], None)
+
+        # filtered
+        response = self.client.get(url, {'title': 'EVENT 3'})
+        eq_(response.status_code, 200)
+        result = json.loads(response.content)
+        titles = [x[title_index] for x in result['events']['rows']]
+        eq_(titles, ['Event 3'])
+
+        # only whitelisted sort keys
+        response = self.client.get(url, {'sort': 'transcript'})
+        eq_(response.status_code, 400)
+        response = self.client.get(url, {'after': 'junk'})
+        eq_(response.status_code, 400)
+
+    def test_events_data_filtered(self):
+        event = Event.objects.get(title='Test event')
+        assert event.archive_time
+        channel = Channel.objects.create(name='Rust Talks', slug='rust')
+        event2 = Event.objects.create(
+            title='Upcoming Rust event',
+            slug='upcoming-rust',
+            description=event.description,
+            start_time=timezone.now() + datetime.timedelta(days=1),
+            status=Event.STATUS_SCHEDULED,
+            privacy=Event.PRIVACY_PUBLIC,
+            location=event.location,
+        )
+        event2.channels.add(channel)
+        url = reverse('manage:events_data')
+
+        def get_titles(params):
+            response = self.client.get(url, params)
+            eq_(response.status_code, 200)
+            result = json.loads(response.content)
+            index = result['events']['fields'].index('title')
+            return [x[index] for x in result['events']['rows']]
+
+        eq_(get_titles({'title': 'rust upcoming'}), [event2.title])
+        eq_(get_titles({'title': 'rust test'}), [])
+        # or the start of the slug
+        eq_(get_titles({'title': 'test-ev'}), [event.title])
+        eq_(get_titles({'channel': 'RUST'}), [event2.title])
+        eq_(get_titles({'archived': 'archived'}), [event.title])
+        eq_(get_titles({'archived': 'not'}), [event2.title])
+        eq_(get_titles({'only': 'upcoming'}), [event2.title])
+        eq_(get_titles({'only': 'live'}), [])
+        eq_(
+            get_titles({
+                'start_time': event2.start_time.strftime('%Y-%m-%d')
+            }),
+            [event2.title]
+        )
+
+        response = self.client.get(url, {'start_time': 'junk'})
+        eq_(response.status_code, 400)
+        response = self.client.get(url, {'only': 'junk'})
+        eq_(response.status_code, 400)
+
     def test_events_data_with_live_and_upcoming(self):
         # some events will be annotated with is_live and is_upcoming
         event = Event.objects.get(title='Test event')
@@ -360,7 +536,7 @@ class TestEvents(ManageTestCase):
         assert event3 not in Event.objects.live()
 
         url = reverse('manage:events_data')
-        response = self.client.get(url)
+        response = self.client.get(url, {'all': 1})
         eq_(response.status_code, 200)
         result = json.loads(response.content)
         titles = [x['title'] for x in result['events']]
@@ -388,7 +564,7 @@ class TestEvents(ManageTestCase):
             )
             eq_(response.status_code, 302)
         url = reverse('manage:events_data')
-        response = self.client.get(url)
+        response = self.client.get(url, {'all': 1})
         eq_(response.status_code, 200)
         result = json.loads(response.content)
         assert result['events'][0]['title'] == event.title
@@ -399,7 +575,7 @@ class TestEvents(ManageTestCase):
         event.save()
 
         url = reverse('manage:events_data')
-        response = self.client.get(url)
+        response = self.client.get(url, {'all': 1})
         eq_(response.status_code, 200)
         result = json.loads(response.content)
         row = result['events'][0]
@@ -411,7 +587,7 @@ class TestEvents(ManageTestCase):
         template.name = 'Vid.ly Fun'
         template.save()
         assert event.has_vidly_template()
-        response = self.client.get(url)
+        response = self.client.get(url, {'all': 1})
         eq_(response.status_code, 200)
         result = json.loads(response.content)
         row = result['events'][0]
@@ -440,7 +616,9 @@ class TestEvents(ManageTestCase):
             placeholder_img=event.placeholder_img,
             location=event.location,
         )
-        response = self.client.get(reverse('manage:events_data'))
+        response = self.client.get(
+            reverse('manage:events_data'), {'all': 1}
+        )
         eq_(response.status_code, 200)
         result = json.loads(response.content)
         titles = [x['title'] for x in result['events']]
@@ -471,7 +649,9 @@ class TestEvents(ManageTestCase):
             contributor=True
         )
         assert self.client.login(username='nigel', password='secret')
-        response = self.client.get(reverse('manage:events_data'))
+        response = self.client.get(
+            reverse('manage:events_data'), {'all': 1}
+        )
         eq_(response.status_code, 200)
         result = json.loads(response.content)
         titles = [x['title'] for x in result['events']]
@@ -906,6 +1086,7 @@ class TestEvents(ManageTestCase):
         eq_(response.status_code, 200)
         ok_(edit_url in response.content)
 
+    @override_settings(URL_TRANSFORM_CACHE_TTL=0)
     @mock.patch('airmozilla.manage.vidly.urllib2')
     def test_vidly_url_to_shortcode(self, p_urllib2):
         event = Event.objects.get(title='Test event')
@@ -1779,7 +1960,7 @@ class TestEvents(ManageTestCase):
         ok_('13:00' in start_time_tag, start_time_tag)
 
     @mock.patch('logging.error')
-    @mock.patch('requests.get')
+    @mock.patch('airmozilla.base.mozillians.session.get')
     def test_editing_event_curated_groups(self, rget, rlogging):
 
         def mocked_get(url, **options):
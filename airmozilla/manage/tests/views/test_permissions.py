@@ -32,7 +32,7 @@ class TestPermissions(ManageTestCase):
         response = self.client.get(reverse('manage:dashboard'))
         eq_(response.status_code, 200)
 
-    @mock.patch('requests.get')
+    @mock.patch('airmozilla.base.mozillians.session.get')
     def test_editing_events_with_curated_groups(self, rget):
 
         def mocked_get(url, **options):
@@ -1,9 +1,11 @@
+import datetime
 import json
 
 from nose.tools import eq_, ok_
 
 from django.core.files import File
 from django.conf import settings
+from django.utils import timezone
 
 from funfactory.urlresolvers import reverse
 
@@ -47,7 +49,7 @@ class TestPictureGallery(ManageTestCase):
                 file=File(fp),
                 notes=""
             )
-        response = self.client.get(url)
+        response = self.client.get(url, {'all': 1})
         eq_(response.status_code, 200)
         struct = json.loads(response.content)
         ok_(struct['urls'])
@@ -64,7 +66,7 @@ class TestPictureGallery(ManageTestCase):
 
         picture.notes = 'Other notes'
         picture.save()
-        response = self.client.get(url)
+        response = self.client.get(url, {'all': 1})
         eq_(response.status_code, 200)
         struct = json.loads(response.content)
         eq_(struct['pictures'][1]['notes'], 'Other notes')
@@ -84,14 +86,14 @@ class TestPictureGallery(ManageTestCase):
                 notes="Other notes",
                 event=event
             )
-        response = self.client.get(url)
+        response = self.client.get(url, {'all': 1})
         eq_(response.status_code, 200)
         struct = json.loads(response.content)
         eq_(len(struct['pictures']), 1)
         p, = struct['pictures']
         eq_(p['notes'], 'Some notes')
 
-        response = self.client.get(url, {'event': event.id})
+        response = self.client.get(url, {'event': event.id, 'all': 1})
         eq_(response.status_code, 200)
         struct = json.loads(response.content)
         eq_(len(struct['pictures']), 2)
@@ -99,6 +101,82 @@ class TestPictureGallery(ManageTestCase):
         eq_(struct['stats']['total_pictures'], 2)
         eq_(struct['stats']['event_pictures'], 1)
 
+    def test_picturegallery_data_paginated(self):
+        url = reverse('manage:picturegallery_data')
+        with open(self.main_image) as fp:
+            picture = Picture.objects.create(
+                file=File(fp),
+                notes="Some notes"
+            )
+            picture2 = Picture.objects.create(
+                file=File(fp),
+                notes="Other notes"
+            )
+        response = self.client.get(url, {'page_size': 1})
+        eq_(response.status_code, 200)
+        struct = json.loads(response.content)
+        fields = struct['pictures']['fields']
+        p, = struct['pictures']['rows']
+        p = dict(zip(fields, p))
+        # newest first
+        eq_(p['id'], picture2.id)
+        eq_(p['events'], [])
+        ok_(struct['next'])
+        eq_(struct['stats']['total_pictures'], 2)
+
+        response = self.client.get(url, {
+            'page_size': 1,
+            'after': struct['next'],
+        })
+        eq_(response.status_code, 200)
+        struct = json.loads(response.content)
+        p, = struct['pictures']['rows']
+        p = dict(zip(fields, p))
+        eq_(p['id'], picture.id)
+        eq_(struct['next'], None)
+
+        response = self.client.get(url, {'notes': 'other'})
+        eq_(response.status_code, 200)
+        struct = json.loads(response.content)
+        p, = struct['pictures']['rows']
+        eq_(dict(zip(fields, p))['id'], picture2.id)
+        eq_(struct['count'], 1)
+
+        picture.created -= datetime.timedelta(days=2)
+        picture.save()
+        yesterday = timezone.now() - datetime.timedelta(days=1)
+        response = self.client.get(url, {
+            'created_before': yesterday.isoformat()
+        })
+        eq_(response.status_code, 200)
+        struct = json.loads(response.content)
+        p, = struct['pictures']['rows']
+        eq_(dict(zip(fields, p))['id'], picture.id)
+        response = self.client.get(url, {
+            'created_after': yesterday.isoformat()
+        })
+        eq_(response.status_code, 200)
+        struct = json.loads(response.content)
+        p, = struct['pictures']['rows']
+        eq_(dict(zip(fields, p))['id'], picture2.id)
+        response = self.client.get(url, {'created_after': 'junk'})
+        eq_(response.status_code, 400)
+
+        # the event's own pictures or the others
+        event = Event.objects.get(title='Test event')
+        picture.event = event
+        picture.save()
+        response = self.client.get(url, {'event': event.id, 'own': 'yes'})
+        eq_(response.status_code, 200)
+        struct = json.loads(response.content)
+        p, = struct['pictures']['rows']
+        eq_(dict(zip(fields, p))['id'], picture.id)
+        response = self.client.get(url, {'event': event.id, 'own': 'no'})
+        eq_(response.status_code, 200)
+        struct = json.loads(response.content)
+        p, = struct['pictures']['rows']
+        eq_(dict(zip(fields, p))['id'], picture2.id)
+
     def test_picture_edit(self):
         with open(self.main_image) as fp:
             picture = Picture.objects.create(
@@ -30,6 +30,62 @@ class TestTags(ManageTestCase):
             reverse('manage:tag_remove', args=('0',))
         )
 
+    def test_tags_data_paginated(self):
+        event = Event.objects.get(id=22)
+        event.tags.add(Tag.objects.create(name='Other'))
+        Tag.objects.create(name='other')
+        url = reverse('manage:tags_data')
+        response = self.client.get(url, {'page_size': 1, 'sort': 'id'})
+        eq_(response.status_code, 200)
+        content = json.loads(response.content)
+        eq_(
+            content['tags']['fields'],
+            ['id', 'name', '_usage_count', '_repeated']
+        )
+        eq_(content['tags']['rows'], [[1, 'testing', 1, False]])
+        ok_(content['next'])
+        eq_(content['count'], 5)
+
+        # the usage count isn't a field but you can sort by it
+        response = self.client.get(url, {
+            'page_size': 2,
+            'sort': '-usage_count',
+        })
+        eq_(response.status_code, 200)
+        content = json.loads(response.content)
+        eq_([x[1] for x in content['tags']['rows']], ['Other', 'testing'])
+        response = self.client.get(url, {
+            'page_size': 2,
+            'sort': '-usage_count',
+            'after': content['next'],
+        })
+        eq_(response.status_code, 200)
+        content = json.loads(response.content)
+        eq_([x[1] for x in content['tags']['rows']], ['other', 'test'])
+
+        response = self.client.get(url, {'repeated': 'yes'})
+        eq_(response.status_code, 200)
+        content = json.loads(response.content)
+        eq_(
+            sorted(x[1] for x in content['tags']['rows']),
+            ['Other', 'other']
+        )
+
+        response = self.client.get(url, {'minimum': 1, 'name': 'oth'})
+        eq_(response.status_code, 200)
+        content = json.loads(response.content)
+        eq_(len(content['tags']['rows']), 1)
+        __, name, count, repeated = content['tags']['rows'][0]
+        eq_(name, 'Other')
+        eq_(count, 1)
+        ok_(repeated)
+        eq_(content['next'], None)
+
+        response = self.client.get(url, {'all': 1})
+        eq_(response.status_code, 200)
+        content = json.loads(response.content)
+        eq_(len(content['tags']), 5)
+
     def test_tag_remove(self):
         """Removing a tag works correctly and leaves associated events
            with null tags."""
@@ -78,7 +78,7 @@ class TestUsersAndGroups(ManageTestCase):
 
     def test_users_data(self):
         url = reverse('manage:users_data')
-        response = self.client.get(url)
+        response = self.client.get(url, {'all': 1})
         eq_(response.status_code, 200)
         struct = json.loads(response.content)
         eq_(len(struct['users']), User.objects.all().count())
@@ -96,7 +96,7 @@ class TestUsersAndGroups(ManageTestCase):
         user.is_active = False
         user.save()
 
-        response = self.client.get(url)
+        response = self.client.get(url, {'all': 1})
         eq_(response.status_code, 200)
         struct = json.loads(response.content)
         same_user, = [x for x in struct['users'] if x['id'] == user.id]
@@ -107,7 +107,7 @@ class TestUsersAndGroups(ManageTestCase):
 
         testgroup, = Group.objects.all()
         user.groups.add(testgroup)
-        response = self.client.get(url)
+        response = self.client.get(url, {'all': 1})
         eq_(response.status_code, 200)
         struct = json.loads(response.content)
         same_user, = [x for x in struct['users'] if x['id'] == user.id]
@@ -121,8 +121,44 @@ class TestUsersAndGroups(ManageTestCase):
         )
         assert is_contributor(user)
         url = reverse('manage:users_data')
-        response = self.client.get(url)
+        response = self.client.get(url, {'all': 1})
         eq_(response.status_code, 200)
         struct = json.loads(response.content)
         row = [x for x in struct['users'] if x['email'] == user.email][0]
         ok_(row['is_contributor'])
+
+    def test_users_data_paginated(self):
+        user, = User.objects.filter(username='fake')
+        UserProfile.objects.create(
+            user=user,
+            contributor=True
+        )
+        url = reverse('manage:users_data')
+        response = self.client.get(url, {'page_size': 1, 'sort': 'id'})
+        eq_(response.status_code, 200)
+        struct = json.loads(response.content)
+        fields = struct['users']['fields']
+        first, = struct['users']['rows']
+        first = dict(zip(fields, first))
+        ok_(struct['next'])
+        eq_(struct['count'], User.objects.all().count())
+        ok_('manage:user_edit' in struct['urls'])
+
+        response = self.client.get(url, {
+            'page_size': 1,
+            'sort': 'id',
+            'after': struct['next'],
+        })
+        eq_(response.status_code, 200)
+        struct = json.loads(response.content)
+        second, = struct['users']['rows']
+        second = dict(zip(fields, second))
+        ok_(second['id'] > first['id'])
+
+        response = self.client.get(url, {'status': 'contributor'})
+        eq_(response.status_code, 200)
+        struct = json.loads(response.content)
+        row, = struct['users']['rows']
+        row = dict(zip(fields, row))
+        eq_(row['email'], user.email)
+        ok_(row['is_contributor'])
@@ -11,7 +11,7 @@ from django.utils import timezone
 from django.conf import settings
 from django.db.models import Q
 
-from airmozilla.main.helpers import thumbnail
+from airmozilla.main.thumbnails import generate_thumbnail
 from airmozilla.main.models import EventTweet, Event, Approval
 
 
@@ -47,7 +47,7 @@ def send_unsent_tweets():
 
 def send_tweet(event_tweet, save=True):
     if event_tweet.include_placeholder:
-        thumb = thumbnail(
+        thumb = generate_thumbnail(
             event_tweet.event.placeholder_img,
             '300x300'
         )
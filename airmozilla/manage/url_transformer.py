@@ -1,29 +1,81 @@
 import re
+import uuid
 
 from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
 
 from jingo import Template
 
 from airmozilla.main.models import URLMatch, URLTransform
 
 
+RULES_CACHE_KEY = 'url_transformer:rules'
+FLUSH_LOCK_CACHE_KEY = 'url_transformer:flushing'
+
+# the rules compiled by this process, for the version in the cache
+_compiled = {'version': None, 'rules': []}
+
+
+def make_use_count_cache_key(match_id):
+    return 'url_transformer:use_count:%s' % match_id
+
+
+def get_rules():
+    """return a list of (match ID, regex, [(find regex, replace_with
+    template), ...]) of all the URL matches. The rules are kept in the
+    cache till any match or transform changes and, compiled, by each
+    process for as long as they stay the same."""
+    cached = cache.get(RULES_CACHE_KEY)
+    if cached is None:
+        matches = list(URLMatch.objects.all().values_list('id', 'string'))
+        transforms = dict((x[0], []) for x in matches)
+        for transform in URLTransform.objects.all().order_by('order'):
+            transforms[transform.match_id].append(
+                (transform.find, transform.replace_with)
+            )
+        rows = [
+            (match_id, string, transforms[match_id])
+            for match_id, string in matches
+        ]
+        cached = (uuid.uuid4().hex, rows)
+        if settings.URL_TRANSFORM_CACHE_TTL:
+            cache.set(
+                RULES_CACHE_KEY,
+                cached,
+                settings.URL_TRANSFORM_CACHE_TTL
+            )
+
+    version, rows = cached
+    if _compiled['version'] != version:
+        _compiled['rules'] = [
+            (
+                match_id,
+                re.compile(string),
+                [(re.compile(x), Template(y)) for x, y in finds]
+            )
+            for match_id, string, finds in rows
+        ]
+        _compiled['version'] = version
+    return _compiled['rules']
+
+
+def forget_rules():
+    cache.delete(RULES_CACHE_KEY)
+
+
 def run(url, dry=False):
     """return a tuple of (result, error)"""
     original = url
     _context = None
+    used = []
 
-    for match in URLMatch.objects.all():
-        regex = re.compile(match.string)
+    for match_id, regex, transforms in get_rules():
         if regex.findall(url):
-            transforms = (
-                URLTransform.objects.filter(match=match).order_by('order')
-            )
-            for transform in transforms:
-                find_regex = re.compile(transform.find)
+            for find_regex, replace_with_template in transforms:
                 if _context is None:
                     _context = create_context()
                 # the `replace_with` string might have variables in it
-                replace_with_template = Template(transform.replace_with)
                 replace_with = replace_with_template.render(_context)
                 # if this is a `dry` run we don't want to accidentally
                 # reveal a real password
@@ -33,14 +85,72 @@ def run(url, dry=False):
                     )
                     replace_with = scrub_transform_passwords(replace_with)
                 url = find_regex.sub(replace_with, url)
-            match.use_count += 1
+            used.append(match_id)
 
     if original != url and not dry:
-        match.save()
+        count_use(*used)
 
     return url, None
 
 
+def count_use(*match_ids):
+    """add one to the use count of these matches. They're added up in the
+    cache till `flush_use_counts()` writes them down."""
+    if not settings.URL_TRANSFORM_CACHE_TTL:
+        URLMatch.objects.filter(id__in=match_ids).update(
+            use_count=F('use_count') + 1
+        )
+        return
+    for match_id in match_ids:
+        cache_key = make_use_count_cache_key(match_id)
+        # a day so they're not lost if the flushing isn't running
+        cache.add(cache_key, 0, 60 * 60 * 24)
+        try:
+            cache.incr(cache_key)
+        except ValueError:
+            # it was evicted since it was added
+            URLMatch.objects.filter(id=match_id).update(
+                use_count=F('use_count') + 1
+            )
+
+
+def get_unflushed_use_counts(match_ids):
+    """return a dict of match ID -> the uses added up in the cache that
+    haven't been written down yet"""
+    cache_keys = dict(
+        (make_use_count_cache_key(x), x) for x in match_ids
+    )
+    return dict(
+        (cache_keys[cache_key], count)
+        for cache_key, count in cache.get_many(cache_keys.keys()).items()
+        if count
+    )
+
+
+def flush_use_counts():
+    """write down the use counts added up in the cache and return how
+    many matches were used"""
+    # one at a time or the same uses would be written down twice
+    if not cache.add(FLUSH_LOCK_CACHE_KEY, True, 60):
+        return 0
+    try:
+        match_ids = URLMatch.objects.all().values_list('id', flat=True)
+        counts = get_unflushed_use_counts(match_ids)
+        for match_id, count in counts.items():
+            URLMatch.objects.filter(id=match_id).update(
+                use_count=F('use_count') + count
+            )
+            try:
+                # uses counted in the meantime stay
+                cache.decr(make_use_count_cache_key(match_id), count)
+            except ValueError:
+                # evicted, with the uses that were just written down
+                pass
+        return len(counts)
+    finally:
+        cache.delete(FLUSH_LOCK_CACHE_KEY)
+
+
 def _password_lookup(username):
     return settings.URL_TRANSFORM_PASSWORDS[username]
 
@@ -0,0 +1,323 @@
+"""A size-bounded, on-disk, least-recently-used cache of downloaded
+source videos.
+
+Every cached video lives in its own directory (named after a hash of the
+cache key) inside `settings.VIDEO_CACHE_DIRECTORY_NAME` in the temp
+directory. Next to the video file there's a small JSON file that
+remembers the ETag and Content-Length it was downloaded with so that
+we can tell if the remote file has changed since.
+
+Only one process at a time downloads a video into the cache. The others
+that want the same one wait for it (see `_lock()`). Whilst in a
+`using()` block, the videos got are kept from being evicted or replaced
+by other processes.
+"""
+
+import os
+import json
+import time
+import fcntl
+import errno
+import shutil
+import hashlib
+import tempfile
+import contextlib
+
+from django.conf import settings
+from django.template.defaultfilters import filesizeformat
+
+from airmozilla.base.helpers import show_duration
+
+
+META_FILENAME = 'meta.json'
+
+PARTIAL_SUFFIX = '.partial'
+
+LOCK_SUFFIX = '.lock'
+
+# Interrupted downloads that haven't been resumed in this many seconds
+# are deleted.
+PARTIAL_MAX_AGE = 60 * 60 * 24
+
+# The lock files, by entry directory, of the videos this process is using
+# in a `using()` block. Each has a shared lock.
+_in_use = {'lock_files': None}
+
+
+def get_cache_directory():
+    dir_ = os.path.join(
+        tempfile.gettempdir(),
+        settings.VIDEO_CACHE_DIRECTORY_NAME
+    )
+    if not os.path.isdir(dir_):
+        try:
+            os.mkdir(dir_)
+        except OSError:
+            # some other process beat us to it
+            if not os.path.isdir(dir_):
+                raise
+    return dir_
+
+
+def make_key(identifier, hd=False):
+    """return the cache key for a Vid.ly tag or video URL"""
+    return '%s|%s' % (identifier, hd and 'hd' or 'sd')
+
+
+def _get_entry_directory(key):
+    return os.path.join(
+        get_cache_directory(),
+        hashlib.md5(key).hexdigest()
+    )
+
+
+def _get_validators(headers):
+    content_length = headers.get('Content-Length')
+    if content_length:
+        content_length = int(content_length)
+    return {
+        'etag': headers.get('ETag'),
+        'content_length': content_length or None,
+    }
+
+
+def _read_meta(entry_dir):
+    try:
+        with open(os.path.join(entry_dir, META_FILENAME)) as f:
+            return json.load(f)
+    except (IOError, ValueError):
+        return None
+
+
+def _is_valid(entry_dir, meta, validators):
+    filepath = os.path.join(entry_dir, meta['filename'])
+    if not os.path.isfile(filepath):
+        return False
+    size = os.stat(filepath).st_size
+    if meta['content_length'] and size != meta['content_length']:
+        # an incomplete download
+        return False
+    for key in ('etag', 'content_length'):
+        if validators[key] and meta[key] and validators[key] != meta[key]:
+            return False
+    return True
+
+
+def _open_lock(entry_dir, operation):
+    """open the entry's lock file and flock() it with `operation`. Return
+    the open file, closing it lets go of the lock, or None if it's
+    non-blocking and someone else has it.
+
+    It's a lock file next to the entry's directory rather than in it
+    because the directory is replaced when it's downloaded again.
+    """
+    while True:
+        lock_file = open(entry_dir + LOCK_SUFFIX, 'a')
+        try:
+            fcntl.flock(lock_file, operation)
+        except IOError as exception:
+            lock_file.close()
+            if exception.errno not in (errno.EAGAIN, errno.EACCES):
+                raise
+            return None
+        try:
+            current = os.path.samestat(
+                os.fstat(lock_file.fileno()),
+                os.stat(lock_file.name)
+            )
+        except OSError:
+            current = False
+        if current:
+            return lock_file
+        # it was evicted, and its lock file removed, while we waited
+        lock_file.close()
+
+
+@contextlib.contextmanager
+def _lock(entry_dir, blocking=True):
+    """hold an exclusive lock on the entry while the block runs. It says
+    whether it got it, which it always does unless `blocking` is false.
+    """
+    operation = fcntl.LOCK_EX
+    if not blocking:
+        operation |= fcntl.LOCK_NB
+    lock_file = _open_lock(entry_dir, operation)
+    try:
+        yield lock_file is not None
+    finally:
+        if lock_file is not None:
+            lock_file.close()
+
+
+def _remove_lock_file(entry_dir):
+    try:
+        os.remove(entry_dir + LOCK_SUFFIX)
+    except OSError:
+        pass
+
+
+@contextlib.contextmanager
+def using():
+    """keep the videos got with `get()` whilst the block runs from being
+    evicted, or replaced, by other processes"""
+    if _in_use['lock_files'] is not None:
+        # already in one
+        yield
+        return
+    _in_use['lock_files'] = {}
+    try:
+        yield
+    finally:
+        for lock_file in _in_use['lock_files'].values():
+            lock_file.close()
+        _in_use['lock_files'] = None
+
+
+def _get_cached(entry_dir, validators, verbose=False):
+    """return the path to the cached video if it's still good"""
+    meta = _read_meta(entry_dir)
+    if meta and _is_valid(entry_dir, meta, validators):
+        filepath = os.path.join(entry_dir, meta['filename'])
+        # bump its position in the LRU
+        os.utime(filepath, None)
+        if verbose:  # pragma: no cover
+            print "Using cached download", filepath
+        return filepath
+
+
+def get(key, url, filename, headers, download_function, verbose=False):
+    """return the path to a local copy of the video at `url`.
+
+    If there's already a cached copy under `key` that still matches the
+    ETag and Content-Length in `headers` (from a HEAD request on `url`),
+    that is used. Otherwise `download_function(url, filepath, verbose=...)`
+    is called to populate the cache.
+
+    In a `using()` block it stays there till the end of the block.
+    """
+    entry_dir = _get_entry_directory(key)
+    validators = _get_validators(headers)
+    in_use = _in_use['lock_files']
+    if in_use is not None and entry_dir in in_use:
+        filepath = _get_cached(entry_dir, validators, verbose=verbose)
+        if filepath:
+            return filepath
+        # it has changed, so let go of it so it can be downloaded again
+        in_use.pop(entry_dir).close()
+
+    # shared so that it's not evicted, or replaced, whilst it's checked
+    lock_file = _open_lock(entry_dir, fcntl.LOCK_SH)
+    filepath = _get_cached(entry_dir, validators, verbose=verbose)
+    if not filepath:
+        lock_file.close()
+        with _lock(entry_dir):
+            # another process might have downloaded it while we waited
+            if not _get_cached(entry_dir, validators, verbose=verbose):
+                _download(entry_dir, url, filename, validators,
+                          download_function, verbose=verbose)
+        lock_file = _open_lock(entry_dir, fcntl.LOCK_SH)
+        filepath = os.path.join(entry_dir, filename)
+        evict(keep=entry_dir, verbose=verbose)
+
+    if in_use is not None:
+        in_use[entry_dir] = lock_file
+    else:
+        lock_file.close()
+    return filepath
+
+
+def _download(entry_dir, url, filename, validators, download_function,
+              verbose=False):
+    # Download it to a directory next to where it's going to end up so
+    # that the final rename is atomic. If the download fails, that
+    # directory is left behind so the next attempt can resume it.
+    partial_dir = entry_dir + PARTIAL_SUFFIX
+    partial_meta = _read_meta(partial_dir)
+    meta = dict(validators, filename=filename, url=url)
+    if partial_meta is not None and [
+        partial_meta.get(x) for x in ('filename', 'etag', 'content_length')
+    ] != [
+        meta[x] for x in ('filename', 'etag', 'content_length')
+    ]:
+        # it's a partial download of some other version
+        shutil.rmtree(partial_dir)
+    if not os.path.isdir(partial_dir):
+        os.mkdir(partial_dir)
+        with open(os.path.join(partial_dir, META_FILENAME), 'w') as f:
+            json.dump(meta, f)
+
+    t0 = time.time()
+    download_function(
+        url,
+        os.path.join(partial_dir, filename),
+        verbose=verbose
+    )
+    t1 = time.time()
+    if verbose:  # pragma: no cover
+        seconds = int(t1 - t0)
+        print "Took", show_duration(seconds, include_seconds=True),
+        print "to download"
+    if os.path.isdir(entry_dir):
+        shutil.rmtree(entry_dir)
+    os.rename(partial_dir, entry_dir)
+
+
+def _get_entries():
+    dir_ = get_cache_directory()
+    entries = []
+    for name in os.listdir(dir_):
+        entry_dir = os.path.join(dir_, name)
+        if name.endswith(PARTIAL_SUFFIX):
+            continue
+        meta = _read_meta(entry_dir)
+        if not meta:
+            # not finished downloading or broken
+            continue
+        filepath = os.path.join(entry_dir, meta['filename'])
+        if not os.path.isfile(filepath):
+            continue
+        stat_ = os.stat(filepath)
+        entries.append((stat_.st_mtime, stat_.st_size, entry_dir))
+    return entries
+
+
+def evict(keep=None, verbose=False):
+    """delete the least recently used videos till the total size of the
+    cache is below `settings.VIDEO_CACHE_MAX_SIZE`."""
+    entries = _get_entries()
+    total = sum(size for __, size, __ in entries)
+    deleted = 0
+    for __, size, entry_dir in sorted(entries):
+        if total <= settings.VIDEO_CACHE_MAX_SIZE:
+            break
+        if entry_dir == keep:
+            continue
+        with _lock(entry_dir, blocking=False) as locked:
+            if not locked:
+                # someone is using it, or downloading it again
+                continue
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            _remove_lock_file(entry_dir)
+        total -= size
+        deleted += 1
+
+    # also clean up interrupted downloads that never got resumed
+    dir_ = get_cache_directory()
+    for name in os.listdir(dir_):
+        partial_dir = os.path.join(dir_, name)
+        if (
+            name.endswith(PARTIAL_SUFFIX) and
+            os.stat(partial_dir).st_mtime < time.time() - PARTIAL_MAX_AGE
+        ):
+            # unless it's still being downloaded
+            entry_dir = partial_dir[:-len(PARTIAL_SUFFIX)]
+            with _lock(entry_dir, blocking=False) as locked:
+                if locked:
+                    shutil.rmtree(partial_dir, ignore_errors=True)
+                    if not os.path.isdir(entry_dir):
+                        _remove_lock_file(entry_dir)
+
+    if verbose and deleted:  # pragma: no cover
+        print "Evicted", deleted, "cached downloads.",
+        print "Cache is now", filesizeformat(total)
+    return deleted
@@ -1,4 +1,6 @@
 import re
+import json
+import math
 import subprocess
 import tempfile
 import shutil
@@ -9,36 +11,318 @@ import traceback
 import urlparse
 import glob
 import stat
+import signal
+import datetime
+import multiprocessing
+from cStringIO import StringIO
+from multiprocessing.pool import ThreadPool
 
 import requests
 
-from django.core.cache import cache
 from django.conf import settings
+from django.db import connection
+from django.utils import timezone
 from django.template.defaultfilters import filesizeformat
 from django.db.models import Q
 from django.core.files import File
+from django.core.files.images import get_image_dimensions
+from django.db import transaction
 
-from airmozilla.main.models import Event, VidlySubmission, Picture
+from airmozilla.main.models import (
+    Event,
+    VidlySubmission,
+    Picture,
+    VideoInfo,
+    QuarantinedEvent,
+)
 from airmozilla.base.helpers import show_duration
+from airmozilla.main.thumbnails import generate_thumbnail
 from airmozilla.manage import vidly
+from airmozilla.manage import video_cache
 
 REGEX = re.compile('Duration: (\d+):(\d+):(\d+).(\d+)')
 
+EXTRACTION_SEQUENTIAL = 'sequential'
+EXTRACTION_PARALLEL = 'parallel'
+EXTRACTION_SINGLE = 'single'
+EXTRACTIONS = (
+    EXTRACTION_SEQUENTIAL,
+    EXTRACTION_PARALLEL,
+    EXTRACTION_SINGLE,
+)
 
-def _download_file(url, local_filename):
-    # NOTE the stream=True parameter
-    r = requests.get(url, stream=True)
-    with open(local_filename, 'wb') as f:
-        for chunk in r.iter_content(chunk_size=1024):
-            if chunk:  # filter out keep-alive new chunks
+
+# How much to read off the network before writing to disk
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024  # 1Mb
+
+# Seconds to wait for a server to respond, or to send some more, before
+# giving up on it
+DOWNLOAD_TIMEOUT = 60
+
+
+def _get_total_size(response):
+    """return the size of the whole remote file from a response that is
+    either a regular 200 OK, a 206 Partial Content or a 416 Requested
+    Range Not Satisfiable."""
+    if response.status_code in (206, 416):
+        content_range = response.headers.get('Content-Range', '')
+        total = content_range.split('/')[-1]
+        if total.isdigit():
+            return int(total)
+    elif response.headers.get('Content-Length'):
+        return int(response.headers['Content-Length'])
+
+
+def _get_range_start(response):
+    """return where the bytes of a 206 Partial Content response start"""
+    match = re.match(
+        r'bytes (\d+)-',
+        response.headers.get('Content-Range', '')
+    )
+    if match:
+        return int(match.group(1))
+
+
+def _get_segment_filename(local_filename, start, end):
+    return '%s.%d-%d.part' % (local_filename, start, end)
+
+
+def _get_segments(local_filename):
+    """return a sorted list of the (start, end) of each part file of an
+    earlier segmented download of `local_filename` on disk"""
+    directory, basename = os.path.split(local_filename)
+    regex = re.compile(r'^%s\.(\d+)-(\d+)\.part$' % re.escape(basename))
+    segments = []
+    for filename in os.listdir(directory or '.'):
+        match = regex.match(filename)
+        if match:
+            segments.append((int(match.group(1)), int(match.group(2))))
+    return sorted(segments)
+
+
+def _get_plan_filename(local_filename):
+    return local_filename + '.parts'
+
+
+def _is_whole(ranges, total):
+    """return true if the ranges cover every byte from 0 to `total - 1`
+    once, in order"""
+    expected = 0
+    for start, end in ranges:
+        if start != expected or end < start:
+            return False
+        expected = end + 1
+    return bool(ranges) and expected == total
+
+
+def _get_plan(local_filename):
+    """return the (total, ranges) that an earlier segmented download of
+    `local_filename`, that never finished, planned to download.
+    If there isn't one, or it can't be trusted, return None and remove
+    whatever parts it left behind."""
+    plan_filename = _get_plan_filename(local_filename)
+    if os.path.isfile(plan_filename):
+        try:
+            with open(plan_filename) as f:
+                plan = json.load(f)
+            total = int(plan['total'])
+            ranges = [(int(start), int(end)) for start, end in plan['ranges']]
+        except (ValueError, TypeError, KeyError):
+            pass
+        else:
+            if _is_whole(ranges, total):
+                return total, ranges
+        os.remove(plan_filename)
+    for start, end in _get_segments(local_filename):
+        os.remove(_get_segment_filename(local_filename, start, end))
+
+
+def _download_range(url, segment_filename, start, end):
+    """download the bytes from `start` to `end` (inclusive) into a file
+    of their own, continuing where an earlier attempt left off."""
+    done = 0
+    if os.path.isfile(segment_filename):
+        done = os.stat(segment_filename)[stat.ST_SIZE]
+    if start + done <= end:
+        r = requests.get(
+            url,
+            stream=True,
+            headers={'Range': 'bytes=%d-%d' % (start + done, end)},
+            timeout=DOWNLOAD_TIMEOUT
+        )
+        assert r.status_code == 206, r.status_code
+        assert _get_range_start(r) == start + done, (
+            r.headers.get('Content-Range')
+        )
+        with open(segment_filename, 'ab') as f:
+            for chunk in r.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
                 f.write(chunk)
-                f.flush()
+    size = os.stat(segment_filename)[stat.ST_SIZE]
+    if size != end - start + 1:
+        raise AssertionError(
+            'Downloaded %d bytes of %d-%d but expected %d' % (
+                size, start, end, end - start + 1
+            )
+        )
+
+
+def _download_file(url, local_filename, segments=None, verbose=False):
+    """Download `url` to `local_filename`.
+
+    If `segments` is more than 1 (defaults to
+    `settings.VIDEO_DOWNLOAD_SEGMENTS`) and the server supports range
+    requests, the file is downloaded in that many parallel parts, each
+    into a file of its own, and put together when they're all done.
+    What the parts are, and the size of the whole, is written down in
+    `<local_filename>.parts` before any of them is started.
+
+    Either way `local_filename` is only ever written in order so if it,
+    or any of the parts, already exists, as the result of an earlier
+    interrupted download, it continues where it left off with a HTTP
+    Range request.
+    """
+    if segments is None:
+        segments = getattr(settings, 'VIDEO_DOWNLOAD_SEGMENTS', 1)
+    t0 = time.time()
+    offset = 0
+    total = None
+    ranges = None
+    plan = _get_plan(local_filename)
+    if plan:
+        total, ranges = plan
+    else:
+        if os.path.isfile(local_filename):
+            offset = os.stat(local_filename)[stat.ST_SIZE]
+        if segments > 1 and not offset:
+            head = requests.head(url, timeout=DOWNLOAD_TIMEOUT)
+            if head.headers.get('Accept-Ranges') == 'bytes':
+                total = _get_total_size(head)
+            if total:
+                size = int(math.ceil(float(total) / segments))
+                ranges = [
+                    (start, min(start + size, total) - 1)
+                    for start in range(0, total, size)
+                ]
+                # written down first so that if this is interrupted, or
+                # some of the parts are never even started, the next
+                # attempt knows what the whole is meant to be
+                with open(_get_plan_filename(local_filename), 'w') as f:
+                    json.dump({'total': total, 'ranges': ranges}, f)
+
+    if ranges:
+        pool = ThreadPool(len(ranges))
+        try:
+            pool.map(
+                lambda range_: _download_range(
+                    url,
+                    _get_segment_filename(local_filename, *range_),
+                    *range_
+                ),
+                ranges
+            )
+        finally:
+            pool.close()
+            pool.join()
+        # put them together, in order
+        with open(local_filename, 'wb') as f:
+            for start, end in ranges:
+                segment_filename = _get_segment_filename(
+                    local_filename, start, end
+                )
+                with open(segment_filename, 'rb') as segment:
+                    shutil.copyfileobj(segment, f, DOWNLOAD_CHUNK_SIZE)
+        size = os.stat(local_filename)[stat.ST_SIZE]
+        if size != total:
+            # keep the parts and try again next time
+            os.remove(local_filename)
+            raise AssertionError(
+                'Put together %d bytes but expected %d' % (size, total)
+            )
+        for start, end in ranges:
+            os.remove(_get_segment_filename(local_filename, start, end))
+        os.remove(_get_plan_filename(local_filename))
+    else:
+        headers = {}
+        if offset:
+            headers['Range'] = 'bytes=%d-' % offset
+        r = requests.get(
+            url,
+            stream=True,
+            headers=headers,
+            timeout=DOWNLOAD_TIMEOUT
+        )
+        if r.status_code == 416:
+            # Requested Range Not Satisfiable. The file has only been
+            # written in order so it means we already have it all.
+            # Unless the server says it's a different size.
+            total = _get_total_size(r) or offset
+            if total != offset:
+                os.remove(local_filename)
+        else:
+            assert r.status_code in (200, 206), r.status_code
+            total = _get_total_size(r)
+            if r.status_code == 206:
+                assert _get_range_start(r) == offset, (
+                    r.headers.get('Content-Range')
+                )
+                mode = 'ab'
+                if verbose:  # pragma: no cover
+                    print "Resuming download from", filesizeformat(offset)
+            else:
+                # the server ignored the Range header, start over
+                mode = 'wb'
+                offset = 0
+            downloaded = offset
+            next_report = 0.1
+            with open(local_filename, mode) as f:
+                for chunk in r.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    if chunk:  # filter out keep-alive new chunks
+                        f.write(chunk)
+                        downloaded += len(chunk)
+                        if verbose and total and (
+                            float(downloaded) / total >= next_report
+                        ):  # pragma: no cover
+                            print "Downloaded %d%% (%s of %s)" % (
+                                100 * downloaded / total,
+                                filesizeformat(downloaded),
+                                filesizeformat(total),
+                            )
+                            next_report += 0.1
+
+    size = 0
+    if os.path.isfile(local_filename):
+        size = os.stat(local_filename)[stat.ST_SIZE]
+    if total and size != total:
+        raise AssertionError(
+            'Downloaded %d bytes but expected %d' % (size, total)
+        )
+    if verbose:  # pragma: no cover
+        seconds = time.time() - t0
+        print "Downloaded", filesizeformat(size - offset),
+        print "at %s/s" % filesizeformat((size - offset) / max(seconds, 1))
+
+
+def _check_remote_video(video_url):
+    # Some videos might return a 200 OK on a HEAD but are corrupted
+    # and contains nothing
+    assert '://' in video_url
+    head = requests.head(video_url, timeout=DOWNLOAD_TIMEOUT)
+    if head.headers.get('Content-Length') == '0':
+        # corrupt file!
+        raise AssertionError(
+            '%s has a 0 byte Content-Length' % video_url
+        )
+    if head.headers.get('Content-Type', '').startswith('text/html'):
+        # Not a URL to an actual file!
+        raise AssertionError(
+            '%s is a text/html document' % video_url
+        )
 
 
 def fetch_duration(
     event, save=False, save_locally=False, verbose=False, use_https=True,
 ):
-    # The 'filepath' is only not None if you passed 'save_locally' as true
+    # The 'video_url' is a local file if you passed 'save_locally' as true
     video_url, filepath = _get_video_url(
         event,
         use_https,
@@ -46,75 +330,188 @@ def fetch_duration(
         verbose=verbose
     )
 
-    # Some videos might return a 200 OK on a HEAD but are corrupted
-    # and contains nothing
     if not save_locally:
-        assert '://' in video_url
-        head = requests.head(video_url)
-        if head.headers.get('Content-Length') == '0':
-            # corrupt file!
-            raise AssertionError(
-                '%s has a 0 byte Content-Length' % video_url
-            )
-        if head.headers.get('Content-Type', '').startswith('text/html'):
-            # Not a URL to an actual file!
-            raise AssertionError(
-                '%s is a text/html document' % video_url
-            )
+        _check_remote_video(video_url)
 
-    try:
-        ffmpeg_location = getattr(
-            settings,
-            'FFMPEG_LOCATION',
-            'ffmpeg'
-        )
-        command = [
-            ffmpeg_location,
-            '-i',
-            video_url,
-        ]
+    ffmpeg_location = getattr(
+        settings,
+        'FFMPEG_LOCATION',
+        'ffmpeg'
+    )
+    command = [
+        ffmpeg_location,
+        '-i',
+        video_url,
+    ]
+    if verbose:  # pragma: no cover
+        print ' '.join(command)
+
+    t0 = time.time()
+    out, err = subprocess.Popen(
+        command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE
+    ).communicate()
+    t1 = time.time()
+
+    if verbose:  # pragma: no cover
+        print "Took", t1 - t0, "seconds to extract duration information"
+
+    matches = REGEX.findall(err)
+    if matches:
+        found, = matches
+        hours = int(found[0])
+        minutes = int(found[1])
+        minutes += hours * 60
+        seconds = int(found[2])
+        seconds += minutes * 60
+        if save:
+            event.duration = seconds
+            event.save()
         if verbose:  # pragma: no cover
-            print ' '.join(command)
+            print show_duration(seconds, include_seconds=True)
+        return seconds
+    elif verbose:  # pragma: no cover
+        print "No Duration output. Error:"
+        print err
 
-        t0 = time.time()
-        out, err = subprocess.Popen(
-            command,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE
-        ).communicate()
-        t1 = time.time()
 
+def _parse_probe(data):
+    """return a dict of the things we care about from the JSON output of
+    `ffprobe -show_format -show_streams -of json`."""
+    format_ = data.get('format') or {}
+    info = {
+        'format_name': format_.get('format_name', ''),
+        'video_codec': '',
+        'audio_codec': '',
+        'width': None,
+        'height': None,
+        'duration': None,
+        'bitrate': None,
+        'size': None,
+    }
+    if format_.get('duration'):
+        info['duration'] = int(float(format_['duration']))
+    if format_.get('bit_rate'):
+        info['bitrate'] = int(format_['bit_rate'])
+    if format_.get('size'):
+        info['size'] = int(format_['size'])
+    for stream in data.get('streams') or []:
+        if stream.get('codec_type') == 'video' and not info['video_codec']:
+            info['video_codec'] = stream.get('codec_name', '')
+            info['width'] = stream.get('width')
+            info['height'] = stream.get('height')
+        elif stream.get('codec_type') == 'audio' and not info['audio_codec']:
+            info['audio_codec'] = stream.get('codec_name', '')
+    return info
+
+
+def fetch_videoinfo(
+    event, save=False, save_locally=False, verbose=False, use_https=True,
+):
+    """Like fetch_duration() but uses ffprobe to extract the duration,
+    resolution, codecs, bitrate and file size in one go. ffprobe only
+    reads the parts of the file it needs.
+    If `save` is true, these are stored in the event's VideoInfo and the
+    event's duration is set."""
+    video_url, filepath = _get_video_url(
+        event,
+        use_https,
+        save_locally,
+        verbose=verbose
+    )
+    if not save_locally:
+        _check_remote_video(video_url)
+
+    ffprobe_location = getattr(
+        settings,
+        'FFPROBE_LOCATION',
+        'ffprobe'
+    )
+    command = [
+        ffprobe_location,
+        '-v',
+        'error',
+        '-show_format',
+        '-show_streams',
+        '-of',
+        'json',
+        video_url,
+    ]
+    if verbose:  # pragma: no cover
+        print ' '.join(command)
+
+    t0 = time.time()
+    out, err = subprocess.Popen(
+        command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE
+    ).communicate()
+    t1 = time.time()
+
+    if verbose:  # pragma: no cover
+        print "Took", t1 - t0, "seconds to extract video information"
+
+    try:
+        info = _parse_probe(json.loads(out))
+    except ValueError:
+        info = {}
+    if not info.get('duration'):
         if verbose:  # pragma: no cover
-            print "Took", t1 - t0, "seconds to extract duration information"
-
-        matches = REGEX.findall(err)
-        if matches:
-            found, = matches
-            hours = int(found[0])
-            minutes = int(found[1])
-            minutes += hours * 60
-            seconds = int(found[2])
-            seconds += minutes * 60
-            if save:
-                event.duration = seconds
-                event.save()
-            if verbose:  # pragma: no cover
-                print show_duration(seconds, include_seconds=True)
-            return seconds
-        elif verbose:  # pragma: no cover
             print "No Duration output. Error:"
             print err
-    finally:
-        if save_locally:
-            if os.path.isfile(filepath):
-                shutil.rmtree(os.path.dirname(filepath))
+        return
+
+    if save:
+        hd = False
+        if 'Vid.ly' in event.template.name:
+            hd = _get_vidly_options(event)[0]
+        for video_info in VideoInfo.objects.filter(event=event):
+            break
+        else:
+            video_info = VideoInfo(event=event)
+        for key, value in info.items():
+            setattr(video_info, key, value)
+        video_info.hd = hd
+        video_info.save()
+        event.duration = info['duration']
+        event.save()
+    if verbose:  # pragma: no cover
+        print show_duration(info['duration'], include_seconds=True),
+        print '%sx%s' % (info['width'], info['height']),
+        print info['video_codec'], info['audio_codec'],
+        if info['size']:
+            print filesizeformat(info['size']),
+        print
+    return info
 
 
 def fetch_screencapture(
     event, save=False, save_locally=False, verbose=False, use_https=True,
-    import_=True,
+    import_=True, extraction=None,
 ):
+    """Extract `settings.SCREENCAPTURES_NO_PICTURES` JPEGs from the video.
+
+    The `extraction` can be one of:
+
+        * 'sequential' - one `ffmpeg -ss T -i URL` per picture, one at a time
+        * 'parallel' - same as 'sequential' but runs a bounded number of
+          those ffmpeg processes concurrently
+        * 'single' - one ffmpeg process that extracts all pictures in one
+          pass over the video (use with `save_locally`)
+
+    If not specified it defaults to `settings.SCREENCAPTURES_EXTRACTION`.
+    """
     assert event.duration, "no duration"
+    if extraction is None:
+        extraction = getattr(
+            settings,
+            'SCREENCAPTURES_EXTRACTION',
+            EXTRACTION_SEQUENTIAL
+        )
+    if extraction not in EXTRACTIONS:
+        raise ValueError('Unrecognized extraction %r' % extraction)
+
     video_url, filepath = _get_video_url(
         event,
         use_https,
@@ -155,47 +552,81 @@ def fetch_screencapture(
             'FFMPEG_LOCATION',
             'ffmpeg'
         )
-        incr = float(event.duration) / settings.SCREENCAPTURES_NO_PICTURES
-        seconds = 0
-        t0 = time.time()
-        number = 0
+        no_pictures = settings.SCREENCAPTURES_NO_PICTURES
         output_template = os.path.join(save_dir, 'screencap-%02d.jpg')
-        all_out = []
-        all_err = []
-        while seconds < event.duration:
-            number += 1
-            output = output_template % number
-            command = [
+        commands = []
+        if extraction == EXTRACTION_SINGLE:
+            # One single ffmpeg process that reads through the whole video
+            # once and uses the fps filter to pick out evenly spaced frames.
+            # This is best used with a local file (i.e. `save_locally`)
+            # because it would otherwise stream the whole remote video.
+            commands.append([
                 ffmpeg_location,
-                '-ss',
-                format_time(seconds),
                 '-i',
                 video_url,
+                '-vf',
+                'fps=%d/%d' % (no_pictures, event.duration),
                 '-vframes',
-                '1',
-                output,
-            ]
+                str(no_pictures),
+                output_template,
+            ])
+        else:
+            incr = float(event.duration) / no_pictures
+            seconds = 0
+            number = 0
+            while seconds < event.duration:
+                number += 1
+                commands.append([
+                    ffmpeg_location,
+                    '-ss',
+                    format_time(seconds),
+                    '-i',
+                    video_url,
+                    '-vframes',
+                    '1',
+                    output_template % number,
+                ])
+                seconds += incr
+
+        def run(command):
             if verbose:  # pragma: no cover
                 print ' '.join(command)
-            out, err = subprocess.Popen(
+            return subprocess.Popen(
                 command,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE
             ).communicate()
-            all_out.append(out)
-            all_err.append(err)
-            seconds += incr
+
+        t0 = time.time()
+        if extraction == EXTRACTION_PARALLEL and len(commands) > 1:
+            # The work happens in the ffmpeg sub-processes so a thread
+            # pool is enough to keep a bounded number of them running.
+            pool = ThreadPool(
+                min(
+                    len(commands),
+                    getattr(settings, 'SCREENCAPTURES_PARALLEL_PROCESSES', 4)
+                )
+            )
+            try:
+                outputs = pool.map(run, commands)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            outputs = [run(command) for command in commands]
+        all_err = [err for out, err in outputs]
         t1 = time.time()
 
         files = _get_files(save_dir)
         if verbose:  # pragma: no cover
-            print "Took", t1 - t0, "seconds to extract", len(files), "pictures"
+            print "Took", t1 - t0, "seconds to extract", len(files),
+            print "pictures (%s)" % extraction
 
         if import_:
             if verbose and not files:  # pragma: no cover
                 print "No output. Error:"
                 print '\n'.join(all_err)
-            created = _import_files(event, files)
+            created = _import_files(event, files, verbose=verbose)
             if verbose:  # pragma: no cover
                 print "Created", created, "pictures"
                 # end of this section, so add some margin
@@ -207,9 +638,6 @@ def fetch_screencapture(
                 print '\t' + '\n\t'.join(os.listdir(save_dir))
             return len(files)
     finally:
-        if save_locally:
-            if os.path.isfile(filepath):
-                shutil.rmtree(os.path.dirname(filepath))
         if os.path.isdir(save_dir) and import_:
             shutil.rmtree(save_dir)
 
@@ -224,22 +652,29 @@ def _get_files(directory):
     return filenames
 
 
+def _get_vidly_options(event):
+    """return a tuple of (hd, token_protected) based on the most recent
+    Vid.ly submission for the event's tag."""
+    token_protected = event.privacy != Event.PRIVACY_PUBLIC
+    hd = False
+    qs = (
+        VidlySubmission.objects
+        .filter(event=event)
+        .filter(tag=event.template_environment['tag'])
+    )
+
+    for submission in qs.order_by('-submission_time')[:1]:
+        hd = submission.hd
+        token_protected = submission.token_protection
+
+    return hd, token_protected
+
+
 def _get_video_url(event, use_https, save_locally, verbose=False):
     if 'Vid.ly' in event.template.name:
         assert event.template_environment.get('tag'), "No Vid.ly tag value"
 
-        token_protected = event.privacy != Event.PRIVACY_PUBLIC
-        hd = False
-        qs = (
-            VidlySubmission.objects
-            .filter(event=event)
-            .filter(tag=event.template_environment['tag'])
-        )
-
-        for submission in qs.order_by('-submission_time')[:1]:
-            hd = submission.hd
-            token_protected = submission.token_protection
-
+        hd, token_protected = _get_vidly_options(event)
         tag = event.template_environment['tag']
         video_url = 'https://vid.ly/%s?content=video&format=' % tag
         if hd:
@@ -255,20 +690,19 @@ def _get_video_url(event, use_https, save_locally, verbose=False):
     else:
         raise AssertionError("Not valid template")
 
-    response = requests.head(video_url)
+    response = requests.head(video_url, timeout=DOWNLOAD_TIMEOUT)
     _count = 0
     while response.status_code in (302, 301):
         video_url = response.headers['Location']
-        response = requests.head(video_url)
+        response = requests.head(video_url, timeout=DOWNLOAD_TIMEOUT)
         _count += 1
         if _count > 5:
             # just too many times
             break
 
-    response = requests.head(video_url)
     assert response.status_code == 200, response.status_code
     if verbose:  # pragma: no cover
-        if response.headers['Content-Length']:
+        if response.headers.get('Content-Length'):
             print "Content-Length:",
             print filesizeformat(int(response.headers['Content-Length']))
 
@@ -276,22 +710,21 @@ def _get_video_url(event, use_https, save_locally, verbose=False):
         video_url = video_url.replace('https://', 'http://')
 
     if save_locally:
-        # store it in a temporary location
-        dir_ = tempfile.mkdtemp('videoinfo')
+        # use (or populate) the shared cache of downloaded videos
         if 'Vid.ly' in event.template.name:
-            filepath = os.path.join(dir_, '%s.mp4' % tag)
+            key = video_cache.make_key(tag, hd=hd)
+            filename = '%s.mp4' % tag
         else:
-            filepath = os.path.join(
-                dir_,
-                os.path.basename(urlparse.urlparse(video_url).path)
-            )
-        t0 = time.time()
-        _download_file(video_url, filepath)
-        t1 = time.time()
-        if verbose:  # pragma: no cover
-            seconds = int(t1 - t0)
-            print "Took", show_duration(seconds, include_seconds=True),
-            print "to download"
+            key = video_cache.make_key(event.template_environment['url'])
+            filename = os.path.basename(urlparse.urlparse(video_url).path)
+        filepath = video_cache.get(
+            key,
+            video_url,
+            filename,
+            response.headers,
+            _download_file,
+            verbose=verbose
+        )
         video_url = filepath
     else:
         filepath = None
@@ -299,53 +732,247 @@ def _get_video_url(event, use_https, save_locally, verbose=False):
     return video_url, filepath
 
 
-def _import_files(event, files):
-    created = 0
+def _import_files(event, files, verbose=False):
+    """create Pictures of all the files in one go and then pre-generate
+    the thumbnails we know the templates will want of them."""
+    file_field = Picture._meta.get_field('file')
+    pictures = []
     # We sort and reverse by name so that the first instance
     # that is created is the oldest one.
     # That way, when you look at the in the picture gallery
     # (which is sorted by ('event', '-created')) they appear in
     # correct chronological order.
     for i, filepath in enumerate(reversed(sorted(files))):
-        with open(filepath) as fp:
-            Picture.objects.create(
-                file=File(fp),
-                notes="Screencap %d" % (len(files) - i,),
-                event=event,
-            )
-            created += 1
-    return created
+        picture = Picture(
+            event=event,
+            notes="Screencap %d" % (len(files) - i,),
+            size=os.stat(filepath)[stat.ST_SIZE],
+        )
+        picture.width, picture.height = get_image_dimensions(filepath)
+        name = file_field.generate_filename(
+            picture,
+            os.path.basename(filepath)
+        )
+        with open(filepath, 'rb') as fp:
+            picture.file = file_field.storage.save(name, File(fp))
+        pictures.append(picture)
 
+    # bulk_create() doesn't send the pre_save signal, which is fine
+    # because we've already set the size and notes
+    with transaction.commit_on_success():
+        Picture.objects.bulk_create(pictures)
 
-def _fetch(
-    qs,
+    _pregenerate_thumbnails(
+        [x.file.name for x in pictures],
+        verbose=verbose
+    )
+    return len(pictures)
+
+
+def _pregenerate_thumbnails(filenames, verbose=False):
+    """generate all settings.SCREENCAPTURES_THUMBNAIL_GEOMETRIES of every
+    file so that the first page view doesn't have to."""
+    jobs = []
+    for filename in filenames:
+        for geometry, options in settings.SCREENCAPTURES_THUMBNAIL_GEOMETRIES:
+            jobs.append((filename, geometry, options))
+
+    def generate(job):
+        filename, geometry, options = job
+        return generate_thumbnail(filename, geometry, **options)
+
+    def generate_in_thread(job):
+        try:
+            return generate(job)
+        finally:
+            # the thumbnail key-value store uses the database
+            connection.close()
+
+    t0 = time.time()
+    processes = settings.SCREENCAPTURES_THUMBNAIL_PROCESSES
+    if processes > 1 and len(jobs) > 1:
+        pool = ThreadPool(processes)
+        try:
+            pool.map(generate_in_thread, jobs)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        for job in jobs:
+            generate(job)
+    t1 = time.time()
+    if verbose:  # pragma: no cover
+        print "Took", t1 - t0, "seconds to generate", len(jobs),
+        print "thumbnails"
+
+
+def _quarantine(event, job, reason):
+    """put the event away for a while so the job doesn't try it again
+    every single time"""
+    QuarantinedEvent.objects.filter(event=event, job=job).delete()
+    QuarantinedEvent.objects.create(
+        event=event,
+        job=job,
+        reason=unicode(reason),
+        expires=timezone.now() + datetime.timedelta(
+            seconds=settings.VIDEOINFO_QUARANTINE_SECONDS
+        ),
+    )
+
+
+def _process(
+    event,
     transform_function,
-    max_=10,
-    order_by='?',
     verbose=False,
     dry_run=False,
     save_locally=False,
     save_locally_some=False,
     **kwargs
 ):
+    """return True if the event was successfully processed"""
+    use_https = True
+    if save_locally_some:
+        # override save_locally based on the type of event
+        save_locally = event.privacy != Event.PRIVACY_PUBLIC
+        # then this is not necessary
+        use_https = save_locally
+
+    try:
+        t0 = time.time()
+        # so the downloaded video isn't evicted whilst ffmpeg reads it
+        with video_cache.using():
+            transform_function(
+                event,
+                save=not dry_run,
+                save_locally=save_locally,
+                use_https=use_https,
+                verbose=verbose,
+                **kwargs
+            )
+        t1 = time.time()
+        if verbose:  # pragma: no cover
+            print "Event %d processed in %.2f seconds" % (
+                event.id,
+                t1 - t0
+            )
+        return True
+    except AssertionError:
+        exc_type, exc_value, exc_traceback = sys.exc_info()
+        print ''.join(traceback.format_tb(exc_traceback))
+        print exc_type, exc_value
+        _quarantine(event, transform_function.func_name, exc_value)
+        return False
+
+
+def _process_in_child(writer, event_id, *args, **kwargs):
+    # Put ourselves, and any ffmpeg sub-processes, in a new process group
+    # so the whole group can be killed if we take too long.
+    os.setpgrp()
+    # What's printed is sent back to the parent process so it ends up
+    # in the same place (e.g. the CronLog) as when not using processes.
+    sys.stdout = StringIO()
+    success = False
+    try:
+        event = Event.objects.get(id=event_id)
+        success = _process(event, *args, **kwargs)
+    except Exception:
+        traceback.print_exc(file=sys.stdout)
+    finally:
+        writer.send((success, sys.stdout.getvalue()))
+        connection.close()
+
+
+def _process_in_processes(
+    events, transform_function, processes, timeout, **kwargs
+):
+    """process each event in its own process with max `processes` of them
+    at a time. Any process that takes more than `timeout` seconds is
+    killed and its event is quarantined.
+    Returns the number of successfully processed events."""
+    # Don't let the child processes share the parent's database connection
+    connection.close()
+    pending = list(events)
+    running = []
+    success = 0
+    while pending or running:
+        while pending and len(running) < processes:
+            event = pending.pop(0)
+            reader, writer = multiprocessing.Pipe(duplex=False)
+            process = multiprocessing.Process(
+                target=_process_in_child,
+                args=(writer, event.id, transform_function),
+                kwargs=kwargs,
+            )
+            process.start()
+            running.append((process, reader, event, time.time()))
+
+        time.sleep(0.1)
+        for each in running[:]:
+            process, reader, event, t0 = each
+            if reader.poll():
+                processed, output = reader.recv()
+                print output,
+                process.join()
+                running.remove(each)
+                if processed:
+                    success += 1
+            elif not process.is_alive():
+                # died without sending anything back
+                process.join()
+                running.remove(each)
+                print "Event %d crashed (exit code %s)" % (
+                    event.id,
+                    process.exitcode
+                )
+            elif timeout and time.time() - t0 > timeout:
+                try:
+                    os.killpg(process.pid, signal.SIGKILL)
+                except OSError:
+                    process.terminate()
+                process.join()
+                running.remove(each)
+                reason = 'Timed out after %d seconds' % timeout
+                print "Event %d: %s" % (event.id, reason)
+                _quarantine(event, transform_function.func_name, reason)
+
+    return success
 
+
+def _fetch(
+    qs,
+    transform_function,
+    max_=10,
+    order_by='id',
+    verbose=False,
+    processes=1,
+    timeout=None,
+    **kwargs
+):
+    """process up to `max_` events of the queryset with the
+    `transform_function`, oldest first.
+    If `processes` is more than 1, that many events are processed in
+    parallel, each in its own process that is killed if it takes longer
+    than `timeout` seconds."""
     total_count = qs.count()
     if verbose:  # pragma: no cover
         print total_count, "events to process"
         print
     count = success = skipped = 0
 
-    cache_key = 'videoinfo_quarantined' + transform_function.func_name
-    quarantined = cache.get(cache_key, {})
-    if quarantined:
-        skipped += len(quarantined)
-        if verbose:  # pragma: no cover
-            print "Deliberately skipping"
-            for e in Event.objects.filter(id__in=quarantined.keys()):
-                print "\t%r (%s)" % (e.title, quarantined[e.id])
-
-        qs = qs.exclude(id__in=quarantined.keys())
+    job = transform_function.func_name
+    quarantined = QuarantinedEvent.objects.filter(
+        job=job,
+        expires__gt=timezone.now()
+    )
+    qs = qs.exclude(id__in=quarantined.values('event_id'))
+    if verbose:  # pragma: no cover
+        for each in quarantined.select_related('event'):
+            if not skipped:
+                print "Deliberately skipping"
+            skipped += 1
+            print "\t%r (%s)" % (each.event.title, each.reason)
 
+    events = []
     for event in qs.order_by(order_by)[:max_ * 2]:
         if verbose:  # pragma: no cover
             print "-" * 80
@@ -370,39 +997,33 @@ def _fetch(
         ):
             if verbose:  # pragma: no cover
                 print "No Vid.ly Tag or Ogg URL!"
-            quarantined[event.id] = "No Vid.ly Tag or Ogg URL"
+            _quarantine(event, job, "No Vid.ly Tag or Ogg URL")
             skipped += 1
             continue
 
         count += 1
-        try:
-            use_https = True
-            if save_locally_some:
-                # override save_locally based on the type of event
-                save_locally = event.privacy != Event.PRIVACY_PUBLIC
-                # then this is not necessary
-                use_https = save_locally
+        events.append(event)
+        if count >= max_:
+            break
 
-            transform_function(
+    if processes > 1:
+        success = _process_in_processes(
+            events,
+            transform_function,
+            processes,
+            timeout,
+            verbose=verbose,
+            **kwargs
+        )
+    else:
+        for event in events:
+            if _process(
                 event,
-                save=not dry_run,
-                save_locally=save_locally,
-                use_https=use_https,
+                transform_function,
                 verbose=verbose,
                 **kwargs
-            )
-            success += 1
-
-        except AssertionError:
-            exc_type, exc_value, exc_traceback = sys.exc_info()
-            print ''.join(traceback.format_tb(exc_traceback))
-            print exc_type, exc_value
-            # put it away for a while
-            quarantined[event.id] = exc_value
-            cache.set(cache_key, quarantined, 60 * 60)
-
-        if count >= max_:
-            break
+            ):
+                success += 1
 
     if verbose:  # pragma: no cover
         print "Processed", count,
@@ -411,9 +1032,11 @@ def _fetch(
         print total_count - count, "left to go"
 
 
-def fetch_durations(**kwargs):
+def fetch_durations(probe=False, **kwargs):
     """this can be called by a cron job that will try to fetch
-    duration for as many events as it can."""
+    duration for as many events as it can.
+    If `probe` is true, ffprobe is used to also store all the other
+    metadata about the video."""
 
     template_name_q = (
         Q(template__name__icontains='Vid.ly') |
@@ -427,7 +1050,7 @@ def fetch_durations(**kwargs):
     )
     _fetch(
         qs,
-        fetch_duration,
+        probe and fetch_videoinfo or fetch_duration,
         **kwargs
     )
 
@@ -478,7 +1101,7 @@ def import_screencaptures(verbose=False):
         try:
             event = Event.objects.get(slug=slug, id=id)
             files = _get_files(sub_dir_path)
-            created = _import_files(event, files)
+            created = _import_files(event, files, verbose=verbose)
             if verbose:  # pragma: no cover
                 print "Created", created, "pictures for", event.slug,
                 print "(id=%d)" % (event.id,)
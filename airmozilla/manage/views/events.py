@@ -1,7 +1,9 @@
 import collections
 import datetime
 import hashlib
+import json
 import re
+import time
 import urlparse
 
 from django.conf import settings
@@ -12,6 +14,7 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.views.decorators.http import require_POST
 from django.utils import timezone
+from django.utils.timezone import utc
 from django.db import transaction
 from django.db.models import Q, Sum, Count
 from django.contrib.sites.models import RequestSite
@@ -22,8 +25,10 @@ import pytz
 from funfactory.urlresolvers import reverse
 import vobject
 from jsonview.decorators import json_view
+from jsonview.exceptions import BadRequest
 
-from airmozilla.main.helpers import thumbnail, short_desc
+from airmozilla.main.helpers import short_desc
+from airmozilla.main.thumbnails import generate_thumbnail
 from airmozilla.manage.helpers import scrub_transform_passwords
 from airmozilla.base import mozillians
 from airmozilla.base.utils import (
@@ -45,10 +50,11 @@ from airmozilla.main.models import (
     EventHitStats,
     CuratedGroup,
     EventAssignment,
+    EventTombstone,
     Picture
 )
 from airmozilla.subtitles.models import AmaraVideo
-from airmozilla.main.views import is_contributor
+from airmozilla.main.views import get_privacy_tier
 from airmozilla.manage import forms
 from airmozilla.manage.tweeter import send_tweet
 from airmozilla.manage import vidly
@@ -63,7 +69,14 @@ from .decorators import (
     superuser_required,
     cancel_redirect
 )
-from .utils import can_edit_event, get_var_templates, STOPWORDS
+from .utils import (
+    can_edit_event,
+    get_var_templates,
+    STOPWORDS,
+    wants_full_dump,
+    paginate_table,
+    columnar
+)
 
 
 @staff_required
@@ -189,13 +202,161 @@ def events(request):
     return render(request, 'manage/events.html', {})
 
 
+def _get_events_data_since(request):
+    """return the `since` watermark as a datetime or None if the client
+    doesn't have one or it's too old to have all the deletions since."""
+    try:
+        since = float(request.GET['since'])
+    except (KeyError, ValueError):
+        return None
+    since = datetime.datetime.utcfromtimestamp(since).replace(tzinfo=utc)
+    oldest = timezone.now() - datetime.timedelta(
+        days=settings.EVENT_TOMBSTONE_DAYS
+    )
+    if since < oldest:
+        return None
+    # overlap a bit in case something was saved with an older
+    # `modified` but committed after the client's last request
+    return since - datetime.timedelta(
+        seconds=settings.EVENTS_DATA_DELTA_OVERLAP
+    )
+
+
+def _get_changed_event_ids(since, live_time):
+    """return the IDs of all events whose row in events_data() might
+    have changed since then"""
+    margin = datetime.timedelta(minutes=settings.LIVE_MARGIN)
+    ids = set(
+        Event.objects.filter(modified__gt=since)
+        .values_list('id', flat=True)
+    )
+    # approving doesn't change the event
+    ids.update(
+        Approval.objects.filter(processed_time__gt=since)
+        .values_list('event_id', flat=True)
+    )
+    ids.update(
+        Picture.objects.filter(modified__gt=since, event__isnull=False)
+        .values_list('event_id', flat=True)
+    )
+    # those that have become live since
+    ids.update(
+        Event.objects.filter(
+            archive_time__isnull=True,
+            start_time__gt=since + margin,
+            start_time__lte=live_time,
+        )
+        .values_list('id', flat=True)
+    )
+    return ids
+
+
+EVENTS_DATA_FIELDS = (
+    'id',
+    'modified',
+    'status',
+    'status_display',
+    'privacy',
+    'privacy_display',
+    'title',
+    'slug',
+    'location',
+    'start_time',
+    'start_time_iso',
+    'channels',
+    'archive_time',
+    'can',
+    'is_pending',
+    'is_scheduled',
+    'is_live',
+    'is_upcoming',
+    'needs_approval',
+    'mozillian',
+    'pictures',
+    'picture',
+    'has_vidly_template',
+    'popcorn_url',
+)
+
+
+def _filter_events_by_title(qs, value):
+    """every word has to be in the title, or it's the start of the slug"""
+    words = Q()
+    for word in value.split():
+        words &= Q(title__icontains=word)
+    return qs.filter(words | Q(slug__istartswith=value.strip()))
+
+
+def _filter_events_by_channel(qs, value):
+    return qs.filter(channels__name__icontains=value).distinct()
+
+
+def _filter_events_by_start_time(qs, value):
+    try:
+        start_time = datetime.datetime.strptime(value, '%Y-%m-%d')
+    except ValueError:
+        raise BadRequest('Invalid start_time')
+    return qs.filter(start_time__gte=start_time.replace(tzinfo=utc))
+
+
+def _filter_events_by_archived(qs, value):
+    return qs.filter(archive_time__isnull=value != 'archived')
+
+
+def _filter_events_by_only(qs, value):
+    """the same as `is_live`, `is_upcoming`, `needs_approval` and
+    `mozillian` in the rows of events_data()"""
+    live_time = timezone.now() + datetime.timedelta(
+        minutes=settings.LIVE_MARGIN
+    )
+    if value == 'needs_approval':
+        return qs.filter(approval_state=Event.APPROVAL_STATE_PENDING)
+    elif value == 'mozillian':
+        return qs.exclude(mozillian__isnull=True).exclude(mozillian='')
+    elif value in ('live', 'upcoming'):
+        qs = (
+            qs.filter(status=Event.STATUS_SCHEDULED, archive_time__isnull=True)
+            .exclude(approval_state=Event.APPROVAL_STATE_PENDING)
+        )
+        if value == 'live':
+            return qs.filter(start_time__lt=live_time)
+        return qs.filter(start_time__gt=live_time)
+    raise BadRequest('Invalid only')
+
+
+EVENTS_DATA_FILTERS = {
+    'status': 'status',
+    'privacy': 'privacy',
+    'title': _filter_events_by_title,
+    'channel': _filter_events_by_channel,
+    'location': 'location__name__icontains',
+    'start_time': _filter_events_by_start_time,
+    'archived': _filter_events_by_archived,
+    'only': _filter_events_by_only,
+}
+
+EVENTS_DATA_SORT_KEYS = ('modified', 'start_time', 'title', 'id')
+
+
 @staff_required
 @permission_required('main.change_event')
 @json_view
 def events_data(request):
+    """return the events for the manage events page.
+
+    Normally that's one page of them (see `paginate_table()`) with the
+    rows as lists in the order of `fields`. With `?all=1` it's all of
+    them as dicts.
+    If the client sends `since` (the `watermark` of a previous response)
+    only the events that have changed since then are returned, together
+    with the IDs of the ones that have been deleted (or are no longer
+    for your eyes).
+    """
+    watermark = time.time()
+    since = _get_events_data_since(request)
     events = []
     qs = (
-        Event.objects.all()
+        Event.objects.summary('description', 'short_description')
         .order_by('-modified')
     )
     _can_change_event_others = (
@@ -205,54 +366,87 @@ def events_data(request):
     base_exclude = {}
     if not request.user.has_perm('main.change_event_others'):
         base_filter['creator'] = request.user
-    if is_contributor(request.user):
+    if get_privacy_tier(request).contributor:
         base_exclude['privacy'] = Event.PRIVACY_COMPANY
     qs = qs.filter(**base_filter)
     qs = qs.exclude(**base_exclude)
 
+    now = timezone.now()
+    live_time = now + datetime.timedelta(minutes=settings.LIVE_MARGIN)
+
+    full_dump = wants_full_dump(request)
+    next_cursor = count = None
+    if since:
+        changed_ids = _get_changed_event_ids(since, live_time)
+        qs = qs.filter(id__in=changed_ids)
+    elif full_dump:
+        if request.GET.get('limit'):
+            try:
+                limit = int(request.GET['limit'])
+                assert limit > 0
+                qs = qs[:limit]
+            except (ValueError, AssertionError):
+                pass
+    else:
+        qs, next_cursor, count = paginate_table(
+            request,
+            qs,
+            filters=EVENTS_DATA_FILTERS,
+            sort_keys=EVENTS_DATA_SORT_KEYS,
+            default_sort='-modified',
+        )
+
+    channels_through = Event.channels.through.objects.all()
+    grouped_pictures = Picture.objects.all()
+    channels = Channel.objects.all()
+    locations = Location.objects.all()
+    templates = Template.objects.all()
+    if not full_dump:
+        # only bother about the events we're going to send
+        qs = list(qs)
+        event_ids = [x.id for x in qs]
+        channels_through = list(
+            channels_through.filter(event_id__in=event_ids).values()
+        )
+        grouped_pictures = grouped_pictures.filter(event_id__in=event_ids)
+        channels = channels.filter(
+            id__in=set(x['channel_id'] for x in channels_through)
+        )
+        locations = locations.filter(
+            id__in=set(x.location_id for x in qs if x.location_id)
+        )
+        templates = templates.filter(
+            id__in=set(x.template_id for x in qs if x.template_id)
+        )
+    else:
+        channels_through = channels_through.values()
+
     event_channel_names = collections.defaultdict(list)
     _channel_names = dict(
         (x['id'], x['name'])
-        for x in Channel.objects.all().values('id', 'name')
+        for x in channels.values('id', 'name')
     )
-    for each in Event.channels.through.objects.all().values():
+    for each in channels_through:
         event_channel_names[each['event_id']].append(
             _channel_names[each['channel_id']]
         )
 
-    now = timezone.now()
-    live_time = now + datetime.timedelta(minutes=settings.LIVE_MARGIN)
-
-    all_needs_approval = (
-        Approval.objects
-        .filter(processed=False)
-        .values_list('event_id', flat=True)
-    )
-
     pictures_counts = {}
     grouped_pictures = (
-        Picture.objects
-        .filter(event__in=qs)
+        grouped_pictures
+        .filter(event__isnull=False)
         .values('event')
         .annotate(Count('event'))
     )
     for each in grouped_pictures:
         pictures_counts[each['event']] = each['event__count']
 
-    if request.GET.get('limit'):
-        try:
-            limit = int(request.GET['limit'])
-            assert limit > 0
-            qs = qs[:limit]
-        except (ValueError, AssertionError):
-            pass
-
     locations = dict(
-        (x.pk, x) for x in Location.objects.all()
+        (x.pk, x) for x in locations
     )
     template_names = dict(
         (x['id'], x['name'])
-        for x in Template.objects.all().values('id', 'name')
+        for x in templates.values('id', 'name')
     )
     for event in qs:
         event.location = locations.get(event.location_id)
@@ -263,7 +457,9 @@ def events_data(request):
             start_time = event.start_time.strftime('%d %b %Y %I:%M%p %Z')
             start_time_iso = event.start_time.isoformat()
 
-        needs_approval = event.pk in all_needs_approval
+        needs_approval = (
+            event.approval_state == Event.APPROVAL_STATE_PENDING
+        )
         is_live = False
         is_upcoming = False
         if event.status == Event.STATUS_SCHEDULED and not needs_approval:
@@ -347,7 +543,38 @@ def events_data(request):
         'manage:picturegallery': reverse('manage:picturegallery'),
     }
 
-    return {'events': events, 'urls': urls}
+    data = {'urls': urls}
+    if full_dump:
+        data['events'] = events
+    else:
+        data['events'] = columnar(events, EVENTS_DATA_FIELDS)
+    if since:
+        deleted = changed_ids - set(x['id'] for x in events)
+        deleted.update(
+            EventTombstone.objects.filter(deleted__gt=since)
+            .values_list('event_id', flat=True)
+        )
+        data['deleted'] = sorted(deleted)
+        data['since'] = request.GET['since']
+        data['watermark'] = watermark
+        return data
+    if not full_dump:
+        data['next'] = next_cursor
+        data['count'] = count
+
+    # the watermark is left out of the ETag
+    content = json.dumps(data)
+    etag = '"%s"' % hashlib.md5(content).hexdigest()
+    if request.META.get('HTTP_IF_NONE_MATCH') == etag:
+        response = http.HttpResponseNotModified()
+    else:
+        data['watermark'] = watermark
+        response = http.HttpResponse(
+            json.dumps(data),
+            content_type='application/json'
+        )
+    response['ETag'] = etag
+    return response
 
 
 def _event_process(request, form, event):
@@ -548,9 +775,9 @@ def redirect_event_thumbnail(request, id):
     geometry = request.GET.get('geometry', '40x40')
     crop = request.GET.get('crop', 'center')
     if event.picture:
-        thumb = thumbnail(event.picture.file, geometry, crop=crop)
+        thumb = generate_thumbnail(event.picture.file, geometry, crop=crop)
     else:
-        thumb = thumbnail(event.placeholder_img, geometry, crop=crop)
+        thumb = generate_thumbnail(event.placeholder_img, geometry, crop=crop)
 
     return redirect(thumb.url)
 
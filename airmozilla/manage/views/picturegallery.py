@@ -6,18 +6,25 @@ from django.views.decorators.http import require_POST
 from django.db import transaction
 from django.views.decorators.cache import cache_page
 from django.db.models import Q
+from django.utils.dateparse import parse_datetime
 
 from funfactory.urlresolvers import reverse
 from jsonview.decorators import json_view
+from jsonview.exceptions import BadRequest
 
 from airmozilla.manage.utils import filename_to_notes
 from airmozilla.base.utils import dot_dict
-from airmozilla.main.helpers import thumbnail
+from airmozilla.main.thumbnails import generate_thumbnail
 from airmozilla.main.models import Event, Picture
 from airmozilla.manage import forms
 
 from .decorators import staff_required, permission_required
-from .utils import can_edit_event
+from .utils import (
+    can_edit_event,
+    wants_full_dump,
+    paginate_table,
+    columnar
+)
 
 
 @staff_required
@@ -38,6 +45,64 @@ def picturegallery(request):
     return render(request, 'manage/picturegallery.html', context)
 
 
+PICTUREGALLERY_DATA_FIELDS = (
+    'id',
+    'width',
+    'height',
+    'size',
+    'created',
+    'events',
+    'event',
+    'cant_delete',
+    'notes',
+)
+
+
+def _parse_created(value):
+    try:
+        created = parse_datetime(value)
+    except ValueError:
+        created = None
+    if created is None:
+        raise BadRequest('Invalid date %r' % value)
+    return created
+
+
+def _filter_pictures_by_own(qs, value):
+    """the pictures of the event (`?event=`) or those of no event"""
+    return qs.filter(event__isnull=value != 'yes')
+
+
+def _filter_pictures_by_created_after(qs, value):
+    return qs.filter(created__gte=_parse_created(value))
+
+
+def _filter_pictures_by_created_before(qs, value):
+    return qs.filter(created__lt=_parse_created(value))
+
+
+PICTUREGALLERY_DATA_FILTERS = {
+    'notes': 'notes__icontains',
+    'own': _filter_pictures_by_own,
+    'created_after': _filter_pictures_by_created_after,
+    'created_before': _filter_pictures_by_created_before,
+}
+
+PICTUREGALLERY_DATA_SORT_KEYS = ('created', 'modified', 'size', 'id')
+
+_PICTURE_VALUES = (
+    'id',
+    'size',
+    'width',
+    'height',
+    'notes',
+    'created',
+    'modified',
+    'modified_user',
+    'event_id'
+)
+
+
 @staff_required
 @json_view
 def picturegallery_data(request):
@@ -47,9 +112,20 @@ def picturegallery_data(request):
     else:
         event = None
 
-    items = _get_all_pictures(event=event)
-
-    context['pictures'] = items
+    if wants_full_dump(request):
+        context['pictures'] = _get_all_pictures(event=event)
+    else:
+        pictures, context['next'], context['count'] = paginate_table(
+            request,
+            _get_pictures_qs(event=event).values(*_PICTURE_VALUES),
+            filters=PICTUREGALLERY_DATA_FILTERS,
+            sort_keys=PICTUREGALLERY_DATA_SORT_KEYS,
+            default_sort='-created',
+        )
+        context['pictures'] = columnar(
+            _get_pictures(pictures, [x['id'] for x in pictures]),
+            PICTUREGALLERY_DATA_FIELDS
+        )
     context['urls'] = {
         'manage:picture_edit': reverse('manage:picture_edit', args=('0',)),
         'manage:picture_delete': reverse('manage:picture_delete', args=('0',)),
@@ -72,8 +148,26 @@ def picturegallery_data(request):
     return context
 
 
+def _get_pictures_qs(event=None):
+    qs = Picture.objects.all()
+    if event:
+        qs = qs.filter(
+            Q(event__isnull=True) |
+            Q(event=event)
+        )
+    else:
+        qs = qs.filter(event__isnull=True)
+    return qs
+
+
 def _get_all_pictures(event=None):
+    qs = _get_pictures_qs(event=event).order_by('event', '-created')
+    return _get_pictures(qs.values(*_PICTURE_VALUES))
 
+
+def _get_pictures(picture_dicts, picture_ids=None):
+    """return a dict for each picture. If `picture_ids` is passed, only
+    look up the events of those pictures."""
     values = (
         'id',
         'title',
@@ -82,7 +176,10 @@ def _get_all_pictures(event=None):
     )
     event_map = collections.defaultdict(list)
     cant_delete = collections.defaultdict(bool)
-    for each in Event.objects.filter(picture__isnull=False).values(*values):
+    events = Event.objects.filter(picture__isnull=False)
+    if picture_ids is not None:
+        events = events.filter(picture_id__in=picture_ids)
+    for each in events.values(*values):
         event_map[each['picture_id']].append({
             'id': each['id'],
             'title': each['title']
@@ -92,26 +189,7 @@ def _get_all_pictures(event=None):
             cant_delete[each['picture_id']] = True
 
     pictures = []
-    values = (
-        'id',
-        'size',
-        'width',
-        'height',
-        'notes',
-        'created',
-        'modified',
-        'modified_user',
-        'event_id'
-    )
-    qs = Picture.objects.all()
-    if event:
-        qs = qs.filter(
-            Q(event__isnull=True) |
-            Q(event=event)
-        )
-    else:
-        qs = qs.filter(event__isnull=True)
-    for picture_dict in qs.order_by('event', '-created').values(*values):
+    for picture_dict in picture_dicts:
         picture = dot_dict(picture_dict)
         item = {
             'id': picture.id,
@@ -229,7 +307,7 @@ def redirect_picture_thumbnail(request, id):
     picture = get_object_or_404(Picture, id=id)
     geometry = request.GET.get('geometry', '100x100')
     crop = request.GET.get('crop', 'center')
-    thumb = thumbnail(picture.file, geometry, crop=crop)
+    thumb = generate_thumbnail(picture.file, geometry, crop=crop)
     return redirect(thumb.url)
 
 
@@ -3,19 +3,22 @@ import collections
 from django.contrib import messages
 from django.shortcuts import render, redirect, get_object_or_404
 from django.db import transaction
-from django.db.models import Count
+from django.db.models import Count, Q
 
 from funfactory.urlresolvers import reverse
 from jsonview.decorators import json_view
+from jsonview.exceptions import BadRequest
 
 from airmozilla.main.models import Event, Tag
 from airmozilla.manage import forms
+from airmozilla.manage import tagging
 
 from .decorators import (
     staff_required,
     permission_required,
     cancel_redirect
 )
+from .utils import wants_full_dump, paginate_table, columnar
 
 
 @staff_required
@@ -24,6 +27,42 @@ def tags(request):
     return render(request, 'manage/tags.html')
 
 
+TAGS_DATA_FIELDS = (
+    'id',
+    'name',
+    '_usage_count',
+    '_repeated',
+)
+
+
+_REPEATED_TAGS_SQL = (
+    'lower(main_tag.name) IN ('
+    'SELECT lower(name) FROM main_tag GROUP BY lower(name) '
+    'HAVING COUNT(*) > 1)'
+)
+
+
+def _filter_tags_by_minimum(qs, value):
+    try:
+        minimum = int(value)
+    except ValueError:
+        raise BadRequest('Invalid minimum')
+    return qs.filter(usage_count__gte=minimum)
+
+
+def _filter_tags_by_repeated(qs, value):
+    return qs.extra(where=[_REPEATED_TAGS_SQL])
+
+
+TAGS_DATA_FILTERS = {
+    'name': 'name__icontains',
+    'minimum': _filter_tags_by_minimum,
+    'repeated': _filter_tags_by_repeated,
+}
+
+TAGS_DATA_SORT_KEYS = ('name', 'usage_count', 'id')
+
+
 @staff_required
 @permission_required('main.change_event')
 @json_view
@@ -31,26 +70,50 @@ def tags_data(request):
     context = {}
     tags = []
 
-    counts = {}
-    qs = (
-        Event.tags.through.objects.all()
-        .values('tag_id').annotate(Count('tag'))
-    )
-    for each in qs:
-        counts[each['tag_id']] = each['tag__count']
+    full_dump = wants_full_dump(request)
+    if full_dump:
+        page = list(Tag.objects.all())
+
+        counts = {}
+        qs = Event.tags.through.objects.all()
+        qs = qs.values('tag_id').annotate(Count('tag'))
+        for each in qs:
+            counts[each['tag_id']] = each['tag__count']
+        for tag in page:
+            tag.usage_count = counts.get(tag.id, 0)
+
+        repeated_names = Tag.objects.all()
+    else:
+        page, context['next'], context['count'] = paginate_table(
+            request,
+            Tag.objects.all().annotate(usage_count=Count('event')),
+            filters=TAGS_DATA_FILTERS,
+            sort_keys=TAGS_DATA_SORT_KEYS,
+            default_sort='name',
+        )
+        # only the tags on this page need to know if they're repeated
+        same_names = Q()
+        for tag in page:
+            same_names |= Q(name__iexact=tag.name)
+        repeated_names = Tag.objects.none()
+        if page:
+            repeated_names = Tag.objects.filter(same_names)
 
     _repeats = collections.defaultdict(int)
-    for tag in Tag.objects.all():
-        _repeats[tag.name.lower()] += 1
+    for name in repeated_names.values_list('name', flat=True):
+        _repeats[name.lower()] += 1
 
-    for tag in Tag.objects.all():
+    for tag in page:
         tags.append({
             'name': tag.name,
             'id': tag.id,
-            '_usage_count': counts.get(tag.id, 0),
+            '_usage_count': tag.usage_count,
             '_repeated': _repeats[tag.name.lower()] > 1,
         })
-    context['tags'] = tags
+    if full_dump:
+        context['tags'] = tags
+    else:
+        context['tags'] = columnar(tags, TAGS_DATA_FIELDS)
     context['urls'] = {
         'manage:tag_edit': reverse('manage:tag_edit', args=(0,)),
         'manage:tag_remove': reverse('manage:tag_remove', args=(0,)),
@@ -102,10 +165,8 @@ def tag_edit(request, id):
 def tag_remove(request, id):
     if request.method == 'POST':
         tag = get_object_or_404(Tag, id=id)
-        for event in Event.objects.filter(tags=tag):
-            event.tags.remove(tag)
+        tagging.delete_tags([tag.id])
         messages.info(request, 'Tag "%s" removed.' % tag.name)
-        tag.delete()
     return redirect(reverse('manage:tags'))
 
 
@@ -123,14 +184,12 @@ def tag_merge(request, id):
             tag_to_keep = t
             break
 
-    merge_count = 0
+    merges = {}
     for t in Tag.objects.filter(name__iexact=tag.name):
         if t.name != name_to_keep:
-            for event in Event.objects.filter(tags=t):
-                event.tags.remove(t)
-                event.tags.add(tag_to_keep)
-            t.delete()
-            merge_count += 1
+            merges[t.id] = tag_to_keep.id
+    tagging.merge_tags(merges)
+    merge_count = len(merges)
 
     messages.info(
         request,
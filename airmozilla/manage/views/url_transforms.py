@@ -20,7 +20,13 @@ def url_transforms(request):
     data = {}
 
     matchers = []
-    for matcher in URLMatch.objects.order_by('-modified'):
+    qs = URLMatch.objects.order_by('-modified')
+    # the uses that the cron job hasn't written down yet
+    unflushed = url_transformer.get_unflushed_use_counts(
+        [x.id for x in qs]
+    )
+    for matcher in qs:
+        matcher.use_count += unflushed.get(matcher.id, 0)
         matchers.append((
             matcher,
             URLTransform.objects.filter(match=matcher).order_by('order')
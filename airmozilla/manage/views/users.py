@@ -20,6 +20,7 @@ from .decorators import (
     permission_required,
     cancel_redirect
 )
+from .utils import wants_full_dump, paginate_table, columnar
 
 
 @staff_required
@@ -47,19 +48,83 @@ def users(request):
     return render(request, 'manage/users.html', context)
 
 
+USERS_DATA_FIELDS = (
+    'id',
+    'email',
+    'last_login',
+    'is_staff',
+    'is_superuser',
+    'is_contributor',
+    'is_inactive',
+    'groups',
+)
+
+_USER_VALUES = (
+    'email',
+    'id',
+    'last_login',
+    'is_staff',
+    'is_active',
+    'is_superuser'
+)
+
+
+def _filter_users_by_staff(qs, value):
+    return qs.filter(is_staff=value == 'staff')
+
+
+def _filter_users_by_group(qs, value):
+    if value == '*':
+        return qs.filter(groups__isnull=False).distinct()
+    return qs.filter(groups__name__icontains=value).distinct()
+
+
+def _filter_users_by_status(qs, value):
+    if value == 'contributor':
+        return qs.filter(userprofile__contributor=True)
+    elif value == 'superuser':
+        return qs.filter(is_superuser=True)
+    elif value == 'inactive':
+        return qs.filter(is_active=False)
+    return qs
+
+
+USERS_DATA_FILTERS = {
+    'email': 'email__icontains',
+    'staff': _filter_users_by_staff,
+    'group': _filter_users_by_group,
+    'status': _filter_users_by_status,
+}
+
+USERS_DATA_SORT_KEYS = ('last_login', 'email', 'id')
+
+
 @staff_required
 @permission_required('auth.change_user')
 @json_view
 def users_data(request):
     context = {}
-    users = cache.get('_get_all_users')
+    if wants_full_dump(request):
+        users = cache.get('_get_all_users')
 
-    if users is None:
-        users = _get_all_users()
-        # this is invalidated in models.py
-        cache.set('_get_all_users', users, 60 * 60)
+        if users is None:
+            users = _get_all_users()
+            # this is invalidated in models.py
+            cache.set('_get_all_users', users, 60 * 60)
 
-    context['users'] = users
+        context['users'] = users
+    else:
+        users, context['next'], context['count'] = paginate_table(
+            request,
+            User.objects.all().values(*_USER_VALUES),
+            filters=USERS_DATA_FILTERS,
+            sort_keys=USERS_DATA_SORT_KEYS,
+            default_sort='-last_login',
+        )
+        context['users'] = columnar(
+            _get_users(users, [x['id'] for x in users]),
+            USERS_DATA_FIELDS
+        )
     context['urls'] = {
         'manage:user_edit': reverse('manage:user_edit', args=('0',))
     }
@@ -68,31 +133,40 @@ def users_data(request):
 
 
 def _get_all_users():
-    groups = {}
-    for group in Group.objects.all().values('id', 'name'):
-        groups[group['id']] = group['name']
+    return _get_users(User.objects.all().values(*_USER_VALUES))
 
-    groups_map = collections.defaultdict(list)
-    for x in User.groups.through.objects.all().values('user_id', 'group_id'):
-        groups_map[x['user_id']].append(groups[x['group_id']])
 
-    users = []
-    qs = User.objects.all()
-    values = (
-        'email',
-        'id',
-        'last_login',
-        'is_staff',
-        'is_active',
-        'is_superuser'
-    )
+def _get_users(user_dicts, user_ids=None):
+    """return a dict for each user. If `user_ids` is passed, only look up
+    the groups and profiles of those users."""
+    groups_through = User.groups.through.objects.all()
+    group_names = Group.objects.all()
     # make a big fat list of the user IDs of people who are contributors
     contributor_ids = (
         UserProfile.objects
         .filter(contributor=True)
         .values_list('user_id', flat=True)
     )
-    for user_dict in qs.values(*values):
+    if user_ids is not None:
+        groups_through = groups_through.filter(user_id__in=user_ids)
+        contributor_ids = contributor_ids.filter(user_id__in=user_ids)
+    groups_through = list(groups_through.values('user_id', 'group_id'))
+    if user_ids is not None:
+        group_names = group_names.filter(
+            id__in=set(x['group_id'] for x in groups_through)
+        )
+
+    groups = {}
+    for group in group_names.values('id', 'name'):
+        groups[group['id']] = group['name']
+
+    groups_map = collections.defaultdict(list)
+    for x in groups_through:
+        groups_map[x['user_id']].append(groups[x['group_id']])
+    contributor_ids = set(contributor_ids)
+
+    users = []
+    for user_dict in user_dicts:
         user = dot_dict(user_dict)
         item = {
             'id': user.id,
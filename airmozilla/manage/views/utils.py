@@ -1,10 +1,18 @@
+import base64
+import datetime
+import json
+
+from django.core.exceptions import ValidationError
 from django.shortcuts import redirect
+from django.db.models import Q
+from django.db.models.fields import FieldDoesNotExist
 
 from jinja2 import Environment, meta
+from jsonview.exceptions import BadRequest
 
 from airmozilla.base import mozillians
 from airmozilla.main.models import Event, CuratedGroup
-from airmozilla.main.views import is_contributor
+from airmozilla.main.views import PrivacyTier
 
 
 STOPWORDS = (
@@ -25,11 +33,12 @@ def can_edit_event(event, user, default='manage:events'):
     if (not user.has_perm('main.change_event_others') and
             user != event.creator):
         return redirect(default)
-    if event.privacy == Event.PRIVACY_COMPANY and is_contributor(user):
+    contributor = PrivacyTier(user).contributor
+    if event.privacy == Event.PRIVACY_COMPANY and contributor:
         return redirect(default)
     elif (
         CuratedGroup.objects.filter(event=event)
-        and is_contributor(user)
+        and contributor
     ):
         # Editing this event requires that you're also part of that curated
         # group.
@@ -37,7 +46,7 @@ def can_edit_event(event, user, default='manage:events'):
             x[0] for x in
             CuratedGroup.objects.filter(event=event).values_list('name')
         ]
-        if not mozillians.in_groups(
+        if not mozillians.in_groups_cached(
             user.email,
             curated_group_names
         ):
@@ -52,3 +61,112 @@ def get_var_templates(template):
     undeclared_variables = [x for x in meta.find_undeclared_variables(ast)
                             if x not in exceptions]
     return ["%s=" % v for v in undeclared_variables]
+
+
+def wants_full_dump(request):
+    """return true if the client asked for everything, the old way,
+    instead of one page at a time"""
+    return bool(request.GET.get('all'))
+
+
+def _encode_cursor(value, pk):
+    if isinstance(value, datetime.datetime):
+        value = value.isoformat()
+    return base64.urlsafe_b64encode(json.dumps([value, pk]))
+
+
+def _decode_cursor(cursor, field):
+    try:
+        value, pk = json.loads(base64.urlsafe_b64decode(str(cursor)))
+        if field is not None:
+            value = field.to_python(value)
+        return value, int(pk)
+    except (TypeError, ValueError, ValidationError):
+        raise BadRequest('Invalid cursor')
+
+
+def paginate_table(request, qs, filters=None, sort_keys=None,
+                   default_sort='-id', page_size=100, max_page_size=1000):
+    """return one page of `qs`, filtered and sorted as asked for in the
+    request, the cursor for the next page (or None if this was the
+    last one) and how many rows there are with those filters. The count
+    is only worked out for the first page and is None for the others.
+
+    `filters` maps the query string parameters that may be used to the
+    ORM lookup they become (e.g. `{'title': 'title__icontains'}`) or to a
+    function that takes the queryset and the value and returns a new
+    queryset. Anything else in the query string is ignored.
+
+    `sort_keys` are the names of the fields (or annotations) you may sort
+    by with `?sort=name` or `?sort=-name`. They must not be nullable. The
+    primary key is used as the tie-breaker so the cursor (`?after=`)
+    always points to exactly one row.
+    """
+    filters = filters or {}
+    sort_keys = sort_keys or ('id',)
+    for key, lookup in filters.items():
+        value = request.GET.get(key)
+        if not value:
+            continue
+        if callable(lookup):
+            qs = lookup(qs, value)
+        else:
+            qs = qs.filter(**{lookup: value})
+
+    sort = request.GET.get('sort') or default_sort
+    descending = sort.startswith('-')
+    sort_key = sort.lstrip('-')
+    if sort_key not in sort_keys:
+        raise BadRequest('Invalid sort key %r' % sort_key)
+    pk_name = qs.model._meta.pk.attname
+    if descending:
+        qs = qs.order_by('-' + sort_key, '-' + pk_name)
+    else:
+        qs = qs.order_by(sort_key, pk_name)
+
+    count = None
+    if request.GET.get('after'):
+        try:
+            field = qs.model._meta.get_field(sort_key)
+        except FieldDoesNotExist:
+            # an annotation
+            field = None
+        value, pk = _decode_cursor(request.GET['after'], field)
+        op = descending and 'lt' or 'gt'
+        qs = qs.filter(
+            Q(**{'%s__%s' % (sort_key, op): value}) |
+            Q(**{sort_key: value, '%s__%s' % (pk_name, op): pk})
+        )
+    else:
+        count = qs.count()
+
+    try:
+        size = int(request.GET.get('page_size', page_size))
+        if size < 1:
+            raise ValueError(size)
+    except ValueError:
+        raise BadRequest('Invalid page_size')
+    size = min(size, max_page_size)
+
+    items = list(qs[:size + 1])
+    cursor = None
+    if len(items) > size:
+        items = items[:size]
+        last = items[-1]
+        if isinstance(last, dict):
+            cursor = _encode_cursor(last[sort_key], last[pk_name])
+        else:
+            cursor = _encode_cursor(
+                getattr(last, sort_key), getattr(last, pk_name)
+            )
+    return items, cursor, count
+
+
+def columnar(rows, fields):
+    """return a list of dicts as the names of the fields once and each
+    row as a list of values, in that order. Keys a row doesn't have
+    become None."""
+    return {
+        'fields': fields,
+        'rows': [[row.get(x) for x in fields] for row in rows],
+    }
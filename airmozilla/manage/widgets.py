@@ -6,7 +6,7 @@ from django.utils.safestring import mark_safe
 from funfactory.urlresolvers import reverse
 
 from airmozilla.main.models import Picture
-from airmozilla.main.helpers import thumbnail
+from airmozilla.main.thumbnails import generate_thumbnail
 
 
 class PictureWidget(widgets.Select):
@@ -19,7 +19,7 @@ class PictureWidget(widgets.Select):
     def render(self, name, value, attrs=None, **__):
         if value:
             picture = Picture.objects.get(id=value)
-            thumb = thumbnail(picture.file, '96x54', crop='center')
+            thumb = generate_thumbnail(picture.file, '96x54', crop='center')
             img = (
                 '<img src="%s" width="%d" height="%d" alt="%s">' % (
                     thumb.url,
@@ -7,7 +7,13 @@ from django.core.files import File
 from funfactory.urlresolvers import reverse
 from nose.tools import eq_, ok_
 
-from airmozilla.main.models import Event, Channel, Template, Picture
+from airmozilla.main.models import (
+    Event,
+    Channel,
+    Template,
+    Picture,
+    VideoInfo,
+)
 from airmozilla.base.tests.testbase import DjangoTestCase
 
 
@@ -77,6 +83,33 @@ class TestRoku(DjangoTestCase):
         eq_(response.status_code, 200)
         ok_(event.title in response.content)
 
+    def test_channel_feed_with_video_info(self):
+        main_channel = Channel.objects.get(slug=settings.DEFAULT_CHANNEL_SLUG)
+        main_url = reverse('roku:channel_feed', args=(main_channel.slug,))
+        event = Event.objects.get(title='Test event')
+        self._attach_file(event, self.main_image)
+        vidly = Template.objects.create(
+            name="Vid.ly Test",
+            content="test"
+        )
+        event.template = vidly
+        event.template_environment = {'tag': 'xyz123'}
+        event.save()
+        response = self.client.get(main_url)
+        eq_(response.status_code, 200)
+        ok_('<streamBitrate>' not in response.content)
+
+        VideoInfo.objects.create(
+            event=event,
+            bitrate=1076000,
+            width=1280,
+            height=720,
+        )
+        response = self.client.get(main_url)
+        eq_(response.status_code, 200)
+        ok_('<streamBitrate>1076</streamBitrate>' in response.content)
+        ok_('<streamQuality>HD</streamQuality>' in response.content)
+
     def test_channel_feed_with_no_placeholder(self):
         main_channel = Channel.objects.get(slug=settings.DEFAULT_CHANNEL_SLUG)
         main_url = reverse('roku:channel_feed', args=(main_channel.slug,))
@@ -5,8 +5,8 @@ from django.db.models import Q
 
 from funfactory.urlresolvers import reverse
 
-from airmozilla.main.models import Channel, Event
-from airmozilla.main.views import is_contributor
+from airmozilla.main.models import Channel, Event, VideoInfo
+from airmozilla.main.views import get_privacy_tier
 from airmozilla.base.utils import (
     paginate
 )
@@ -15,25 +15,11 @@ from airmozilla.base.utils import (
 def categories_feed(request):
     context = {}
 
-    privacy_filter = {}
-    privacy_exclude = {}
-    if request.user.is_active:
-        if is_contributor(request.user):
-            # feed_privacy = 'contributors'
-            privacy_exclude = {'privacy': Event.PRIVACY_COMPANY}
-        # else:
-            # feed_privacy = 'company'
-    else:
-        privacy_filter = {'privacy': Event.PRIVACY_PUBLIC}
-        # feed_privacy = 'public'
-    events = Event.objects.filter(status=Event.STATUS_SCHEDULED)
-    live_events = Event.objects.live()
-    if privacy_filter:
-        events = events.filter(**privacy_filter)
-        live_events = live_events.filter(**privacy_filter)
-    elif privacy_exclude:
-        events = events.exclude(**privacy_exclude)
-        live_events = live_events.exclude(**privacy_exclude)
+    privacy_tier = get_privacy_tier(request)
+    events = privacy_tier.filter(
+        Event.objects.filter(status=Event.STATUS_SCHEDULED)
+    )
+    live_events = privacy_tier.filter(Event.objects.live().summary())
 
     channels = get_channels(events)
     context['channels'] = channels
@@ -76,16 +62,33 @@ def get_channels(events, parent=None):
     return channels
 
 
-def get_media_info(event):
+def get_video_infos(events):
+    """return a dict of event ID -> VideoInfo for all these events"""
+    return dict(
+        (x.event_id, x)
+        for x in VideoInfo.objects.filter(event__in=events)
+    )
+
+
+def get_media_info(event, video_info=None):
     if event.template and 'vid.ly' in event.template.name.lower():
         tag = event.template_environment['tag']
-        return {
+        media_info = {
             # 'url': 'http://vid.ly/%s?content=video&format=webm' % tag,
             # 'format': 'webm'
             # NOTE that it's deliberately set to the HTTP URL. Not HTTPS
             'url': 'http://vid.ly/%s?content=video&format=mp4' % tag,
             'format': 'mp4'
         }
+        if video_info and not video_info.hd:
+            # it's metadata about the exact same file
+            if video_info.bitrate:
+                media_info['bitrate'] = video_info.bitrate / 1000  # kbps
+            if video_info.height:
+                media_info['quality'] = (
+                    video_info.height >= 720 and 'HD' or 'SD'
+                )
+        return media_info
     elif event.template and 'edgecast hls' in event.template.name.lower():
         try:
             file = event.template_environment['file']
@@ -106,7 +109,11 @@ def event_feed(request, id):
     events = Event.objects.filter(id=id)
     context['events'] = events
 
-    context['get_media_info'] = get_media_info
+    video_infos = get_video_infos(events)
+    context['get_media_info'] = lambda event: get_media_info(
+        event,
+        video_infos.get(event.id)
+    )
 
     response = render(request, 'roku/channel.xml', context)
     response['Content-Type'] = 'text/xml'
@@ -122,19 +129,9 @@ def channel_feed(request, slug):
         Q(parent__slug=slug)
     )
 
-    privacy_filter = {}
-    privacy_exclude = {}
-    if request.user.is_active:
-        if is_contributor(request.user):
-            privacy_exclude = {'privacy': Event.PRIVACY_COMPANY}
-    else:
-        privacy_filter = {'privacy': Event.PRIVACY_PUBLIC}
-
-    archived_events = Event.objects.archived()
-    if privacy_filter:
-        archived_events = archived_events.filter(**privacy_filter)
-    elif privacy_exclude:
-        archived_events = archived_events.exclude(**privacy_exclude)
+    archived_events = get_privacy_tier(request).filter(
+        Event.objects.archived().summary()
+    )
     archived_events = archived_events.order_by('-start_time')
     archived_events = archived_events.filter(channels__in=channels)
     page = 1
@@ -142,7 +139,11 @@ def channel_feed(request, slug):
 
     context['events'] = archived_paged
 
-    context['get_media_info'] = get_media_info
+    video_infos = get_video_infos(list(archived_paged))
+    context['get_media_info'] = lambda event: get_media_info(
+        event,
+        video_infos.get(event.id)
+    )
 
     response = render(request, 'roku/channel.xml', context)
     response['Content-Type'] = 'text/xml'
@@ -11,7 +11,7 @@ from django.conf import settings
 from funfactory.urlresolvers import reverse
 
 from airmozilla.main.models import Event, Tag, Channel
-from airmozilla.main.views import is_contributor
+from airmozilla.main.views import get_privacy_tier
 from airmozilla.base.utils import paginator
 from airmozilla.main.utils import get_event_channels
 
@@ -39,13 +39,7 @@ def home(request):
 
     if request.GET.get('q') and form.is_valid():
         context['q'] = form.cleaned_data['q']
-        privacy_filter = {}
-        privacy_exclude = {}
-        if request.user.is_active:
-            if is_contributor(request.user):
-                privacy_exclude = {'privacy': Event.PRIVACY_COMPANY}
-        else:
-            privacy_filter = {'privacy': Event.PRIVACY_PUBLIC}
+        privacy_tier = get_privacy_tier(request)
 
         extra = {}
         rest, params = split_search(context['q'], ('tag', 'channel'))
@@ -132,16 +126,14 @@ def home(request):
 
         events = _search(
             context['q'],
-            privacy_filter=privacy_filter,
-            privacy_exclude=privacy_exclude,
+            privacy_tier=privacy_tier,
             sort=request.GET.get('sort'),
             **extra
         )
         if not events.count() and utils.possible_to_or_query(context['q']):
             events = _search(
                 context['q'],
-                privacy_filter=privacy_filter,
-                privacy_exclude=privacy_exclude,
+                privacy_tier=privacy_tier,
                 sort=request.GET.get('sort'),
                 fuzzy=True
             )
@@ -218,7 +210,7 @@ def home(request):
 
 def _search(q, **options):
     # we only want to find upcoming or archived events
-    qs = Event.objects.approved()
+    qs = Event.objects.approved().summary()
 
     # some optional filtering
     if 'tags' in options:
@@ -226,10 +218,8 @@ def _search(q, **options):
     if 'channels' in options:
         qs = qs.filter(channels__in=options['channels'])
 
-    if options.get('privacy_filter'):
-        qs = qs.filter(**options['privacy_filter'])
-    elif options.get('privacy_exclude'):
-        qs = qs.exclude(**options['privacy_exclude'])
+    if options.get('privacy_tier'):
+        qs = options['privacy_tier'].filter(qs)
 
     if q and options.get('fuzzy'):
         sql = """
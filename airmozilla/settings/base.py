@@ -148,6 +148,7 @@ MIDDLEWARE_CLASSES = (
     'django.middleware.common.CommonMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'airmozilla.main.middleware.PrivacyTierMiddleware',
     'session_csrf.CsrfMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'commonware.middleware.FrameOptionsHeader',
@@ -164,6 +165,11 @@ TIME_ZONE = 'US/Pacific'
 # How much time, in minutes, an event shows as "live" before its start time.
 LIVE_MARGIN = 10
 
+# Number of seconds the current time is rounded down to when listing
+# events that are upcoming, live or archived so that the same listings
+# can be cached and shared. 0 means the exact time is used.
+NOW_BUCKET_SECONDS = 30
+
 # Default amount of time, in minutes, an event spends in the "archiving" state.
 ARCHIVING_MARGIN = 60
 
@@ -178,6 +184,12 @@ FEED_SIZE = 20
 # Use PNG for thumbnailing
 THUMBNAIL_FORMAT = 'PNG'
 
+# If True, thumbnails that haven't been generated yet are generated in a
+# background thread and, till then, templates show THUMBNAIL_PLACEHOLDER
+# (a static file) instead.
+THUMBNAIL_BACKGROUND = True
+THUMBNAIL_PLACEHOLDER = 'main/img/thumbnail-placeholder.png'
+
 # Number of upcoming events to display in the sidebar
 UPCOMING_SIDEBAR_COUNT = 5
 
@@ -190,9 +202,72 @@ SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
 # Always use secure cookies
 COOKIES_SECURE = True
 
+# Number of seconds we remember what the slug in an URL like /<slug>/ is
+# (an event, an old slug of an event or a flat page) and that it's nothing.
+# 0 means it's not remembered at all.
+SLUG_RESOLUTION_POSITIVE_TTL = 60 * 60 * 24
+SLUG_RESOLUTION_NEGATIVE_TTL = 60 * 60
+
+# Number of seconds we keep the parts of the event page that are the same
+# for everyone. It's forgotten as soon as the event changes anyway.
+# 0 means it's not remembered at all.
+EVENT_CONTEXT_CACHE_TTL = 60 * 60
+
+# Number of seconds the embeddable video page of a public event is cached,
+# by us and by browsers and proxies.
+# 0 means it's not remembered at all.
+EVENT_VIDEO_CACHE_TTL = 60 * 30
+
+# Number of seconds the comments of an event are kept rendered. They're
+# forgotten as soon as any of them change anyway.
+# 0 means they're rendered every time.
+COMMENTS_HTML_CACHE_TTL = 60 * 60
+
+# Number of seconds a request for the comments that have changed waits
+# for some to change if none have yet. Every waiting request keeps a
+# web worker busy so only make it more than 0 (answer straight away)
+# when running on asynchronous (e.g. gevent) workers.
+COMMENTS_LONG_POLL_SECONDS = 0
+
+# Number of seconds the URL transform rules are kept. They're forgotten
+# as soon as any of them change anyway. Whilst they're kept their use
+# counts are added up in the cache and written down by the
+# flush_url_transform_use_counts cron job.
+# 0 means the rules are read, and use counts written, every time.
+URL_TRANSFORM_CACHE_TTL = 60 * 60
+
+# Number of seconds the counts in the manage navigation badges are kept.
+# They're updated when what they count changes and by the
+# reconcile_badges cron job. 0 means they're counted on every page.
+BADGES_CACHE_TTL = 60 * 60
+
+# Number of days we remember that events have been deleted. The manage
+# events page reloads all events if it was last loaded longer ago.
+EVENT_TOMBSTONE_DAYS = 30
+
+# Number of seconds before the `since` watermark that changed events are
+# sent anyway, in case they were saved before but committed after it.
+EVENTS_DATA_DELTA_OVERLAP = 60
+
 # Defaults for Mozillians
 MOZILLIANS_API_BASE = 'https://mozillians.org'
 
+# Seconds to wait for the Mozillians API to respond, the number of times to
+# retry if it can't be connected to and the number of connections kept open
+# (and groups pages fetched at the same time).
+MOZILLIANS_API_TIMEOUT = 10
+MOZILLIANS_API_RETRIES = 2
+MOZILLIANS_API_POOL_SIZE = 4
+
+# Number of seconds we remember that a user is, or isn't, in any of the
+# curated groups of an event.
+MOZILLIANS_IN_GROUPS_POSITIVE_TTL = 60 * 60
+MOZILLIANS_IN_GROUPS_NEGATIVE_TTL = 60 * 5
+
+# Number of seconds we keep all the members of each curated group. The
+# prewarm_curated_groups cron job should refresh them more often than that.
+MOZILLIANS_GROUP_MEMBERS_TTL = 60 * 60 * 3
+
 # API base URL
 VIDLY_API_URL = 'http://m.vid.ly/api/'
 
@@ -260,6 +335,54 @@ SCREENCAPTURES_NO_PICTURES = 15
 # by another job that imports the JPEGs created there.
 SCREENCAPTURES_TEMP_DIRECTORY_NAME = 'airmozilla-screencaps'
 
+# How the screencaps are extracted from the video. Either 'sequential'
+# (one ffmpeg process per picture), 'parallel' (like 'sequential' but
+# with SCREENCAPTURES_PARALLEL_PROCESSES ffmpeg processes at a time) or
+# 'single' (one ffmpeg process that extracts all pictures in one pass).
+SCREENCAPTURES_EXTRACTION = 'sequential'
+
+# Max. number of concurrent ffmpeg processes when the extraction
+# is 'parallel'.
+SCREENCAPTURES_PARALLEL_PROCESSES = 4
+
+# Thumbnails that are generated as soon as screencaptures are imported
+# so that no page view has to wait for them. These should match the
+# geometries and options used in the templates.
+SCREENCAPTURES_THUMBNAIL_GEOMETRIES = (
+    ('160x90', {'crop': 'center'}),
+    ('121x68', {'crop': 'center'}),
+    ('96x54', {'crop': 'center'}),
+    ('200x200', {'crop': 'center'}),
+    ('201x113', {'crop': 'center'}),
+    ('220x124', {}),
+)
+
+# Number of threads used to generate those thumbnails.
+SCREENCAPTURES_THUMBNAIL_PROCESSES = 4
+
+# Name of the directory that gets created in the temp directory where
+# downloaded videos are kept so that the jobs that need a local copy
+# of the video (durations, screencaps) don't download it more than once.
+VIDEO_CACHE_DIRECTORY_NAME = 'airmozilla-videocache'
+
+# Max. total size, in bytes, of the downloaded videos kept in the
+# VIDEO_CACHE_DIRECTORY_NAME. The least recently used ones are deleted
+# first.
+VIDEO_CACHE_MAX_SIZE = 10 * 1024 * 1024 * 1024  # 10Gb
+
+# Number of parallel HTTP Range requests a video is downloaded with.
+VIDEO_DOWNLOAD_SEGMENTS = 1
+
+# Number of seconds an event that failed to be processed by the
+# fetch_durations or fetch_screencaptures jobs is skipped for.
+VIDEOINFO_QUARANTINE_SECONDS = 60 * 60
+
+# Number of events the fetch_durations and fetch_screencaptures cron jobs
+# process in parallel (each in its own process) and how many seconds
+# each event is allowed to take before it's killed and quarantined.
+VIDEOINFO_PROCESSES = 2
+VIDEOINFO_TIMEOUT = 60 * 30
+
 
 # Usernames of people who have contributed to Air Mozilla (as a contributor).
 # This list is ordered! Ordered by the first contributor first, and the most
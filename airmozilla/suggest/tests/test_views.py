@@ -11,6 +11,7 @@ from django.utils import timezone
 from django.utils.timezone import utc
 from django.core import mail
 from django.core.files import File
+from django.core.cache import cache
 
 import pytz
 from mock import patch
@@ -52,6 +53,7 @@ class TestPages(TestCase):
 
     def setUp(self):
         super(TestPages, self).setUp()
+        cache.clear()
         self.user = User.objects.create_superuser('fake', 'fake@f.com', 'fake')
         assert self.client.login(username='fake', password='fake')
         self.precorded_location = Location.objects.create(
@@ -1,6 +1,9 @@
-from django.db import models
+import collections
+
+from django.db import models, transaction
+from django.db.utils import IntegrityError
 from django.contrib.auth.models import User
-from django.db.models import Max
+from django.db.models import Max, F
 
 from jsonfield.fields import JSONField
 
@@ -49,3 +52,79 @@ class Answer(models.Model):
 
     def __repr__(self):  # pragma: no cover
         return '<%r %r>' % (self.__class__.__name__, self.answer)
+
+
+class ChoiceTally(models.Model):
+    """how many have answered a question with a choice. It's kept up to
+    date by `save_answers()` and `delete_answers()` so nothing has to
+    count the answers."""
+    question = models.ForeignKey(Question)
+    choice = models.TextField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('question', 'choice')
+
+    def __repr__(self):  # pragma: no cover
+        return '<%r %r %r>' % (
+            self.__class__.__name__,
+            self.choice,
+            self.count
+        )
+
+
+def _change_tallies(counts, sign):
+    """add (or, if `sign` is -1, subtract) the numbers of a dict of
+    (question ID, choice) -> number to their tallies"""
+    for (question_id, choice), number in counts.items():
+        tallies = ChoiceTally.objects.filter(
+            question_id=question_id,
+            choice=choice
+        )
+        if tallies.update(count=F('count') + sign * number) or sign < 0:
+            continue
+        # the first answer with this choice
+        sid = transaction.savepoint()
+        try:
+            ChoiceTally.objects.create(
+                question_id=question_id,
+                choice=choice,
+                count=number
+            )
+            transaction.savepoint_commit(sid)
+        except IntegrityError:
+            # another submission created it at the same time
+            transaction.savepoint_rollback(sid)
+            tallies.update(count=F('count') + number)
+
+
+def _count_choices(answers):
+    counts = collections.defaultdict(int)
+    for question_id, answer in answers:
+        if answer.get('answer'):
+            counts[(question_id, answer['answer'])] += 1
+    return counts
+
+
+def delete_answers(user, questions):
+    """delete this user's answers to these questions and take them off
+    the tallies. Must be called within a transaction."""
+    answers = Answer.objects.filter(user=user, question__in=questions)
+    counts = _count_choices((x.question_id, x.answer) for x in answers)
+    answers.delete()
+    _change_tallies(counts, -1)
+
+
+def save_answers(user, questions, choices):
+    """replace this user's answers to these questions with a dict of
+    question ID -> choice and add them to the tallies. Must be called
+    within a transaction."""
+    delete_answers(user, questions)
+    Answer.objects.bulk_create([
+        Answer(question_id=question_id, user=user, answer={'answer': choice})
+        for question_id, choice in choices.items()
+    ])
+    _change_tallies(_count_choices(
+        (question_id, {'answer': choice})
+        for question_id, choice in choices.items()
+    ), 1)
@@ -4,7 +4,14 @@ from nose.tools import eq_, ok_
 
 from airmozilla.base.tests.testbase import DjangoTestCase
 from airmozilla.main.models import Event
-from airmozilla.surveys.models import Survey, Question, Answer
+from airmozilla.surveys.models import (
+    Survey,
+    Question,
+    Answer,
+    ChoiceTally,
+    save_answers,
+    delete_answers
+)
 
 
 class SurveyTestCase(DjangoTestCase):
@@ -49,3 +56,50 @@ class SurveyTestCase(DjangoTestCase):
             }
         )
         ok_(answer.modified)
+
+    def test_save_and_delete_answers(self):
+        survey = Survey.objects.create(name='Basic survey')
+        question = Question.objects.create(
+            survey=survey,
+            question={
+                'question': 'Fav color?',
+                'choices': ['Red', 'Green', 'Blue']
+            }
+        )
+        other = Question.objects.create(
+            survey=survey,
+            question={
+                'question': 'Gender?',
+                'choices': ['Male', 'Female', 'Mixed']
+            }
+        )
+        questions = [question, other]
+        bob = User.objects.create(username='bob')
+        jay = User.objects.create(username='jay')
+
+        def get_tallies():
+            return dict(
+                ((x.question_id, x.choice), x.count)
+                for x in ChoiceTally.objects.all()
+            )
+
+        save_answers(bob, questions, {question.id: 'Red', other.id: 'Mixed'})
+        save_answers(jay, questions, {question.id: 'Red'})
+        eq_(get_tallies(), {
+            (question.id, 'Red'): 2,
+            (other.id, 'Mixed'): 1,
+        })
+        eq_(Answer.objects.filter(user=bob).count(), 2)
+
+        # again, differently
+        save_answers(bob, questions, {question.id: 'Blue'})
+        eq_(get_tallies(), {
+            (question.id, 'Red'): 1,
+            (question.id, 'Blue'): 1,
+            (other.id, 'Mixed'): 0,
+        })
+        eq_(Answer.objects.filter(user=bob).count(), 1)
+
+        delete_answers(jay, questions)
+        eq_(get_tallies()[(question.id, 'Red')], 0)
+        ok_(not Answer.objects.filter(user=jay))
@@ -2,10 +2,13 @@ from funfactory.urlresolvers import reverse
 from nose.tools import eq_, ok_
 
 from airmozilla.base.tests.testbase import DjangoTestCase
+from django.contrib.auth.models import User
+
 from airmozilla.surveys.models import (
     Survey,
     Question,
-    Answer
+    Answer,
+    save_answers
 )
 
 
@@ -157,3 +160,33 @@ class TestSurvey(DjangoTestCase):
             user=user
         )
         eq_(answers.count(), 0)
+
+    def test_show_results(self):
+        survey = self._create_survey()
+        url = reverse('surveys:load', args=(survey.id,))
+        question = Question.objects.create(
+            survey=survey,
+            question={
+                'question': 'Fav color?',
+                'choices': ['Red', 'Green', 'Blue']
+            }
+        )
+        for i in range(3):
+            save_answers(
+                User.objects.create(username='user%d' % i),
+                [question],
+                {question.id: 'Blue'}
+            )
+        self._login()
+        response = self.client.post(url, {str(question.id): 'Green'})
+        eq_(response.status_code, 302)
+
+        response = self.client.get(url)
+        eq_(response.status_code, 200)
+        ok_('75%' in response.content)
+        ok_('25%' in response.content)
+        ok_('class="your-answer"' in response.content)
+        eq_(
+            Answer.objects.filter(question=question).count(),
+            4
+        )
@@ -4,7 +4,14 @@ from django.shortcuts import get_object_or_404, render, redirect
 from django.db import transaction
 from django import forms
 
-from .models import Survey, Question, Answer
+from .models import (
+    Survey,
+    Question,
+    Answer,
+    ChoiceTally,
+    save_answers,
+    delete_answers
+)
 
 
 @transaction.commit_on_success
@@ -12,27 +19,31 @@ def load(request, id):
     survey = get_object_or_404(Survey, id=id, active=True)
     context = {'survey': survey}
 
-    questions = Question.objects.filter(survey=survey)
-    answers = Answer.objects.filter(question__in=questions)
+    questions = list(Question.objects.filter(survey=survey))
 
     if request.method == 'POST' and request.POST.get('resetmine'):
-        answers.filter(user=request.user).delete()
+        delete_answers(request.user, questions)
         return redirect('surveys:load', survey.id)
 
     show_answers = True  # default
+    your_answers = {}
     if request.user.is_authenticated():
         # don't show answers if this is POST
-        your_answers = answers.filter(user=request.user)
+        your_answers = dict(
+            (answer.question_id, answer.answer.get('answer'))
+            for answer in Answer.objects.filter(
+                question__in=questions,
+                user=request.user
+            )
+        )
         if request.method == 'POST' or not your_answers:
             show_answers = False
-    else:
-        your_answers = answers.none()
 
     if show_answers:
-        # make a map of question -> [answers]
-        _answers = defaultdict(list)
-        for answer in answers:
-            _answers[answer.question].append(answer)
+        # make a map of question ID -> {choice: number}
+        tallies = defaultdict(dict)
+        for tally in ChoiceTally.objects.filter(question__in=questions):
+            tallies[tally.question_id][tally.choice] = tally.count
 
         questions_dicts = []
         for question in questions:
@@ -42,35 +53,24 @@ def load(request, id):
                 'label': question.question['question'],  # ugly
                 'choices': []
             }
-            choices = defaultdict(int)
-
-            total_answers = 0
-            for answer in _answers[question]:
-                choices[answer.answer['answer']] += 1
-                total_answers += 1
-
-            try:
-                your_answer = your_answers.get(question=question)
-            except Answer.DoesNotExist:
-                your_answer = None
+            choices = tallies[question.id]
+            total_answers = sum(choices.values())
+            your_answer = your_answers.get(question.id)
 
             for choice in question.question['choices']:
                 try:
-                    percent = 100.0 * choices[choice] / total_answers
+                    percent = 100.0 * choices.get(choice, 0) / total_answers
                 except ZeroDivisionError:
                     percent = 0.0
                 choice_item = {
-                    'number': choices[choice],
+                    'number': choices.get(choice, 0),
                     'percent': percent,
                     'answer': choice,
-                    'your_answer': (
-                        your_answer and choice == your_answer.answer['answer']
-                    )
+                    'your_answer': your_answer and choice == your_answer
                 }
                 item['choices'].append(choice_item)
             questions_dicts.append(item)
         context['questions'] = questions_dicts
-        context['answers'] = answers
         return render(request, 'surveys/answers.html', context)
 
     if request.method == 'POST':
@@ -95,22 +95,12 @@ def load(request, id):
 
     if request.method == 'POST':
         if form.is_valid():
-            # delete any previous answers
-            Answer.objects.filter(
-                question=question,
-                user=request.user
-            ).delete()
-            for question_id, answer in form.cleaned_data.items():
-                if not answer:
-                    continue
-                question = questions.get(id=question_id)
-                Answer.objects.create(
-                    question=question,
-                    user=request.user,
-                    answer={
-                        'answer': answer
-                    }
-                )
+            # replaces any previous answers
+            save_answers(request.user, questions, dict(
+                (int(question_id), answer)
+                for question_id, answer in form.cleaned_data.items()
+                if answer
+            ))
             return redirect('surveys:load', survey.id)
 
     context['form'] = form
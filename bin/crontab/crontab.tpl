@@ -30,5 +30,17 @@ HOME=/tmp
 # Every 10 minutes
 */10 * * * * {{ cron }} import_screencaptures 2>&1 | grep -Ev '(DeprecationWarning|UserWarning|from pkg_resources)'
 
+# Every 30 minutes
+*/30 * * * * {{ cron }} prewarm_curated_groups 2>&1 | grep -Ev '(DeprecationWarning|UserWarning|from pkg_resources)'
+
+# Every 10 minutes
+*/10 * * * * {{ cron }} reconcile_badges 2>&1 | grep -Ev '(DeprecationWarning|UserWarning|from pkg_resources)'
+
+# Every 5 minutes
+*/5 * * * * {{ cron }} flush_url_transform_use_counts 2>&1 | grep -Ev '(DeprecationWarning|UserWarning|from pkg_resources)'
+
+# Once a day
+15 3 * * * {{ cron }} purge_event_tombstones 2>&1 | grep -Ev '(DeprecationWarning|UserWarning|from pkg_resources)'
+
 
 MAILTO=root
@@ -58,3 +58,6 @@ EDGECAST_SECURE_KEY = 'anythingheretoo'
 ALLOWED_BID = (
     'mozilla.com',
 )
+
+# don't keep the requests for new comments waiting
+COMMENTS_LONG_POLL_SECONDS = 0